@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+
+# (C) Copyright 2020-2025 Hewlett Packard Enterprise Development LP.
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import contextlib
+import importlib
+import inspect
+import io
+import json
+import os
+import traceback
+
+from ansible.module_utils import basic
+from ansible.module_utils.common.text.converters import to_bytes
+from ansible.plugins.action import ActionBase
+from ansible.vars.clean import remove_internal_keys
+
+try:
+    from ansible.module_utils.common.json import Direction, get_module_encoder
+except ImportError:
+    # ansible-core < 2.19
+    from ansible.module_utils.common.json import AnsibleJSONEncoder
+
+    get_module_encoder = None
+
+MODULES_PACKAGE = "ansible_collections.arubanetworks.afc.plugins.modules"
+
+# Connections for which the module would run on the controller anyway
+IN_PROCESS_TRANSPORTS = (
+    "local",
+    "ansible.builtin.local",
+    "httpapi",
+    "ansible.netcommon.httpapi",
+)
+
+
+class ActionModule(ActionBase):
+    """Run the afc_* modules in-process on the controller.
+
+    The afc_* modules only talk HTTP to AFC, this action runs their main()
+    in the worker process instead of packaging them with AnsiballZ, copying
+    and executing them in a new interpreter. Arguments are validated by the
+    module itself so the argument specs are the same as today. Other
+    connections, e.g. a delegated jump host, keep the usual execution.
+    """
+
+    def run(self, tmp=None, task_vars=None):
+        result = super(ActionModule, self).run(tmp, task_vars)
+        del tmp
+
+        # resolved_action points to this action plugin, resolve the module
+        module_name = self._shared_loader_obj.module_loader.find_plugin_with_context(
+            self._task.action,
+            collection_list=self._task.collections,
+        ).resolved_fqcn
+        if self._connection.transport not in IN_PROCESS_TRANSPORTS:
+            result.update(
+                self._execute_module(
+                    module_name=module_name,
+                    task_vars=task_vars,
+                ),
+            )
+            return result
+
+        module_args = dict(self._task.args)
+        self._update_module_args(module_name, module_args, task_vars)
+        result.update(self._run_in_process(module_name, module_args))
+        return result
+
+    @staticmethod
+    def _encode_module_args(module_args):
+        if get_module_encoder is None:
+            encoder = AnsibleJSONEncoder
+        else:
+            encoder = get_module_encoder(
+                "legacy",
+                Direction.CONTROLLER_TO_MODULE,
+            )
+        return to_bytes(
+            json.dumps({"ANSIBLE_MODULE_ARGS": module_args}, cls=encoder),
+        )
+
+    def _parse_module_output(self, output):
+        res = {"rc": 0, "stdout": output, "stderr": ""}
+        parameters = inspect.signature(self._parse_returned_data).parameters
+        if "profile" in parameters:
+            return self._parse_returned_data(res, "legacy")
+        return self._parse_returned_data(res)
+
+    @contextlib.contextmanager
+    def _task_environment(self):
+        environment = {}
+        for env in self._task.environment or []:
+            if isinstance(env, dict):
+                environment.update(env)
+        saved = {name: os.environ.get(name) for name in environment}
+        os.environ.update(
+            {name: str(value) for name, value in environment.items()},
+        )
+        try:
+            yield
+        finally:
+            for name, value in saved.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+
+    def _run_in_process(self, module_name, module_args):
+        afc_module = importlib.import_module(
+            f"{MODULES_PACKAGE}.{module_name.split('.')[-1]}",
+        )
+
+        basic._ANSIBLE_ARGS = self._encode_module_args(module_args)
+        if hasattr(basic, "_ANSIBLE_PROFILE"):
+            basic._ANSIBLE_PROFILE = "legacy"
+
+        output = io.StringIO()
+        try:
+            with self._task_environment(), contextlib.redirect_stdout(output):
+                afc_module.main()
+        except SystemExit:
+            # exit_json and fail_json always exit
+            pass
+        except Exception as exc:
+            return {
+                "failed": True,
+                "msg": f"MODULE FAILURE: {exc}",
+                "exception": traceback.format_exc(),
+            }
+        finally:
+            basic._ANSIBLE_ARGS = None
+
+        data = self._parse_module_output(output.getvalue())
+        remove_internal_keys(data)
+        return data
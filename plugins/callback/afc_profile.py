@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+
+# (C) Copyright 2020-2025 Hewlett Packard Enterprise Development LP.
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+DOCUMENTATION = r"""
+---
+name: afc_profile
+type: aggregate
+short_description: Profile the HPE ANW Fabric Composer API calls of a run
+description: >
+    This callback enables the timings of the afc_* modules, see the
+    afc_timings option, and aggregates them over the whole run. At the end
+    of the run it displays the slowest modules, operations and AFC
+    endpoints and writes all the timings to a JSON file, to track them
+    from one run to the next.
+version_added: "1.1.0"
+author: Aruba Networks (@ArubaNetworks)
+requirements:
+    - Enable the callback with callbacks_enabled in ansible.cfg or the
+      ANSIBLE_CALLBACKS_ENABLED environment variable.
+options:
+    top:
+        description: Number of rows displayed in each table.
+        type: int
+        default: 10
+        env:
+            - name: AFC_PROFILE_TOP
+        ini:
+            - section: callback_afc_profile
+              key: top
+    output_dir:
+        description: >
+            Directory where the JSON report of each run is written, as
+            afc_profile-<timestamp>.json. Set to an empty string to disable
+            the report.
+        type: path
+        default: ~/.ansible/afc/profile
+        env:
+            - name: AFC_PROFILE_OUTPUT_DIR
+        ini:
+            - section: callback_afc_profile
+              key: output_dir
+"""
+
+EXAMPLES = r"""
+# ansible.cfg
+# [defaults]
+# callbacks_enabled = arubanetworks.afc.afc_profile
+#
+# [callback_afc_profile]
+# top = 5
+# output_dir = ./afc_profile
+#
+# Sample output at the end of the run:
+#
+# AFC PROFILE: MODULES *******************************************************
+# afc_ip_interface                 300 calls   182.41s   0.608s avg   1.930s max
+# afc_vrf                            2 calls     1.12s   0.560s avg   0.611s max
+#
+# AFC PROFILE: ENDPOINTS *****************************************************
+# GET vrfs?fabrics=*               600 calls    61.03s   0.102s avg
+# POST vrfs/{uuid}/ip_interfaces   300 calls    52.70s   0.176s avg
+"""
+
+import json
+import os
+import time
+from datetime import datetime, timezone
+
+from ansible.plugins.callback import CallbackBase
+from ansible_collections.arubanetworks.afc.plugins.module_utils.afc import (
+    AFC_TIMINGS_ENV,
+)
+
+
+class CallbackModule(CallbackBase):
+    CALLBACK_VERSION = 2.0
+    CALLBACK_TYPE = "aggregate"
+    CALLBACK_NAME = "arubanetworks.afc.afc_profile"
+    CALLBACK_NEEDS_ENABLED = True
+
+    def __init__(self):
+        super(CallbackModule, self).__init__()
+        # Workers are forked from this process and inherit the variable,
+        # an explicit AFC_TIMINGS=0 is kept
+        os.environ.setdefault(AFC_TIMINGS_ENV, "1")
+        self.playbook = None
+        self.started = time.time()
+        self.tasks = []
+
+    def v2_playbook_on_start(self, playbook):
+        self.playbook = playbook._file_name
+
+    def _record(self, result, status):
+        module = result._task.action.split(".")[-1]
+        results = result._result.get("results")
+        for item_result in results if results else [result._result]:
+            if not isinstance(item_result, dict):
+                continue
+            timings = item_result.get("timings")
+            if not isinstance(timings, dict):
+                continue
+            module_args = item_result.get("invocation", {}).get(
+                "module_args",
+                {},
+            )
+            operation = module_args.get("operation") or result._task.args.get(
+                "operation",
+            )
+            self.tasks.append(
+                {
+                    "host": result._host.get_name(),
+                    "task": result._task.get_name(),
+                    "module": module,
+                    "operation": operation,
+                    "status": status,
+                    "timings": timings,
+                },
+            )
+
+    def v2_runner_on_ok(self, result):
+        self._record(result, "ok")
+
+    def v2_runner_on_failed(self, result, ignore_errors=False):
+        self._record(result, "failed")
+
+    @staticmethod
+    def _aggregate(entries):
+        """Aggregate (name, count, duration, max) entries by name."""
+        totals = {}
+        for name, count, duration, maximum in entries:
+            total = totals.setdefault(
+                name,
+                {"count": 0, "duration": 0.0, "max": 0.0},
+            )
+            total["count"] += count
+            total["duration"] += duration
+            total["max"] = max(total["max"], maximum)
+        return dict(
+            sorted(
+                totals.items(),
+                key=lambda item: item[1]["duration"],
+                reverse=True,
+            ),
+        )
+
+    def _report(self):
+        modules = self._aggregate(
+            (
+                task["module"],
+                1,
+                task["timings"].get("total", 0.0),
+                task["timings"].get("total", 0.0),
+            )
+            for task in self.tasks
+        )
+        operations = self._aggregate(
+            (
+                f"{task['module']} {task['operation'] or '-'}",
+                1,
+                task["timings"].get("total", 0.0),
+                task["timings"].get("total", 0.0),
+            )
+            for task in self.tasks
+        )
+        phases = self._aggregate(
+            (name, 1, duration, duration)
+            for task in self.tasks
+            for name, duration in task["timings"].get("phases", {}).items()
+        )
+        endpoints = self._aggregate(
+            (name, endpoint["count"], endpoint["duration"], 0.0)
+            for task in self.tasks
+            for name, endpoint in task["timings"].get("endpoints", {}).items()
+        )
+        return {
+            "playbook": self.playbook,
+            "started": datetime.fromtimestamp(
+                self.started,
+                timezone.utc,
+            ).isoformat(),
+            "duration": round(time.time() - self.started, 4),
+            "http_requests": sum(
+                task["timings"].get("http_requests", 0) for task in self.tasks
+            ),
+            "retries": sum(
+                task["timings"].get("retries", 0) for task in self.tasks
+            ),
+            "modules": modules,
+            "operations": operations,
+            "phases": phases,
+            "endpoints": endpoints,
+            "tasks": self.tasks,
+        }
+
+    def _display_table(self, title, rows, with_max=True):
+        self._display.banner(f"AFC PROFILE: {title}")
+        top = self.get_option("top")
+        width = max([len(name) for name in list(rows)[:top]] + [20])
+        for name, total in list(rows.items())[:top]:
+            line = (
+                f"{name:<{width}} {total['count']:>6} calls "
+                f"{total['duration']:>9.2f}s "
+                f"{total['duration'] / max(total['count'], 1):>8.3f}s avg"
+            )
+            if with_max:
+                line += f" {total['max']:>8.3f}s max"
+            self._display.display(line)
+
+    def _write_report(self, report):
+        output_dir = self.get_option("output_dir")
+        if not output_dir:
+            return
+        try:
+            if not os.path.isdir(output_dir):
+                os.makedirs(output_dir, 0o700)
+            timestamp = datetime.fromtimestamp(self.started).strftime(
+                "%Y%m%d-%H%M%S",
+            )
+            path = os.path.join(output_dir, f"afc_profile-{timestamp}.json")
+            with open(path, "w") as report_file:
+                json.dump(report, report_file, indent=2)
+        except OSError as exc:
+            self._display.warning(f"Unable to write the AFC profile: {exc}")
+            return
+        self._display.display(f"AFC profile written to {path}")
+
+    def v2_playbook_on_stats(self, stats):
+        if not self.tasks:
+            return
+        report = self._report()
+        self._display_table("MODULES", report["modules"])
+        self._display_table("OPERATIONS", report["operations"])
+        self._display_table("PHASES", report["phases"])
+        self._display_table("ENDPOINTS", report["endpoints"], with_max=False)
+        self._write_report(report)
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+
+# (C) Copyright 2020-2025 Hewlett Packard Enterprise Development LP.
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+
+class ModuleDocFragment(object):
+    # Options shared by every module built on AfcModule
+    DOCUMENTATION = r"""
+options:
+    afc_timings:
+        description: >
+            Return the time spent in each phase of the task, login, name
+            lookups, operation and disconnect, and the number of HTTP
+            requests sent to AFC in the timings result. Defaults to the
+            value of the AFC_TIMINGS environment variable.
+        type: bool
+        default: false
+        required: false
+notes:
+    - >
+        With afc_timings, the timings result holds the durations in seconds
+        of the login, lookup, operation and disconnect phases and of the
+        whole task, the number of HTTP requests, retries and response
+        bytes, and the count and duration of the requests per AFC
+        endpoint, e.g. C({"phases": {"login": 0.412, "operation": 0.231},
+        "total": 0.664, "http_requests": 4, "retries": 0,
+        "response_bytes": 1002, "endpoints": {"GET fabrics": {"count": 1,
+        "duration": 0.031}}}).
+"""
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+
+# (C) Copyright 2020-2025 Hewlett Packard Enterprise Development LP.
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+DOCUMENTATION = r"""
+---
+name: afc
+short_description: HttpApi plugin for the HPE ANW Fabric Composer
+description: >
+    This HttpApi plugin holds one authenticated pyafc client per
+    HPE ANW Fabric Composer for the whole play. The afc_* modules send
+    their requests through it instead of logging in on every task.
+    It is used with ansible_connection=ansible.netcommon.httpapi and
+    ansible_network_os=arubanetworks.afc.afc.
+version_added: "1.1.0"
+author: Aruba Networks (@ArubaNetworks)
+"""
+
+from ansible.errors import AnsibleConnectionFailure
+from ansible_collections.ansible.netcommon.plugins.plugin_utils.httpapi_base import (
+    HttpApiBase,
+)
+from ansible_collections.arubanetworks.afc.plugins.module_utils.afc import (
+    AfcCachingClient,
+    AfcConcurrencyLimiter,
+    AfcResolutionCache,
+    AfcResolutionFileCache,
+    AfcRetryingClient,
+    AfcRetryPolicy,
+    instantiate_afc_object,
+)
+
+
+class HttpApi(HttpApiBase):
+    def __init__(self, connection):
+        super(HttpApi, self).__init__(connection)
+        self._afc_instance = None
+        self._credentials = None
+        # Name lookups shared by all the tasks of the play
+        self._resolution_cache = AfcResolutionCache.from_env()
+        self._retry_policy = AfcRetryPolicy.from_env()
+
+    def _afc_ip(self):
+        host = self.connection.get_option("host")
+        port = self.connection.get_option("port")
+        if port and int(port) != 443:
+            return f"{host}:{port}"
+        return host
+
+    def login(self, username, password):
+        if username and password:
+            self._credentials = {
+                "ip": self._afc_ip(),
+                "username": username,
+                "password": password,
+            }
+            self._afc_instance = instantiate_afc_object(
+                data=self._credentials,
+            )
+        if self._afc_instance and not self._afc_instance.afc_connected:
+            self._afc_instance = None
+            raise AnsibleConnectionFailure(
+                f"Unable to log in to AFC {self._afc_ip()}",
+            )
+
+    def logout(self):
+        # Token is only revoked if it has been created by this plugin,
+        # tokens shared through the token cache are kept for later plays
+        if self._afc_instance and self._credentials:
+            self._afc_instance.disconnect()
+        self._afc_instance = None
+
+    def _get_afc_instance(self):
+        if not self.connection.connected:
+            self.connection._connect()
+        if self._afc_instance is None:
+            session_key = self.connection.get_option("session_key")
+            if isinstance(session_key, dict):
+                session_key = session_key.get("Authorization")
+            if session_key:
+                self._afc_instance = instantiate_afc_object(
+                    data={
+                        "ip": self._afc_ip(),
+                        "auth_token": session_key,
+                    },
+                )
+            if not self._afc_instance or not self._afc_instance.afc_connected:
+                raise AnsibleConnectionFailure(
+                    f"Not connected to AFC {self._afc_ip()}",
+                )
+        return self._afc_instance
+
+    def get_afc_auth_token(self):
+        return self._get_afc_instance().auth_token
+
+    def _get_client(self):
+        client = AfcRetryingClient(
+            self._get_afc_instance().client,
+            self._retry_policy,
+            AfcConcurrencyLimiter.from_env(self._afc_ip()),
+        )
+        if self._resolution_cache:
+            return AfcCachingClient(client, self._resolution_cache)
+        return client
+
+    def send_request(self, data, method="GET", path="", headers=None):
+        response = self._get_client().request(
+            method,
+            path,
+            content=data,
+            headers=headers,
+        )
+        if response.status_code == 401 and self._credentials:
+            # Token expired during the play, log in again and replay once
+            self._afc_instance.client.close()
+            self.login(
+                self._credentials["username"],
+                self._credentials["password"],
+            )
+            response = self._get_client().request(
+                method,
+                path,
+                content=data,
+                headers=headers,
+            )
+        if method != "GET":
+            # Lookups cached on disk by the local tasks and afc_uuid
+            file_cache = AfcResolutionFileCache.from_env(
+                {"ip": self._afc_ip()},
+            )
+            if file_cache:
+                file_cache.invalidate(path)
+        return {
+            "status_code": response.status_code,
+            "headers": dict(response.headers),
+            "text": response.text,
+        }
@@ -0,0 +1,388 @@
+# -*- coding: utf-8 -*-
+
+# (C) Copyright 2020-2025 Hewlett Packard Enterprise Development LP.
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+DOCUMENTATION = r"""
+---
+name: afc
+short_description: Inventory of the switches managed by HPE ANW Fabric Composer
+description: >
+    This inventory plugin builds one host per switch known by the
+    HPE ANW Fabric Composer, with groups per fabric, per switch role and
+    per VSX pair. The configuration file name must end with afc.yml or
+    afc.yaml.
+version_added: "1.1.0"
+author: Aruba Networks (@ArubaNetworks)
+extends_documentation_fragment:
+    - constructed
+    - inventory_cache
+options:
+    plugin:
+        description: Name of the plugin.
+        type: str
+        required: true
+        choices:
+            - arubanetworks.afc.afc
+    afc_ip:
+        description: IP address of the HPE ANW Fabric Composer.
+        type: str
+        required: true
+        env:
+            - name: AFC_IP
+    afc_username:
+        description: User account having read permission on the AFC.
+        type: str
+        env:
+            - name: AFC_USERNAME
+    afc_password:
+        description: Password of the user account.
+        type: str
+        env:
+            - name: AFC_PASSWORD
+    auth_token:
+        description: >
+            Auth token, used when afc_username and afc_password are not
+            set.
+        type: str
+        env:
+            - name: AFC_AUTH_TOKEN
+    fabrics:
+        description: >
+            Names of the fabrics whose switches are added to the inventory.
+            All the switches, including the ones not assigned to a fabric,
+            are added by default.
+        type: list
+        elements: str
+        default: []
+    hostnames:
+        description: Switch attribute used as inventory hostname.
+        type: str
+        choices:
+            - name
+            - hostname
+            - ip_address
+        default: name
+    incremental_refresh:
+        description: >
+            With the cache enabled, read the fabrics and the switches from
+            AFC and only refetch the VSX pairs of the fabrics whose
+            attributes or switches changed since the inventory was cached.
+            The cache is not rewritten, so that it still expires and the
+            inventory is then read in full. When disabled, a valid cache
+            is used without any request to AFC.
+        type: bool
+        default: true
+"""
+
+EXAMPLES = r"""
+# afc.yml
+plugin: arubanetworks.afc.afc
+afc_ip: 10.10.10.10
+afc_username: afc_admin
+afc_password: afc_password
+fabrics:
+    - Aruba-Fabric
+cache: true
+cache_plugin: ansible.builtin.jsonfile
+cache_connection: ~/.ansible/afc/inventory
+cache_timeout: 3600
+keyed_groups:
+    - key: afc_model
+      prefix: model
+compose:
+    ansible_network_os: "'arubanetworks.aoscx.aoscx'"
+
+# Resulting groups:
+#   afc_fabric_aruba_fabric: every switch of the fabric
+#   afc_role_leaf, afc_role_spine, afc_role_border: switches per role
+#   afc_vsx_<pair name>: the two members of each VSX pair
+#   afc_unassigned: switches discovered but not assigned to a fabric
+"""
+
+import hashlib
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from ansible.errors import AnsibleParserError
+from ansible.inventory.group import to_safe_group_name
+from ansible.plugins.inventory import (
+    BaseInventoryPlugin,
+    Cacheable,
+    Constructable,
+)
+from ansible_collections.arubanetworks.afc.plugins.module_utils.afc import (
+    AfcConcurrencyLimiter,
+    AfcRetryingClient,
+    AfcRetryPolicy,
+    instantiate_afc_object,
+)
+from pyafc.common import utils
+
+# Switch attributes exposed as afc_<attribute> host variables
+HOST_VARIABLES = (
+    "uuid",
+    "name",
+    "hostname",
+    "role",
+    "status",
+    "model",
+    "serial_number",
+    "sw_version",
+)
+
+
+def group_name(*parts):
+    return to_safe_group_name(
+        "_".join(str(part) for part in parts).lower(),
+        force=True,
+        silent=True,
+    )
+
+
+def switch_uuids(switches):
+    return sorted(switch["uuid"] for switch in switches)
+
+
+def fingerprint(fabric):
+    """Return a hash changing with any attribute of the fabric."""
+    content = json.dumps(fabric, sort_keys=True, default=str)
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
+    NAME = "arubanetworks.afc.afc"
+
+    def verify_file(self, path):
+        if super(InventoryModule, self).verify_file(path):
+            return path.endswith(("afc.yml", "afc.yaml"))
+        return False
+
+    def _connect(self):
+        data = {"ip": self.get_option("afc_ip")}
+        if self.get_option("afc_username") and self.get_option(
+            "afc_password",
+        ):
+            data["username"] = self.get_option("afc_username")
+            data["password"] = self.get_option("afc_password")
+        elif self.get_option("auth_token"):
+            data["auth_token"] = self.get_option("auth_token")
+        else:
+            raise AnsibleParserError(
+                "afc_username and afc_password, or auth_token, are required",
+            )
+        afc_instance = instantiate_afc_object(data=data)
+        if not afc_instance.afc_connected or not afc_instance.client:
+            raise AnsibleParserError(
+                f"Unable to connect to AFC {data['ip']}",
+            )
+        afc_instance.client = AfcRetryingClient(
+            afc_instance.client,
+            AfcRetryPolicy.from_env(),
+            AfcConcurrencyLimiter.from_env(data["ip"]),
+        )
+        return afc_instance
+
+    @staticmethod
+    def _get(client, path):
+        response = client.get(path)
+        if response.status_code not in utils.response_ok:
+            raise AnsibleParserError(
+                f"GET {path} returned {response.status_code}: "
+                f"{response.text}",
+            )
+        return response.json()["result"] or []
+
+    def _fetch_fabric(self, client, fabric, switches):
+        """Return the cache entry of fabric, reading its VSX pairs."""
+        return {
+            "name": fabric["name"],
+            "fingerprint": fingerprint(fabric),
+            "switches": switches,
+            "vsx": self._get(client, f"fabrics/{fabric['uuid']}/vsx"),
+        }
+
+    def _fetch(self, previous):
+        """Read the fabrics, switches and VSX pairs from AFC.
+
+        The switches are always read, so that switches discovered or
+        moved to another fabric are seen. With a previous inventory, the
+        VSX pairs of the fabrics whose fingerprint and switches did not
+        change are reused.
+        """
+        afc_instance = self._connect()
+        client = afc_instance.client
+        try:
+            fabrics = self._get(client, "fabrics")
+            selected = self.get_option("fabrics")
+            if selected:
+                fabrics = [
+                    fabric for fabric in fabrics if fabric["name"] in selected
+                ]
+            all_switches = self._get(client, "switches")
+            fabric_switches = {
+                fabric["uuid"]: [
+                    switch
+                    for switch in all_switches
+                    if switch.get("fabric_uuid") == fabric["uuid"]
+                ]
+                for fabric in fabrics
+            }
+
+            inventory = {
+                "fabrics": {},
+                "unassigned": [
+                    switch
+                    for switch in all_switches
+                    if not switch.get("fabric_uuid")
+                ],
+            }
+            changed = []
+            for fabric in fabrics:
+                switches = fabric_switches[fabric["uuid"]]
+                cached = (previous or {}).get("fabrics", {}).get(
+                    fabric["uuid"],
+                )
+                if (
+                    cached
+                    and cached["fingerprint"] == fingerprint(fabric)
+                    and switch_uuids(cached["switches"])
+                    == switch_uuids(switches)
+                ):
+                    inventory["fabrics"][fabric["uuid"]] = dict(
+                        cached,
+                        switches=switches,
+                    )
+                else:
+                    changed.append(fabric)
+
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                entries = executor.map(
+                    lambda fabric: self._fetch_fabric(
+                        client,
+                        fabric,
+                        fabric_switches[fabric["uuid"]],
+                    ),
+                    changed,
+                )
+                for fabric, entry in zip(changed, entries):
+                    inventory["fabrics"][fabric["uuid"]] = entry
+        finally:
+            try:
+                # Only the token created for the inventory is revoked
+                if "username" in afc_instance.afc_data:
+                    afc_instance.disconnect()
+            finally:
+                afc_instance.client.close()
+        return inventory
+
+    def _hostname(self, switch):
+        return switch.get(self.get_option("hostnames")) or switch.get("name")
+
+    def _add_switch(self, switch, groups, fabric=None):
+        hostname = self._hostname(switch)
+        if not hostname:
+            return None
+        self.inventory.add_host(hostname)
+        for group in groups:
+            self.inventory.add_child(self.inventory.add_group(group), hostname)
+        if switch.get("ip_address"):
+            self.inventory.set_variable(
+                hostname,
+                "ansible_host",
+                switch["ip_address"],
+            )
+        for attribute in HOST_VARIABLES:
+            if attribute in switch:
+                self.inventory.set_variable(
+                    hostname,
+                    f"afc_{attribute}",
+                    switch[attribute],
+                )
+        self.inventory.set_variable(hostname, "afc_fabric", fabric)
+
+        strict = self.get_option("strict")
+        variables = self.inventory.get_host(hostname).get_vars()
+        self._set_composite_vars(
+            self.get_option("compose"),
+            variables,
+            hostname,
+            strict=strict,
+        )
+        self._add_host_to_composed_groups(
+            self.get_option("groups"),
+            variables,
+            hostname,
+            strict=strict,
+        )
+        self._add_host_to_keyed_groups(
+            self.get_option("keyed_groups"),
+            variables,
+            hostname,
+            strict=strict,
+        )
+        return hostname
+
+    def _populate(self, inventory):
+        for entry in inventory["fabrics"].values():
+            fabric_group = group_name("afc_fabric", entry["name"])
+            hostnames = {}
+            for switch in entry["switches"]:
+                groups = [fabric_group]
+                if switch.get("role"):
+                    groups.append(group_name("afc_role", switch["role"]))
+                hostnames[switch["uuid"]] = self._add_switch(
+                    switch,
+                    groups,
+                    entry["name"],
+                )
+            for pair in entry["vsx"]:
+                vsx_group = self.inventory.add_group(
+                    group_name("afc_vsx", pair.get("name") or pair["uuid"]),
+                )
+                for peer in pair.get("vsx_peers", []):
+                    hostname = hostnames.get(peer.get("switch_uuid"))
+                    if hostname:
+                        self.inventory.add_child(vsx_group, hostname)
+                        self.inventory.set_variable(
+                            hostname,
+                            "afc_vsx_pair",
+                            pair.get("name"),
+                        )
+        if not self.get_option("fabrics"):
+            for switch in inventory["unassigned"]:
+                self._add_switch(switch, ["afc_unassigned"])
+
+    def parse(self, inventory, loader, path, cache=True):
+        super(InventoryModule, self).parse(inventory, loader, path, cache)
+        self._read_config_data(path)
+
+        cache_key = self.get_cache_key(path)
+        user_cache_setting = self.get_option("cache")
+        incremental = self.get_option("incremental_refresh")
+
+        # The cached inventory is also the base of an incremental refresh
+        cached = None
+        if user_cache_setting:
+            try:
+                cached = self._cache[cache_key]
+            except KeyError:
+                pass
+
+        if cached and cache and not incremental:
+            afc_inventory = cached
+        elif cached and cache:
+            # Written back, the cache would never expire and the VSX pairs
+            # of unchanged fabrics would never be read again
+            afc_inventory = self._fetch(cached)
+        else:
+            afc_inventory = self._fetch(None)
+            if user_cache_setting:
+                self._cache[cache_key] = afc_inventory
+
+        self._populate(afc_inventory)
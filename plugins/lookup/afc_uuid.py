@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+
+# (C) Copyright 2020-2025 Hewlett Packard Enterprise Development LP.
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+DOCUMENTATION = r"""
+---
+name: afc_uuid
+short_description: Resolve HPE ANW Fabric Composer object names into UUIDs
+description: >
+    This lookup returns the UUIDs of the fabrics, switches, VRFs or
+    resource pools named in the terms, in the same order. All the names
+    are resolved with a single list request per type of object. The lists
+    are kept in memory for the lookup and in the name resolution cache,
+    see AFC_RESOLUTION_CACHE, for the following tasks. The writes of the
+    afc_* modules, through the httpapi connection or not, drop the cached
+    lists of the collection they modify.
+version_added: "1.1.0"
+author: Aruba Networks (@ArubaNetworks)
+options:
+    _terms:
+        description: >
+            Names of the objects. Switches can also be given by hostname,
+            IP address or serial number.
+        type: list
+        elements: str
+        required: true
+    type:
+        description: Type of the objects.
+        type: str
+        choices:
+            - fabric
+            - switch
+            - vrf
+            - resource_pool
+        default: switch
+    fabric:
+        description: >
+            Name of the fabric of the VRFs. Required when a VRF name, such
+            as default, exists in several fabrics.
+        type: str
+    afc_ip:
+        description: IP address of the HPE ANW Fabric Composer.
+        type: str
+        required: true
+        env:
+            - name: AFC_IP
+        vars:
+            - name: afc_ip
+    afc_username:
+        description: User account having read permission on the AFC.
+        type: str
+        env:
+            - name: AFC_USERNAME
+        vars:
+            - name: afc_username
+    afc_password:
+        description: Password of the user account.
+        type: str
+        env:
+            - name: AFC_PASSWORD
+        vars:
+            - name: afc_password
+    auth_token:
+        description: >
+            Auth token, used when afc_username and afc_password are not
+            set.
+        type: str
+        env:
+            - name: AFC_AUTH_TOKEN
+        vars:
+            - name: auth_token
+"""
+
+EXAMPLES = r"""
+-   name: Build a payload with the UUIDs of the leaf switches
+    ansible.builtin.set_fact:
+        switch_uuids: >-
+            {{ lookup('arubanetworks.afc.afc_uuid', leaf_names,
+                      type='switch', wantlist=True) }}
+    vars:
+        leaf_names:
+            - leaf1
+            - leaf2
+            - 10.10.10.9
+
+-   name: Get the UUID of a VRF
+    ansible.builtin.debug:
+        msg: >-
+            {{ lookup('arubanetworks.afc.afc_uuid', 'default',
+                      type='vrf', fabric='Aruba-Fabric') }}
+"""
+
+RETURN = r"""
+_raw:
+    description: UUIDs of the objects, in the order of the terms.
+    type: list
+    elements: str
+"""
+
+from ansible.errors import AnsibleLookupError
+from ansible.plugins.lookup import LookupBase
+from ansible_collections.arubanetworks.afc.plugins.module_utils.afc import (
+    AfcConcurrencyLimiter,
+    AfcResolutionFileCache,
+    AfcRetryingClient,
+    AfcRetryPolicy,
+    instantiate_afc_object,
+)
+from pyafc.common import utils
+
+# AFC collection and attributes matched by the terms, per type of object
+OBJECT_TYPES = {
+    "fabric": ("fabrics", ("name",)),
+    "switch": (
+        "switches",
+        ("name", "hostname", "ip_address", "serial_number"),
+    ),
+    "vrf": ("vrfs", ("name",)),
+    "resource_pool": ("resource_pool", ("name",)),
+}
+
+
+class LookupModule(LookupBase):
+    def _auth_data(self):
+        data = {"ip": self.get_option("afc_ip")}
+        if self.get_option("afc_username") and self.get_option(
+            "afc_password",
+        ):
+            data["username"] = self.get_option("afc_username")
+            data["password"] = self.get_option("afc_password")
+        elif self.get_option("auth_token"):
+            data["auth_token"] = self.get_option("auth_token")
+        else:
+            raise AnsibleLookupError(
+                "afc_username and afc_password, or auth_token, are required",
+            )
+        return data
+
+    def _client(self):
+        """Log in on the first request which is not already cached."""
+        if self._afc_instance is None:
+            afc_instance = instantiate_afc_object(data=self._data)
+            if not afc_instance.afc_connected or not afc_instance.client:
+                raise AnsibleLookupError(
+                    f"Unable to connect to AFC {self._data['ip']}",
+                )
+            afc_instance.client = AfcRetryingClient(
+                afc_instance.client,
+                AfcRetryPolicy.from_env(),
+                AfcConcurrencyLimiter.from_env(self._data["ip"]),
+            )
+            self._afc_instance = afc_instance
+        return self._afc_instance.client
+
+    def _get(self, path):
+        if path in self._results:
+            return self._results[path]
+        response = self._cache.get(path) if self._cache else None
+        if response is None:
+            response = self._client().get(path)
+            if response.status_code not in utils.response_ok:
+                raise AnsibleLookupError(
+                    f"GET {path} returned {response.status_code}: "
+                    f"{response.text}",
+                )
+            if self._cache:
+                self._cache.set(path, response)
+        self._results[path] = response.json()["result"] or []
+        return self._results[path]
+
+    def _objects(self, object_type):
+        path, _attributes = OBJECT_TYPES[object_type]
+        fabric_name = self.get_option("fabric")
+        if object_type != "vrf" or not fabric_name:
+            return self._get(path)
+        for fabric in self._get("fabrics"):
+            if fabric["name"] == fabric_name:
+                return self._get(f"vrfs?fabrics={fabric['uuid']}")
+        raise AnsibleLookupError(f"Fabric {fabric_name} does not exist")
+
+    def _resolve(self, names, object_type):
+        _path, attributes = OBJECT_TYPES[object_type]
+        index = {}
+        for item in self._objects(object_type):
+            for attribute in attributes:
+                if item.get(attribute):
+                    index.setdefault(str(item[attribute]), set()).add(
+                        item["uuid"],
+                    )
+
+        uuids = []
+        missing = []
+        ambiguous = []
+        for name in names:
+            matches = index.get(str(name), set())
+            if not matches:
+                missing.append(name)
+            elif len(matches) > 1:
+                ambiguous.append(name)
+            else:
+                uuids.append(next(iter(matches)))
+        if missing:
+            raise AnsibleLookupError(
+                f"Unknown {object_type}: {', '.join(missing)}",
+            )
+        if ambiguous:
+            message = (
+                f"Several objects of type {object_type} are named "
+                f"{', '.join(ambiguous)}"
+            )
+            if object_type == "vrf":
+                message += ", set the fabric option"
+            raise AnsibleLookupError(message)
+        return uuids
+
+    def run(self, terms, variables=None, **kwargs):
+        self.set_options(var_options=variables, direct=kwargs)
+        self._data = self._auth_data()
+        self._cache = AfcResolutionFileCache.from_env(self._data)
+        # Lists read by this lookup, the file cache being shared with the
+        # tasks which invalidate it on writes
+        self._results = {}
+        self._afc_instance = None
+        try:
+            return self._resolve(
+                self._flatten(terms),
+                self.get_option("type"),
+            )
+        finally:
+            if self._afc_instance:
+                try:
+                    # Only the token created for the lookup is revoked
+                    if "username" in self._data:
+                        self._afc_instance.disconnect()
+                finally:
+                    self._afc_instance.client.close()
@@ -11,9 +11,1999 @@ __metaclass__ = type
 
 REQUESTS_IMP_ERR = None
 
+try:
+    import h2  # noqa: F401
+
+    HAS_H2 = True
+except ImportError:
+    HAS_H2 = False
+
+try:
+    import yaml
+
+    HAS_YAML = True
+except ImportError:
+    HAS_YAML = False
+
+import copy
+import fcntl
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlencode
+
+import httpx
+from ansible.module_utils.basic import AnsibleModule, env_fallback
+from ansible.module_utils.connection import Connection
 from pyafc.afc import afc
+from pyafc.common import utils
+
+AFC_TOKEN_CACHE_ENV = "AFC_TOKEN_CACHE"
+AFC_TOKEN_CACHE_TTL_ENV = "AFC_TOKEN_CACHE_TTL"
+DEFAULT_TOKEN_CACHE = "~/.ansible/afc/token_cache.json"
+DEFAULT_TOKEN_CACHE_TTL = 1800
+AFC_RESOLUTION_CACHE_ENV = "AFC_RESOLUTION_CACHE"
+AFC_RESOLUTION_CACHE_TTL_ENV = "AFC_RESOLUTION_CACHE_TTL"
+DEFAULT_RESOLUTION_CACHE = "~/.ansible/afc/resolution_cache.json"
+DEFAULT_RESOLUTION_CACHE_TTL = 300
+# Expired lookups with an ETag or a Last-Modified date are kept this long
+# to be revalidated with a conditional request
+RESOLUTION_REVALIDATION_MAX_AGE = 86400
+
+# GET requests used by pyafc to turn fabric, VRF, switch and resource pool
+# names into UUIDs. Switches looked up by IP address are not cached as the
+# same request is used to poll the switch status.
+RESOLUTION_PATHS = ("fabrics", "switches", "resource_pool")
+RESOLUTION_PATH_PREFIXES = ("vrfs?fabrics=", "resource_pool?resource_type=")
+AFC_TIMINGS_ENV = "AFC_TIMINGS"
+AFC_RETRIES_ENV = "AFC_RETRIES"
+AFC_RETRY_BACKOFF_ENV = "AFC_RETRY_BACKOFF"
+AFC_RETRY_MAX_DELAY_ENV = "AFC_RETRY_MAX_DELAY"
+DEFAULT_RETRIES = 5
+DEFAULT_RETRY_BACKOFF = 1.0
+DEFAULT_RETRY_MAX_DELAY = 30.0
+AFC_MAX_CONCURRENT_REQUESTS_ENV = "AFC_MAX_CONCURRENT_REQUESTS"
+AFC_LIMITER_DIR_ENV = "AFC_LIMITER_DIR"
+DEFAULT_MAX_CONCURRENT_REQUESTS = 8
+DEFAULT_LIMITER_DIR = "~/.ansible/afc/limiter"
+
+# Answers meaning that AFC did not process the request and that it can be
+# sent again. 502 and 504 come from a proxy which may have forwarded the
+# request, they are only retried for idempotent methods.
+RETRY_STATUS_CODES = (429, 503)
+IDEMPOTENT_RETRY_STATUS_CODES = (429, 502, 503, 504)
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+AFC_HTTP2_ENV = "AFC_HTTP2"
+AFC_MAX_CONNECTIONS_ENV = "AFC_MAX_CONNECTIONS"
+AFC_MAX_KEEPALIVE_CONNECTIONS_ENV = "AFC_MAX_KEEPALIVE_CONNECTIONS"
+AFC_KEEPALIVE_EXPIRY_ENV = "AFC_KEEPALIVE_EXPIRY"
+DEFAULT_MAX_CONNECTIONS = 10
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 5
+DEFAULT_KEEPALIVE_EXPIRY = 30.0
+AFC_PAGE_SIZE_ENV = "AFC_PAGE_SIZE"
+DEFAULT_PAGE_SIZE = 500
+
+# Headers of a GET read from AFC even when its lookup is cached
+NO_CACHE_HEADERS = {"Cache-Control": "no-cache"}
+UUID_PATTERN = re.compile(
+    r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}",
+    re.IGNORECASE,
+)
+QUERY_VALUE_PATTERN = re.compile(r"=[^&]*")
+
+afc_argument_spec = {
+    "afc_ip": {"type": "str", "required": True},
+    "afc_username": {"type": "str", "required": False},
+    "afc_password": {"type": "str", "required": False},
+    "auth_token": {"type": "str", "required": False},
+    "afc_timings": {
+        "type": "bool",
+        "required": False,
+        "default": False,
+        "fallback": (env_fallback, [AFC_TIMINGS_ENV]),
+    },
+}
+
+
+class AfcConnectionResponse:
+    """Response returned through the persistent connection or the cache.
+
+    Mimics the parts of httpx.Response used by pyafc.
+    """
+
+    def __init__(self, response):
+        self.status_code = response["status_code"]
+        self.headers = response.get("headers") or {}
+        self.text = response.get("text") or ""
+
+    @property
+    def content(self):
+        return self.text.encode("utf-8")
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class AfcConnectionClient:
+    """Client forwarding pyafc requests to the httpapi connection plugin.
+
+    Exposes the subset of the httpx.Client interface used by pyafc.
+    """
+
+    def __init__(self, connection):
+        self._connection = connection
+        self.is_closed = False
+
+    def request(self, method, url, data=None, headers=None, **kwargs):
+        """Send a request, the body being data, content or json.
+
+        Raise TypeError for the httpx arguments which cannot be forwarded
+        to the persistent connection, rather than dropping them.
+        """
+        content = kwargs.pop("content", None)
+        body = kwargs.pop("json", None)
+        params = kwargs.pop("params", None)
+        if kwargs:
+            msg = f"Unsupported request arguments: {', '.join(kwargs)}"
+            raise TypeError(msg)
+        if body is not None:
+            headers = dict(headers or {})
+            headers.setdefault("Content-Type", "application/json")
+            data = json.dumps(body)
+        elif content is not None:
+            data = content
+        if isinstance(data, bytes):
+            data = data.decode("utf-8")
+        if params:
+            separator = "&" if "?" in url else "?"
+            url = f"{url}{separator}{urlencode(params, doseq=True)}"
+        response = self._connection.send_request(
+            data,
+            method=method,
+            path=url,
+            headers=headers,
+        )
+        return AfcConnectionResponse(response)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request("PUT", url, **kwargs)
+
+    def patch(self, url, **kwargs):
+        return self.request("PATCH", url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request("DELETE", url, **kwargs)
+
+    def close(self):
+        # The session belongs to the persistent connection
+        self.is_closed = True
+
+
+class AfcConnection(afc.Afc):
+    """AFC instance backed by the arubanetworks.afc.afc httpapi plugin.
+
+    The plugin holds one authenticated pyafc client per AFC host for the
+    whole play, this object only proxies the requests to it.
+    """
+
+    def __init__(self, module):
+        connection = Connection(module._socket_path)
+        self.afc_data = {"ip": connection.get_option("host")}
+        self.connect_client = {}
+        self.client = AfcConnectionClient(connection)
+        self.auth_token = connection.get_afc_auth_token()
+        self.afc_connected = bool(self.auth_token)
+        self.connect_client["client"] = self.client
+
+    def disconnect(self):
+        # Session is closed by the connection plugin at the end of the play
+        return None
+
+
+def build_afc_client(ip):
+    """Return the httpx client used for all the requests of a task.
+
+    HTTP/2 is used when the h2 package is installed, unless AFC_HTTP2=0,
+    so that the requests of a task are multiplexed over one connection.
+    The pool limits and the keepalive expiry are read from the
+    environment.
+    """
+    http2 = HAS_H2 and os.environ.get(AFC_HTTP2_ENV, "1").lower() not in (
+        "0",
+        "false",
+        "no",
+    )
+    limits = httpx.Limits(
+        max_connections=int(
+            os.environ.get(AFC_MAX_CONNECTIONS_ENV, DEFAULT_MAX_CONNECTIONS),
+        ),
+        max_keepalive_connections=int(
+            os.environ.get(
+                AFC_MAX_KEEPALIVE_CONNECTIONS_ENV,
+                DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+            ),
+        ),
+        keepalive_expiry=float(
+            os.environ.get(AFC_KEEPALIVE_EXPIRY_ENV, DEFAULT_KEEPALIVE_EXPIRY),
+        ),
+    )
+    return httpx.Client(
+        verify=False,
+        base_url=f"https://{ip}/api/",
+        timeout=httpx.Timeout(20.0, read=60, connect=60.0),
+        limits=limits,
+        http2=http2,
+    )
+
+
+class AfcClient(afc.Afc):
+    """AFC instance using the client returned by build_afc_client.
+
+    The asynchronous client of afc.Afc, which costs a second login and is
+    not used by the modules, is not created.
+    """
+
+    def __init__(self, data=None):
+        self.afc_data = data
+        self.connect_client = {}
+        self.client = build_afc_client(self.afc_data["ip"])
+        self.connect()
+        if self.afc_connected:
+            self.read_system()
+
+    def read_system(self):
+        """Set the system and versions details as attributes, as afc.Afc.
+
+        A token rejected by AFC, with a 401 or a 403, leaves the instance
+        disconnected. Other errors, e.g. network ones, are raised.
+        """
+        policy = AfcRetryPolicy.from_env()
+        system_request = policy.send(
+            "GET",
+            lambda: self.client.get("system"),
+        )
+        if system_request.status_code in (401, 403):
+            self.afc_connected = False
+            self.client.close()
+            return
+        versions_request = policy.send(
+            "GET",
+            lambda: self.client.get("versions"),
+        )
+        details = dict(
+            system_request.json()["result"],
+            **versions_request.json()["result"],
+        )
+        for item, value in details.items():
+            setattr(self, item, value)
+
+
+class AfcSession(AfcClient):
+    """AFC instance built from a token shared through the token cache."""
+
+    def disconnect(self):
+        # Token stays valid for the next tasks, only release the socket
+        self.client.close()
+
+
+@contextmanager
+def file_lock(path):
+    """Hold an exclusive lock on path + '.lock' for the block duration."""
+    lock_fd = os.open(f"{path}.lock", os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(lock_fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        fcntl.flock(lock_fd, fcntl.LOCK_UN)
+        os.close(lock_fd)
+
+
+def read_json_file(path):
+    try:
+        with open(path) as cache_file:
+            return json.load(cache_file)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_json_file(path, content):
+    # Write then rename so that readers never see a partial file
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    tmp_fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(tmp_fd, "w") as tmp_file:
+        json.dump(content, tmp_file)
+    os.replace(tmp_path, path)
+
+
+class AfcTokenCache:
+    """Controller side cache of AFC tokens keyed by AFC IP and credentials.
+
+    Entries are stored with their expiry in a 0600 JSON file. The key is a
+    hash of the AFC IP, the username and the password, so that a task with
+    another password logs in rather than reusing the token. The file is
+    guarded by a lock, held during the login, so that parallel forks wait
+    for the first login instead of each creating their own token. Cached
+    tokens are validated against AFC without holding the lock.
+    """
+
+    def __init__(self, path, ttl):
+        self.path = os.path.expanduser(path)
+        self.ttl = ttl
+        cache_dir = os.path.dirname(self.path)
+        if cache_dir and not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir, 0o700)
+
+    @classmethod
+    def from_env(cls):
+        """Return the token cache, or None if disabled with a TTL of 0."""
+        ttl = int(
+            os.environ.get(AFC_TOKEN_CACHE_TTL_ENV, DEFAULT_TOKEN_CACHE_TTL),
+        )
+        if ttl <= 0:
+            return None
+        path = os.environ.get(AFC_TOKEN_CACHE_ENV) or DEFAULT_TOKEN_CACHE
+        return cls(path, ttl)
+
+    @staticmethod
+    def _key(ip, username, password):
+        key = f"{ip}\0{username}\0{password}".encode("utf-8")
+        return hashlib.sha256(key).hexdigest()
+
+    def get(self, ip, username, password):
+        entry = read_json_file(self.path).get(
+            self._key(ip, username, password),
+        )
+        if entry and entry["expires_at"] > time.time():
+            return entry["token"]
+        return None
+
+    def set(self, ip, username, password, token):
+        now = time.time()
+        entries = {
+            key: entry
+            for key, entry in read_json_file(self.path).items()
+            if entry["expires_at"] > now
+        }
+        entries[self._key(ip, username, password)] = {
+            "token": token,
+            "created_at": now,
+            "expires_at": now + self.ttl,
+        }
+        write_json_file(self.path, entries)
+
+    def invalidate(self, ip, username, password, token):
+        """Remove the entry if it still holds token, rejected by AFC."""
+        entries = read_json_file(self.path)
+        key = self._key(ip, username, password)
+        if entries.get(key, {}).get("token") == token:
+            del entries[key]
+            write_json_file(self.path, entries)
+
+    def get_afc_session(self, data):
+        """Return an AfcSession using a cached token, login if needed."""
+        credentials = (data["ip"], data["username"], data["password"])
+        with file_lock(self.path):
+            token = self.get(*credentials)
+        if token:
+            afc_instance = connect_with_token(data["ip"], token)
+            if afc_instance:
+                return afc_instance
+            with file_lock(self.path):
+                self.invalidate(*credentials, token)
+
+        with file_lock(self.path):
+            # Another fork may have logged in while the token was checked
+            token = self.get(*credentials)
+            if not token:
+                token = request_auth_token(*credentials)
+                if token:
+                    self.set(*credentials, token)
+        if token:
+            afc_instance = connect_with_token(data["ip"], token)
+            if afc_instance:
+                return afc_instance
+            with file_lock(self.path):
+                self.invalidate(*credentials, token)
+        return AfcClient(data=data)
+
+
+def request_auth_token(ip, username, password):
+    """Log in to AFC once and return the token, None on failure."""
+    header = {
+        "Accept": "application/json, version=1.0",
+        "Content-Type": "application/json",
+        "X-Auth-Username": username,
+        "X-Auth-Password": password,
+    }
+    try:
+        with httpx.Client(
+            verify=False,
+            base_url=f"https://{ip}/api/",
+            timeout=httpx.Timeout(20.0, read=60, connect=60.0),
+        ) as client:
+            auth_request = AfcRetryPolicy.from_env().send(
+                "POST",
+                lambda: client.post("auth/token", headers=header),
+            )
+        if auth_request.status_code in utils.response_ok:
+            return auth_request.json()["result"]
+    except (httpx.HTTPError, ValueError, KeyError):
+        pass
+    return None
+
+
+def connect_with_token(ip, token):
+    """Build an AfcSession from a token, None if AFC rejects the token.
+
+    The token is checked by the GET system of AfcClient.read_system(),
+    the errors other than a 401 or a 403 are raised.
+    """
+    afc_instance = AfcSession(data={"ip": ip, "auth_token": token})
+    if afc_instance.afc_connected and afc_instance.client:
+        return afc_instance
+    return None
+
+
+def resolution_path(url):
+    """Return the normalized path if url is a cacheable lookup, else None."""
+    path = str(url).lstrip("/")
+    if path in RESOLUTION_PATHS or path.startswith(RESOLUTION_PATH_PREFIXES):
+        return path
+    return None
+
+
+def header_value(headers, name):
+    """Return the value of header name, whatever the case of its key."""
+    for key, value in (headers or {}).items():
+        if key.lower() == name.lower():
+            return value
+    return None
+
+
+def validator_headers(entry):
+    """Return the conditional request headers revalidating entry."""
+    headers = {}
+    etag = header_value(entry.get("headers"), "ETag")
+    if etag:
+        headers["If-None-Match"] = etag
+    last_modified = header_value(entry.get("headers"), "Last-Modified")
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    return headers
+
+
+def is_cache_entry_kept(entry, now):
+    if entry["expires_at"] > now:
+        return True
+    return bool(validator_headers(entry)) and (
+        entry["expires_at"] + RESOLUTION_REVALIDATION_MAX_AGE > now
+    )
+
+
+def resolution_collection(url):
+    """Return the collection and the object path depth of url."""
+    segments = str(url).lstrip("/").split("?")[0].split("/")
+    return segments[0], len(segments)
+
+
+class AfcResolutionCache:
+    """Cache of the name lookup responses, kept in memory.
+
+    Used by the httpapi plugin for the whole play. Entries expire after the
+    TTL and are dropped as soon as an object of their collection is
+    created, updated or deleted. Expired entries returned by AFC with an
+    ETag or a Last-Modified header are kept to be revalidated, see
+    get_stale() and refresh().
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._entries = {}
+
+    @classmethod
+    def from_env(cls):
+        """Return the cache, or None if disabled with a TTL of 0."""
+        ttl = int(
+            os.environ.get(
+                AFC_RESOLUTION_CACHE_TTL_ENV,
+                DEFAULT_RESOLUTION_CACHE_TTL,
+            ),
+        )
+        if ttl <= 0:
+            return None
+        return cls(ttl)
+
+    def _read(self):
+        return self._entries
+
+    @contextmanager
+    def _update(self):
+        yield self._entries
+
+    def get(self, path):
+        entry = self._read().get(path)
+        if entry and entry["expires_at"] > time.time():
+            return AfcConnectionResponse(entry)
+        return None
+
+    def get_stale(self, path):
+        """Return the expired entry of path if it can be revalidated."""
+        entry = self._read().get(path)
+        if entry and is_cache_entry_kept(entry, time.time()):
+            return entry
+        return None
+
+    def refresh(self, path, response):
+        """Extend the entry of path after a 304 Not Modified answer."""
+        with self._update() as entries:
+            entry = entries.get(path)
+            if entry is None:
+                return
+            for name in ("ETag", "Last-Modified"):
+                value = header_value(response.headers, name)
+                if value:
+                    entry["headers"] = {
+                        key: header
+                        for key, header in entry["headers"].items()
+                        if key.lower() != name.lower()
+                    }
+                    entry["headers"][name] = value
+            entry["expires_at"] = time.time() + self.ttl
+
+    def set(self, path, response):
+        with self._update() as entries:
+            entries[path] = {
+                "status_code": response.status_code,
+                "headers": dict(response.headers),
+                "text": response.text,
+                "expires_at": time.time() + self.ttl,
+            }
+
+    def invalidate(self, url):
+        collection, depth = resolution_collection(url)
+        # Sub resources, e.g. vrfs/<uuid>/ip_interfaces, keep the lookups
+        if depth > 2:
+            return
+        if not any(
+            resolution_collection(path)[0] == collection
+            for path in self._read()
+        ):
+            return
+        with self._update() as entries:
+            for path in list(entries):
+                if resolution_collection(path)[0] == collection:
+                    del entries[path]
+
+
+class AfcResolutionFileCache(AfcResolutionCache):
+    """Cache of the name lookup responses shared by the local tasks.
+
+    Entries are stored per AFC IP and user in a 0600 JSON file guarded by a
+    lock, in the same way as the token cache. A write drops the lookups of
+    its collection for every user of the AFC, see invalidate().
+    """
+
+    def __init__(self, path, ttl, host_key, key):
+        super(AfcResolutionFileCache, self).__init__(ttl)
+        self.path = os.path.expanduser(path)
+        self.host_key = host_key
+        self.key = key
+        cache_dir = os.path.dirname(self.path)
+        if cache_dir and not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir, 0o700)
+
+    @classmethod
+    def from_env(cls, data):
+        """Return the cache of data's AFC, or None if disabled."""
+        cache = AfcResolutionCache.from_env()
+        if cache is None:
+            return None
+        user = data.get("username") or data.get("auth_token") or ""
+        host_key = hashlib.sha256(data["ip"].encode("utf-8")).hexdigest()
+        key = hashlib.sha256(
+            f"{data['ip']}\0{user}".encode("utf-8"),
+        ).hexdigest()
+        path = (
+            os.environ.get(AFC_RESOLUTION_CACHE_ENV)
+            or DEFAULT_RESOLUTION_CACHE
+        )
+        return cls(path, cache.ttl, host_key, key)
+
+    def _read(self):
+        return (
+            read_json_file(self.path).get(self.host_key, {}).get(self.key, {})
+        )
+
+    @contextmanager
+    def _update(self):
+        with file_lock(self.path):
+            content = read_json_file(self.path)
+            users = content.setdefault(self.host_key, {})
+            now = time.time()
+            entries = {
+                path: entry
+                for path, entry in users.get(self.key, {}).items()
+                if is_cache_entry_kept(entry, now)
+            }
+            yield entries
+            users[self.key] = entries
+            write_json_file(self.path, content)
+
+    def invalidate(self, url):
+        """Drop the lookups of the collection of url for every user.
+
+        The objects are the same whatever the user, the lookups of another
+        user, e.g. the afc_uuid lookup, must not outlive a write.
+        """
+        collection, depth = resolution_collection(url)
+        if depth > 2:
+            return
+        users = read_json_file(self.path).get(self.host_key, {})
+        if not any(
+            resolution_collection(path)[0] == collection
+            for entries in users.values()
+            for path in entries
+        ):
+            return
+        with file_lock(self.path):
+            content = read_json_file(self.path)
+            for entries in content.get(self.host_key, {}).values():
+                for path in list(entries):
+                    if resolution_collection(path)[0] == collection:
+                        del entries[path]
+            write_json_file(self.path, content)
+
+
+class AfcCachingClient:
+    """Client answering the pyafc name lookups from an AfcResolutionCache.
+
+    Expired lookups are revalidated with If-None-Match or
+    If-Modified-Since when AFC returned an ETag or a Last-Modified date,
+    a 304 answer is served from the cache. A lookup sent with
+    NO_CACHE_HEADERS is read from AFC and its answer cached. Other requests
+    are sent to the wrapped client, writes invalidate the cached lookups of
+    the collection they modify.
+    """
+
+    def __init__(self, client, cache):
+        self._client = client
+        self._cache = cache
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+    def request(self, method, url, **kwargs):
+        path = resolution_path(url) if method == "GET" else None
+        stale = None
+        no_cache = header_value(kwargs.get("headers"), "Cache-Control")
+        if path and no_cache != "no-cache":
+            response = self._cache.get(path)
+            if response is not None:
+                return response
+            stale = self._cache.get_stale(path)
+            if stale:
+                kwargs["headers"] = dict(
+                    kwargs.get("headers") or {},
+                    **validator_headers(stale),
+                )
+        response = self._client.request(method, url, **kwargs)
+        if stale and response.status_code == 304:
+            self._cache.refresh(path, response)
+            return AfcConnectionResponse(stale)
+        if path and response.status_code in utils.response_ok:
+            self._cache.set(path, response)
+        elif method != "GET":
+            self._cache.invalidate(url)
+        return response
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request("PUT", url, **kwargs)
+
+    def patch(self, url, **kwargs):
+        return self.request("PATCH", url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request("DELETE", url, **kwargs)
+
+
+def endpoint_name(method, url):
+    """Return 'METHOD path' with UUIDs and query values masked."""
+    path = UUID_PATTERN.sub("{uuid}", str(url).lstrip("/"))
+    return f"{method} {QUERY_VALUE_PATTERN.sub('=*', path)}"
+
+
+class AfcTimings:
+    """Durations of the phases of a task and statistics of its requests.
+
+    Phases are login, lookup, operation and disconnect. The lookup phase is
+    the time spent in the name lookups made during the operation, which is
+    reported without it.
+    """
+
+    def __init__(self):
+        # Requests may be recorded from several threads, see afc_facts
+        self._lock = threading.Lock()
+        self.phases = {}
+        self.http_requests = 0
+        self.retries = 0
+        self.response_bytes = 0
+        self.endpoints = {}
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = (
+                self.phases.get(name, 0.0) + time.perf_counter() - start
+            )
+
+    def record_request(self, method, url, duration, response):
+        with self._lock:
+            self.http_requests += 1
+            self.response_bytes += len(response.content)
+            if method == "GET" and resolution_path(url):
+                self.phases["lookup"] = (
+                    self.phases.get("lookup", 0.0) + duration
+                )
+            endpoint = self.endpoints.setdefault(
+                endpoint_name(method, url),
+                {"count": 0, "duration": 0.0},
+            )
+            endpoint["count"] += 1
+            endpoint["duration"] += duration
+
+    def record_retry(self):
+        with self._lock:
+            self.retries += 1
+
+    def as_dict(self):
+        phases = dict(self.phases)
+        if "operation" in phases:
+            phases["operation"] -= phases.get("lookup", 0.0)
+        return {
+            "phases": {
+                name: round(duration, 4) for name, duration in phases.items()
+            },
+            "total": round(
+                sum(
+                    duration
+                    for name, duration in self.phases.items()
+                    if name != "lookup"
+                ),
+                4,
+            ),
+            "http_requests": self.http_requests,
+            "retries": self.retries,
+            "response_bytes": self.response_bytes,
+            "endpoints": {
+                name: {
+                    "count": endpoint["count"],
+                    "duration": round(endpoint["duration"], 4),
+                }
+                for name, endpoint in sorted(self.endpoints.items())
+            },
+        }
+
+
+class AfcInstrumentedClient:
+    """Client recording the requests sent to AFC in an AfcTimings."""
+
+    def __init__(self, client, timings):
+        self._client = client
+        self._timings = timings
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+    def request(self, method, url, **kwargs):
+        start = time.perf_counter()
+        response = self._client.request(method, url, **kwargs)
+        self._timings.record_request(
+            method,
+            url,
+            time.perf_counter() - start,
+            response,
+        )
+        return response
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request("PUT", url, **kwargs)
+
+    def patch(self, url, **kwargs):
+        return self.request("PATCH", url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request("DELETE", url, **kwargs)
+
+
+class AfcRetryPolicy:
+    """Exponential backoff with full jitter for the requests sent to AFC.
+
+    Requests answered with 429 or 503, and for idempotent methods 502 and
+    504, are sent again after the Retry-After delay given by AFC or else
+    after a random delay up to backoff * 2 ** attempt, capped to max_delay.
+    Connection errors are retried for every method, other transport errors
+    such as read timeouts only for idempotent ones.
+    """
+
+    def __init__(self, retries, backoff, max_delay):
+        self.retries = retries
+        self.backoff = backoff
+        self.max_delay = max_delay
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            int(os.environ.get(AFC_RETRIES_ENV, DEFAULT_RETRIES)),
+            float(
+                os.environ.get(AFC_RETRY_BACKOFF_ENV, DEFAULT_RETRY_BACKOFF),
+            ),
+            float(
+                os.environ.get(
+                    AFC_RETRY_MAX_DELAY_ENV,
+                    DEFAULT_RETRY_MAX_DELAY,
+                ),
+            ),
+        )
+
+    @staticmethod
+    def is_retryable_status(method, status_code):
+        if method.upper() in IDEMPOTENT_METHODS:
+            return status_code in IDEMPOTENT_RETRY_STATUS_CODES
+        return status_code in RETRY_STATUS_CODES
+
+    @staticmethod
+    def is_retryable_error(method, error):
+        # The request never reached AFC
+        if isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout)):
+            return True
+        return method.upper() in IDEMPOTENT_METHODS
+
+    @staticmethod
+    def retry_after(response):
+        """Return the Retry-After delay of response in seconds, or None."""
+        value = (response.headers or {}).get("Retry-After")
+        if not value:
+            return None
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        return max(retry_at.timestamp() - time.time(), 0.0)
+
+    def delay(self, attempt, response=None):
+        retry_after = self.retry_after(response) if response else None
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        return random.uniform(
+            0,
+            min(self.backoff * 2**attempt, self.max_delay),
+        )
 
+    def send(self, method, send, on_retry=None):
+        """Call send() until it succeeds or the retries are exhausted.
 
-def instantiate_afc_object(data=None):
-    afc_instance = afc.Afc(data=data)
+        The last response is returned, or the last transport error raised.
+        """
+        attempt = 0
+        while True:
+            response = None
+            try:
+                response = send()
+            except httpx.TransportError as exc:
+                if attempt >= self.retries or not self.is_retryable_error(
+                    method,
+                    exc,
+                ):
+                    raise
+            else:
+                if attempt >= self.retries or not self.is_retryable_status(
+                    method,
+                    response.status_code,
+                ):
+                    return response
+            time.sleep(self.delay(attempt, response))
+            attempt += 1
+            if on_retry is not None:
+                on_retry()
+
+
+class AfcConcurrencyLimiter:
+    """Limit of the requests sent at the same time to one AFC.
+
+    Each request holds one of limit lock files, shared by every process of
+    the controller, so the forks of a run wait for a free slot instead of
+    all hitting AFC at once.
+    """
+
+    def __init__(self, directory, key, limit):
+        self.directory = os.path.expanduser(directory)
+        self.key = key
+        self.limit = limit
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory, 0o700)
+
+    @classmethod
+    def from_env(cls, ip):
+        """Return the limiter of AFC ip, or None if disabled with 0."""
+        limit = int(
+            os.environ.get(
+                AFC_MAX_CONCURRENT_REQUESTS_ENV,
+                DEFAULT_MAX_CONCURRENT_REQUESTS,
+            ),
+        )
+        if limit <= 0:
+            return None
+        directory = os.environ.get(AFC_LIMITER_DIR_ENV) or DEFAULT_LIMITER_DIR
+        key = hashlib.sha256(ip.encode("utf-8")).hexdigest()
+        return cls(directory, key, limit)
+
+    def _try_acquire(self):
+        """Lock a free slot and return its file descriptor, or None."""
+        # Start from a random slot to spread the processes over the files
+        first = random.randrange(self.limit)
+        for index in range(self.limit):
+            path = os.path.join(
+                self.directory,
+                f"{self.key}.{(first + index) % self.limit}.lock",
+            )
+            lock_fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                os.close(lock_fd)
+                continue
+            return lock_fd
+        return None
+
+    @contextmanager
+    def slot(self):
+        lock_fd = self._try_acquire()
+        while lock_fd is None:
+            time.sleep(random.uniform(0.01, 0.05))
+            lock_fd = self._try_acquire()
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_fd, fcntl.LOCK_UN)
+            os.close(lock_fd)
+
+
+class AfcRetryingClient:
+    """Client applying an AfcRetryPolicy and an AfcConcurrencyLimiter.
+
+    A slot of the limiter is only held while a request is sent, not during
+    the delay before a retry.
+    """
+
+    def __init__(self, client, policy, limiter=None, timings=None):
+        self._client = client
+        self._policy = policy
+        self._limiter = limiter
+        self._timings = timings
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+    def _send(self, method, url, **kwargs):
+        if self._limiter is None:
+            return self._client.request(method, url, **kwargs)
+        with self._limiter.slot():
+            return self._client.request(method, url, **kwargs)
+
+    def request(self, method, url, **kwargs):
+        return self._policy.send(
+            method,
+            lambda: self._send(method, url, **kwargs),
+            on_retry=self._timings.record_retry if self._timings else None,
+        )
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request("PUT", url, **kwargs)
+
+    def patch(self, url, **kwargs):
+        return self.request("PATCH", url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request("DELETE", url, **kwargs)
+
+
+class AfcCheckModeStop(BaseException):
+    """Raised in check mode by the first write which would change AFC.
+
+    Not an Exception, pyafc catches those and turns them into messages.
+    """
+
+
+def request_body(kwargs):
+    """Return the decoded body of a request sent by pyafc, or None."""
+    if kwargs.get("json") is not None:
+        return kwargs["json"]
+    data = kwargs.get("data")
+    if data is None:
+        return None
+    try:
+        return json.loads(data)
+    except (TypeError, ValueError):
+        return data
+
+
+def apply_json_patch(item, operations):
+    """Return a copy of item with the JSON patch operations applied.
+
+    Paths may go through nested objects and list indexes, e.g.
+    /port_properties/0/port_uuids/-, where - appends to the list.
+    """
+    item = copy.deepcopy(item)
+    for operation in operations:
+        fields = str(operation.get("path", "")).strip("/").split("/")
+        value = operation.get("value")
+        target = item
+        for field in fields[:-1]:
+            if isinstance(target, list):
+                target = target[int(field)]
+                continue
+            if not isinstance(target.get(field), (dict, list)):
+                target[field] = {}
+            target = target[field]
+        field = fields[-1]
+        if isinstance(target, list):
+            if operation.get("op") == "remove":
+                del target[int(field)]
+            elif field == "-":
+                target.append(value)
+            elif operation.get("op") == "add":
+                target.insert(int(field), value)
+            else:
+                target[int(field)] = value
+        elif operation.get("op") == "remove":
+            target.pop(field, None)
+        else:
+            target[field] = value
+    return item
+
+
+def is_subset(item, current):
+    """Return True if every field of item has the same value in current."""
+    return all(
+        json.dumps(current.get(field), sort_keys=True, default=str)
+        == json.dumps(value, sort_keys=True, default=str)
+        for field, value in item.items()
+    )
+
+
+def model_body(model):
+    """Return the fields of a pyafc model set by the module, as JSON values.
+
+    The fields left to their default are not returned, so that an update
+    does not reset the current values of the fields a task does not set.
+    """
+    body = json.loads(model.json(exclude_none=True))
+    return {
+        field: value
+        for field, value in body.items()
+        if field in model.__fields_set__
+    }
+
+
+def resolve_targets(client, data):
+    """Return a copy of data with the UUIDs of its fabrics and switches."""
+    data = dict(data)
+    if data.get("fabrics") or data.get("switches"):
+        data = utils.populate_list_fabrics_switches(client, data)
+    return data
+
+
+def diff_value(value):
+    """Return value as a dict or a string displayed by the diff callback."""
+    if value is None:
+        return ""
+    if isinstance(value, dict):
+        return value
+    return json.dumps(value, indent=4, sort_keys=True, default=str) + "\n"
+
+
+class AfcChangeRecorder:
+    """Client recording the changes made by the writes of a task.
+
+    Before a write, the objects it targets are read to tell whether it
+    changes them and to build the diff of the task. In check mode the
+    writes are not sent: a write changing nothing is answered as AFC
+    would, the first write changing something raises AfcCheckModeStop,
+    the following requests of pyafc depending on its outcome.
+    """
+
+    # Requests of the session itself, also sent in check mode
+    SESSION_PATHS = ("auth/token",)
+    SCOPE_FIELDS = ("fabric_uuid", "vrf_uuid", "switch_uuid")
+
+    def __init__(self, client, check_mode=False):
+        self._client = client
+        self.check_mode = check_mode
+        # (method, path, before, after) of each change
+        self.changes = []
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+    def _result(self, path):
+        response = self._client.get(path)
+        if response.status_code not in utils.response_ok:
+            return None
+        try:
+            return response.json()["result"]
+        except (ValueError, KeyError, TypeError):
+            return None
+
+    def _current(self, path):
+        """Return the object at path, None if it does not exist."""
+        result = self._result(path)
+        if isinstance(result, list) and len(result) == 1:
+            result = result[0]
+        return result if isinstance(result, dict) else None
+
+    def _created(self, path, items):
+        """Return the changes of a POST of items to path."""
+        existing = self._result(path)
+        if not isinstance(existing, list):
+            # Action such as a reapply, not a collection
+            return [("POST", path, None, items)]
+        changes = []
+        for item in items:
+            if not isinstance(item, dict):
+                changes.append(("POST", path, None, item))
+                continue
+            # AFC rejects a POST of an object whose name exists
+            current = None
+            if item.get("name") is not None:
+                current = next(
+                    (
+                        current
+                        for current in existing
+                        if current.get("name") == item["name"]
+                        and all(
+                            current.get(field) == item[field]
+                            for field in self.SCOPE_FIELDS
+                            if field in item
+                        )
+                    ),
+                    None,
+                )
+            if current is None:
+                changes.append(("POST", path, None, item))
+        return changes
+
+    def _updated(self, method, path, items):
+        """Return the changes of a PUT or PATCH of items to path."""
+        changes = []
+        for item in items:
+            if isinstance(item, dict) and "patch" in item:
+                # Bulk JSON patch: {"uuids": [...], "patch": [...]}
+                for uuid in item.get("uuids", []):
+                    before = self._current(f"{path}/{uuid}")
+                    after = apply_json_patch(before or {}, item["patch"])
+                    if before != after:
+                        changes.append(
+                            (method, f"{path}/{uuid}", before, after),
+                        )
+                continue
+            target = path
+            if (
+                isinstance(item, dict)
+                and item.get("uuid")
+                and not UUID_PATTERN.search(path.split("/")[-1])
+            ):
+                target = f"{path}/{item['uuid']}"
+            before = self._current(target)
+            if not isinstance(item, dict):
+                changes.append((method, target, before, item))
+            elif before is None or not is_subset(item, before):
+                changes.append(
+                    (method, target, before, dict(before or {}, **item)),
+                )
+        return changes
+
+    def _changes(self, method, url, body):
+        path = str(url).lstrip("/").split("?")[0]
+        if method == "DELETE":
+            before = self._current(path)
+            if before is None:
+                return []
+            return [(method, path, before, None)]
+        items = body if isinstance(body, list) else [body]
+        if method == "POST":
+            return self._created(path, items)
+        return self._updated(method, path, items)
+
+    @staticmethod
+    def _unchanged_response(method, body):
+        """Return the answer of AFC to a write changing nothing."""
+        if method == "POST":
+            name = body.get("name") if isinstance(body, dict) else None
+            return AfcConnectionResponse(
+                {
+                    "status_code": 400,
+                    "text": json.dumps({"result": f"{name} already exists"}),
+                },
+            )
+        return AfcConnectionResponse(
+            {
+                "status_code": 200,
+                "text": json.dumps({"result": "No change"}),
+            },
+        )
+
+    def request(self, method, url, **kwargs):
+        if method not in ("POST", "PUT", "PATCH", "DELETE") or str(
+            url,
+        ).lstrip("/").startswith(self.SESSION_PATHS):
+            return self._client.request(method, url, **kwargs)
+        body = request_body(kwargs)
+        changes = self._changes(method, url, body)
+        self.changes.extend(changes)
+        if self.check_mode:
+            if changes:
+                raise AfcCheckModeStop(f"{method} {url}")
+            return self._unchanged_response(method, body)
+        return self._client.request(method, url, **kwargs)
+
+    def diff(self):
+        """Return the changes in the format of the Ansible diff result."""
+        return [
+            {
+                "before_header": f"{method} {path}",
+                "after_header": f"{method} {path}",
+                "before": diff_value(before),
+                "after": diff_value(after),
+            }
+            for method, path, before, after in self.changes
+        ]
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request("PUT", url, **kwargs)
+
+    def patch(self, url, **kwargs):
+        return self.request("PATCH", url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request("DELETE", url, **kwargs)
+
+
+def matches(item, match):
+    """Return True if item matches every field of match.
+
+    match maps a field to a value, or to a collection of accepted values.
+    """
+    for field, expected in (match or {}).items():
+        value = item.get(field)
+        if isinstance(expected, (list, tuple, set, frozenset)):
+            if value not in expected:
+                return False
+        elif value != expected:
+            return False
+    return True
+
+
+def iter_collection(client, path, filters=None, match=None, page_size=None):
+    """Yield the objects of an AFC collection, one page at a time.
+
+    filters are sent as query parameters, for AFC to filter the objects,
+    match is applied to each object as it is read, see matches(). Pages
+    are requested with offset and limit so that only one page is held in
+    memory. An AFC answering with the whole list is read once. An AFC
+    answering with the first page again, ignoring offset, is read again
+    without pagination and the objects after the first page are yielded.
+    ValueError is raised if the collection cannot be read in full.
+    """
+    if page_size is None:
+        page_size = int(os.environ.get(AFC_PAGE_SIZE_ENV, DEFAULT_PAGE_SIZE))
+    separator = "&" if "?" in path else "?"
+    offset = 0
+    first_uuid = None
+    while True:
+        query = dict(filters or {}, offset=offset, limit=page_size)
+        page = read_page(client, path, f"{path}{separator}{urlencode(query)}")
+        if page and offset and page[0].get("uuid") == first_uuid:
+            yield from iter_unpaginated(
+                client,
+                path,
+                filters,
+                match,
+                first_uuid,
+                offset,
+            )
+            return
+        if page and not offset:
+            first_uuid = page[0].get("uuid")
+        for item in page:
+            if matches(item, match):
+                yield item
+        if len(page) != page_size:
+            return
+        offset += page_size
+
+
+def read_page(client, path, url):
+    """Return the list of objects answered by AFC to GET url."""
+    response = client.get(url)
+    if response.status_code not in utils.response_ok:
+        raise ValueError(
+            f"GET {path} returned {response.status_code}: {response.text}",
+        )
+    page = response.json()["result"] or []
+    if not isinstance(page, list):
+        page = [page]
+    return page
+
+
+def iter_unpaginated(client, path, filters, match, first_uuid, skip):
+    """Yield the objects of path after the skip ones already yielded.
+
+    Used when AFC ignores offset, the whole collection is then read in
+    one request.
+    """
+    url = path
+    if filters:
+        url = f"{path}{'&' if '?' in path else '?'}{urlencode(filters)}"
+    items = read_page(client, path, url)
+    if not items or items[0].get("uuid") != first_uuid:
+        raise ValueError(
+            f"GET {path} ignores offset and returned another first object",
+        )
+    for item in items[skip:]:
+        if matches(item, match):
+            yield item
+
+
+def iter_ports(client, switch_uuids=None, names=None, page_size=None):
+    """Yield the ports of the switches, all of them by default.
+
+    names limits the ports to the given port names or labels, e.g. 1/1/1.
+    """
+    names = set(names) if names else None
+    for switch_uuid in switch_uuids or [None]:
+        filters = {"switches": switch_uuid} if switch_uuid else None
+        for port in iter_collection(
+            client,
+            "ports",
+            filters=filters,
+            page_size=page_size,
+        ):
+            if names is None or (
+                port.get("name") in names or port.get("port_label") in names
+            ):
+                yield port
+
+
+def read_switch_ports(client, switches, skip_unknown=False):
+    """Return the UUIDs of switches and their ports.
+
+    switches are IP addresses or names. The switches are resolved with one
+    request and their ports read with one request per page. Return the
+    UUID of each switch and the ports keyed by (switch, port name), raise
+    ValueError for an unknown switch, or leave it out with skip_unknown.
+    """
+    switch_uuids = {}
+    for switch in iter_collection(client, "switches"):
+        for key in (switch.get("ip_address"), switch.get("name")):
+            if key:
+                switch_uuids.setdefault(key, switch["uuid"])
+    missing = sorted(
+        {switch for switch in switches if switch not in switch_uuids},
+    )
+    if missing and not skip_unknown:
+        raise ValueError(f"unknown switches {', '.join(missing)}")
+    switches = [switch for switch in switches if switch in switch_uuids]
+
+    selected = {}
+    for switch in switches:
+        selected.setdefault(switch_uuids[switch], []).append(switch)
+    ports = {}
+    for port in iter_collection(
+        client,
+        "ports",
+        filters={"switches": ",".join(sorted(selected))},
+    ):
+        for switch in selected.get(port.get("switch_uuid"), []):
+            for name in (port.get("name"), port.get("port_label")):
+                ports.setdefault((switch, name), port)
+    return (
+        {switch: switch_uuids[switch] for switch in switches},
+        ports,
+    )
+
+
+def batches(items, batch_size):
+    """Split the list items into lists of batch_size items.
+
+    A batch_size lower than 1 returns all the items in one list.
+    """
+    if not batch_size or batch_size < 1:
+        return [items] if items else []
+    return [
+        items[index:index + batch_size]
+        for index in range(0, len(items), batch_size)
+    ]
+
+
+VLAN_ID_MIN = 1
+VLAN_ID_MAX = 4094
+# Fields of ports, LAGs and VLAN groups holding VLAN ranges
+VLAN_RANGE_FIELDS = ("ungrouped_vlans", "vlans")
+
+
+class VlanSet:
+    """Set of VLAN IDs held as a 4096-bit bitmap, bit n for VLAN n.
+
+    Parsed from the range strings used by AFC, e.g. "10-20,30", from a
+    VLAN ID or a list of both, and formatted back to the canonical range
+    string, sorted and with the contiguous VLANs merged into ranges. The
+    set operations are integer operations on the bitmaps.
+
+    Example:
+        trunk = VlanSet.parse("10-20,30")
+        str(trunk | VlanSet.parse([21, 22]))    # "10-22,30"
+        str(trunk - VlanSet.parse("15-40"))     # "10-14"
+    """
+
+    __slots__ = ("bits",)
+
+    def __init__(self, bits=0):
+        self.bits = bits
+
+    @classmethod
+    def parse(cls, value):
+        """Return the VlanSet of value, raise ValueError if invalid."""
+        if isinstance(value, VlanSet):
+            return cls(value.bits)
+        if value is None:
+            return cls()
+        if isinstance(value, bool):
+            raise ValueError(f"Invalid VLANs {value!r}")
+        if isinstance(value, int):
+            value = [value]
+        elif isinstance(value, str):
+            value = value.replace(" ", "").split(",")
+        bits = 0
+        for part in value:
+            if isinstance(part, int) and not isinstance(part, bool):
+                first = last = part
+            elif isinstance(part, str):
+                if not part:
+                    continue
+                first, sep, last = part.partition("-")
+                try:
+                    first = int(first)
+                    last = int(last) if sep else first
+                except ValueError:
+                    raise ValueError(f"Invalid VLAN range {part!r}") from None
+            else:
+                raise ValueError(f"Invalid VLANs {part!r}")
+            if not VLAN_ID_MIN <= first <= last <= VLAN_ID_MAX:
+                raise ValueError(f"Invalid VLAN range {part!r}")
+            bits |= ((1 << (last - first + 1)) - 1) << first
+        return cls(bits)
+
+    def ranges(self):
+        """Yield the (first, last) VLAN IDs of each range, in order."""
+        bits = self.bits
+        while bits:
+            first = (bits & -bits).bit_length() - 1
+            shifted = bits >> first
+            # Number of consecutive set bits from first
+            length = (shifted ^ (shifted + 1)).bit_length() - 1
+            yield first, first + length - 1
+            bits &= ~(((1 << length) - 1) << first)
+
+    def __str__(self):
+        return ",".join(
+            str(first) if first == last else f"{first}-{last}"
+            for first, last in self.ranges()
+        )
+
+    def __repr__(self):
+        return f"VlanSet({str(self)!r})"
+
+    def __iter__(self):
+        for first, last in self.ranges():
+            yield from range(first, last + 1)
+
+    def __len__(self):
+        return bin(self.bits).count("1")
+
+    def __bool__(self):
+        return bool(self.bits)
+
+    def __contains__(self, vlan):
+        return isinstance(vlan, int) and bool(self.bits >> vlan & 1)
+
+    def __eq__(self, other):
+        return isinstance(other, VlanSet) and self.bits == other.bits
+
+    def __hash__(self):
+        return hash(self.bits)
+
+    def __or__(self, other):
+        return VlanSet(self.bits | other.bits)
+
+    def __and__(self, other):
+        return VlanSet(self.bits & other.bits)
+
+    def __sub__(self, other):
+        return VlanSet(self.bits & ~other.bits)
+
+    def __xor__(self, other):
+        return VlanSet(self.bits ^ other.bits)
+
+    def issubset(self, other):
+        return not self.bits & ~other.bits
+
+
+def normalize_vlans(config, fields=VLAN_RANGE_FIELDS):
+    """Return a copy of config with its VLAN fields as canonical ranges.
+
+    A VLAN field may be given as a range string, a VLAN ID or a list of
+    both, AFC is sent the shortest range string.
+    """
+    if not isinstance(config, dict):
+        return config
+    return {
+        field: (
+            str(VlanSet.parse(value))
+            if field in fields and value is not None
+            else value
+        )
+        for field, value in config.items()
+    }
+
+
+# Object types of an AFC configuration snapshot and their collection, in
+# dependency order: an object only references objects of the types before
+# it. The IP interfaces are read per VRF.
+SNAPSHOT_TYPES = {
+    "fabrics": "fabrics",
+    "resource_pools": "resource_pool",
+    "vrfs": "vrfs",
+    "ip_interfaces": "vrfs/{vrf_uuid}/ip_interfaces",
+    "prefix_lists": "prefix_lists",
+    "community_lists": "community_lists",
+    "aspath_lists": "aspath_lists",
+    "route_maps": "route_maps",
+    "endpoint_groups": "endpoint_groups",
+    "qualifiers": "qualifiers",
+    "rules": "rules",
+    "policies": "policies",
+    "snmp": "snmp_configurations",
+    "syslog": "syslog_client_configurations",
+    "ntp": "ntp_client_configurations",
+    "dns": "dns_client_configurations?in_use_only=false",
+    "aaa": "auth/sources?type=radius",
+    "sflow": "sflow_configurations",
+    "stp": "spanning_tree/stp_configuration",
+}
+SNAPSHOT_MANIFEST = "manifest.json"
+# Values selecting several types of SNAPSHOT_TYPES
+SNAPSHOT_TYPE_GROUPS = {
+    "route_policies": (
+        "prefix_lists",
+        "community_lists",
+        "aspath_lists",
+        "route_maps",
+    ),
+    "dss": ("endpoint_groups", "qualifiers", "rules", "policies"),
+}
+# SNAPSHOT_TYPES grouped by dependency level, the objects of one level only
+# reference objects of the previous levels
+SNAPSHOT_LEVELS = (
+    ("fabrics", "resource_pools", "aaa"),
+    ("vrfs", "snmp", "syslog", "ntp", "dns", "sflow", "stp"),
+    ("ip_interfaces",),
+    (
+        "prefix_lists",
+        "community_lists",
+        "aspath_lists",
+        "endpoint_groups",
+        "qualifiers",
+    ),
+    ("route_maps", "rules"),
+    ("policies",),
+)
+
+
+def snapshot_types(object_types):
+    """Return the types selected by object_types, in SNAPSHOT_TYPES order.
+
+    object_types holds types of SNAPSHOT_TYPES, groups of
+    SNAPSHOT_TYPE_GROUPS or all.
+    """
+    selected = set()
+    for object_type in object_types:
+        if object_type == "all":
+            selected.update(SNAPSHOT_TYPES)
+        else:
+            selected.update(
+                SNAPSHOT_TYPE_GROUPS.get(object_type, (object_type,)),
+            )
+    return [
+        object_type
+        for object_type in SNAPSHOT_TYPES
+        if object_type in selected
+    ]
+
+
+def canonical_json(item):
+    """Return item as JSON with sorted keys, identical for equal objects."""
+    return json.dumps(
+        item,
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+
+
+def write_snapshot_object(snapshot_file, item, file_format):
+    """Append item to a snapshot file of format json or yaml."""
+    if file_format == "json":
+        snapshot_file.write(canonical_json(item) + "\n")
+    else:
+        yaml.safe_dump(
+            [item],
+            snapshot_file,
+            default_flow_style=False,
+            sort_keys=True,
+        )
+
+
+def read_snapshot(src, manifest, object_type):
+    """Yield the objects of object_type from the snapshot directory src.
+
+    manifest is the content of the SNAPSHOT_MANIFEST file of src.
+    """
+    path = os.path.join(src, manifest["types"][object_type]["file"])
+    with open(path) as snapshot_file:
+        if manifest["format"] == "json":
+            for line in snapshot_file:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from yaml.safe_load(snapshot_file) or []
+
+
+def iter_snapshot(client, object_type, page_size=None):
+    """Yield the objects of one type of SNAPSHOT_TYPES, sorted by UUID.
+
+    Only the objects of one type are held in memory, to be sorted, so that
+    two snapshots of the same configuration are identical whatever the
+    order AFC returns the objects in.
+    """
+    path = SNAPSHOT_TYPES[object_type]
+    if object_type == "ip_interfaces":
+        vrf_uuids = sorted(
+            vrf["uuid"]
+            for vrf in iter_collection(client, "vrfs", page_size=page_size)
+        )
+        for vrf_uuid in vrf_uuids:
+            interfaces = iter_collection(
+                client,
+                path.format(vrf_uuid=vrf_uuid),
+                page_size=page_size,
+            )
+            for interface in sorted(
+                interfaces,
+                key=lambda item: str(item.get("uuid")),
+            ):
+                yield dict(interface, vrf_uuid=vrf_uuid)
+        return
+    yield from sorted(
+        iter_collection(client, path, page_size=page_size),
+        key=lambda item: str(item.get("uuid")),
+    )
+
+
+def instantiate_afc_object(data=None, module=None):
+    if module is not None and getattr(module, "_socket_path", None):
+        return AfcConnection(module)
+    token_cache = AfcTokenCache.from_env()
+    if token_cache and data.get("username") and data.get("password"):
+        return token_cache.get_afc_session(data)
+    afc_instance = AfcClient(data=data)
     return afc_instance
+
+
+class AfcModule:
+    """Common behaviour shared by the afc_* modules.
+
+    Adds the authentication arguments to the module specific ones, logs in
+    lazily and only once, disconnects in a finally block and exits in the
+    same way for every module. With afc_timings, the durations of each
+    phase and the requests sent are returned in the timings result. In
+    check mode the writes of the module are not sent, an AfcChangeRecorder
+    reads the objects they target and reports whether the task would
+    change AFC, with the diff of the change when --diff is set. Modules
+    created with read_only=True do not send writes and run as usual.
+
+    Modules created with states, e.g. {"present": "create", "absent":
+    "delete"}, get a state option mapped to their operation. With state
+    present, run_module calls update_existing before creating an object,
+    which updates the object when it already exists.
+
+    Example:
+        def run_module(afc_module):
+            fabric_instance = fabric.Fabric(
+                afc_module.client,
+                name=afc_module.params["data"]["fabric"],
+            )
+            ...
+            return message, status, changed
+
+        def main():
+            afc_module = AfcModule(argument_spec={...})
+            afc_module.run(run_module)
+    """
+
+    def __init__(
+        self,
+        argument_spec,
+        supports_check_mode=True,
+        keep_session=False,
+        read_only=False,
+        states=None,
+        mutually_exclusive=None,
+        required_one_of=None,
+    ):
+        module_args = dict(afc_argument_spec)
+        module_args.update(argument_spec)
+        module_kwargs = {
+            "mutually_exclusive": list(mutually_exclusive or []),
+            "required_one_of": list(required_one_of or []),
+        }
+        if states:
+            operation = module_args["operation"]
+            module_args["operation"] = dict(operation, required=False)
+            module_args["state"] = {
+                "type": "str",
+                "required": False,
+                "choices": list(states),
+            }
+            module_kwargs["mutually_exclusive"].append(("operation", "state"))
+            if operation.get("required"):
+                module_kwargs["required_one_of"].append(("operation", "state"))
+        # Authentication arguments mapped to None are not exposed
+        module_args = {
+            name: spec
+            for name, spec in module_args.items()
+            if spec is not None
+        }
+        self.ansible_module = AnsibleModule(
+            argument_spec=module_args,
+            supports_check_mode=supports_check_mode,
+            **module_kwargs,
+        )
+        self.params = self.ansible_module.params
+        self.state = self.params.get("state") if states else None
+        if self.state:
+            self.params["operation"] = states[self.state]
+        self.keep_session = keep_session
+        self.read_only = read_only
+        self.result = {}
+        self.timings = AfcTimings() if self.params["afc_timings"] else None
+        self.recorder = None
+        self._afc_instance = None
+
+    @contextmanager
+    def phase(self, name):
+        """Time the block as phase name when afc_timings is enabled."""
+        if self.timings is None:
+            yield
+        else:
+            with self.timings.phase(name):
+                yield
+
+    @property
+    def auth_data(self):
+        if self.params.get("auth_token") is not None:
+            return {
+                "ip": self.params["afc_ip"],
+                "auth_token": self.params["auth_token"],
+            }
+        return {
+            "ip": self.params["afc_ip"],
+            "username": self.params["afc_username"],
+            "password": self.params["afc_password"],
+        }
+
+    @property
+    def afc_instance(self):
+        if self._afc_instance is None:
+            with self.phase("login"):
+                afc_instance = instantiate_afc_object(
+                    data=self.auth_data,
+                    module=self.ansible_module,
+                )
+            if afc_instance.client and self.timings is not None:
+                afc_instance.client = AfcInstrumentedClient(
+                    afc_instance.client,
+                    self.timings,
+                )
+            # Requests through httpapi are retried and their lookups cached
+            # by the connection plugin
+            if afc_instance.client and not isinstance(
+                afc_instance,
+                AfcConnection,
+            ):
+                afc_instance.client = AfcRetryingClient(
+                    afc_instance.client,
+                    AfcRetryPolicy.from_env(),
+                    AfcConcurrencyLimiter.from_env(self.auth_data["ip"]),
+                    self.timings,
+                )
+                resolution_cache = AfcResolutionFileCache.from_env(
+                    self.auth_data,
+                )
+                if resolution_cache:
+                    afc_instance.client = AfcCachingClient(
+                        afc_instance.client,
+                        resolution_cache,
+                    )
+            # Outermost, so that the writes skipped in check mode do not
+            # invalidate the cached lookups
+            if afc_instance.client and not self.read_only and (
+                self.ansible_module.check_mode or self.ansible_module._diff
+            ):
+                self.recorder = AfcChangeRecorder(
+                    afc_instance.client,
+                    self.ansible_module.check_mode,
+                )
+                afc_instance.client = self.recorder
+            self._afc_instance = afc_instance
+        return self._afc_instance
+
+    @property
+    def client(self):
+        return self.afc_instance.client
+
+    def disconnect(self):
+        afc_instance = self._afc_instance
+        self._afc_instance = None
+        if afc_instance is None or self.keep_session:
+            return
+        # Disconnect session if username and password are passed
+        if (
+            afc_instance.afc_connected
+            and self.params["afc_username"]
+            and self.params["afc_password"]
+        ):
+            afc_instance.disconnect()
+
+    def update_existing(self, path, name, body, lookup=None):
+        """Update the object name of path when it exists, with state present.
+
+        body() returns the desired fields of the object, it is only called
+        when the object exists. The object is read from lookup, path by
+        default, bypassing the cached lookups so that a stale object is not
+        compared or written back, and updated with a PUT of the current
+        object merged with the desired fields when they differ.
+
+        Returns the (message, status, changed) outcome of the update, or
+        None when the object does not exist and is created by run_module.
+        """
+        if self.state != "present":
+            return None
+        response = self.client.get(lookup or path, headers=NO_CACHE_HEADERS)
+        if response.status_code not in utils.response_ok:
+            return None
+        current = next(
+            (
+                item
+                for item in response.json()["result"]
+                if item.get("name") == name
+            ),
+            None,
+        )
+        if current is None:
+            return None
+        try:
+            desired = body()
+        except Exception as exc:
+            return (
+                f"An exception {exc} occurred while updating {name}",
+                False,
+                False,
+            )
+        if is_subset(desired, current):
+            return f"{name} is up to date - No action taken", True, False
+        response = self.client.put(
+            f"{path}/{current['uuid']}",
+            data=json.dumps(dict(current, **desired), default=str),
+        )
+        if response.status_code in utils.response_ok:
+            return f"Successfully updated {name}", True, True
+        return response.json()["result"], False, False
+
+    def exit(self, message, status, changed):
+        if self.timings is not None:
+            self.result["timings"] = self.timings.as_dict()
+        if status:
+            self.ansible_module.exit_json(
+                changed=changed,
+                msg=message,
+                **self.result,
+            )
+        else:
+            self.ansible_module.fail_json(
+                changed=changed,
+                msg=message,
+                **self.result,
+            )
+
+    def run(self, run_module):
+        """Run run_module(afc_module) and exit with its outcome.
+
+        run_module returns the (message, status, changed) tuple produced by
+        pyafc. Extra return values can be added to afc_module.result.
+        """
+        message = ""
+        status = False
+        changed = False
+        try:
+            if self.afc_instance.afc_connected:
+                with self.phase("operation"):
+                    try:
+                        message, status, changed = run_module(self)
+                    except AfcCheckModeStop as exc:
+                        message = f"Check mode: {exc} would change AFC"
+                        status = True
+            else:
+                message = "Not connected to AFC"
+        finally:
+            with self.phase("disconnect"):
+                self.disconnect()
+
+        if self.recorder is not None:
+            if self.ansible_module.check_mode:
+                changed = bool(self.recorder.changes)
+            if self.ansible_module._diff and self.recorder.changes:
+                self.result["diff"] = self.recorder.diff()
+        self.exit(message, status, changed)
@@ -40,7 +40,17 @@ options:
         choices:
             - create
             - delete
-        required: true
+        required: false
+    state:
+        description: >
+            Desired state, present or absent, to use instead of operation.
+            The configuration is read first and only created, updated or
+            deleted when it differs from the desired one.
+        type: str
+        choices:
+            - present
+            - absent
+        required: false
     data:
         description: >
             The radius configuration data for create operation. Structure is
@@ -77,6 +87,8 @@ options:
                         type: int
                         required: true
         required: true
+extends_documentation_fragment:
+    - arubanetworks.afc.afc
 author: Aruba Networks (@ArubaNetworks)
 """
 
@@ -143,93 +155,71 @@ changed:
     type: bool
     returned: always
     sample: True
+timings:
+    description: >
+        Durations of the phases of the task and HTTP requests sent to AFC,
+        see the notes.
+    type: dict
+    returned: when afc_timings is enabled
 """
 
 
-from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.arubanetworks.afc.plugins.module_utils.afc import (
-    instantiate_afc_object,
+    AfcModule,
+    model_body,
 )
-from pyafc.services import radius
+from pyafc.services import models, radius
 
 
-def main():
-    module_args = {
-        "afc_ip": {"type": "str", "required": True},
-        "afc_username": {"type": "str", "required": False},
-        "afc_password": {"type": "str", "required": False},
-        "auth_token": {"type": "str", "required": False},
-        "operation": {"type": "str", "required": True},
-        "data": {"type": "dict", "required": False},
-    }
+def aaa_body(data):
+    return model_body(models.RadiusSource(**data))
 
-    ansible_module = AnsibleModule(
-        argument_spec=module_args,
-        supports_check_mode=True,
-    )
 
-    # Get playbook"s arguments
-    token = None
-    ip = ansible_module.params["afc_ip"]
-    if "afc_username" in list(ansible_module.params.keys()):
-        username = ansible_module.params["afc_username"]
-    if "afc_password" in list(ansible_module.params.keys()):
-        password = ansible_module.params["afc_password"]
-    if "auth_token" in list(ansible_module.params.keys()):
-        token = ansible_module.params["auth_token"]
-    operation = ansible_module.params["operation"]
-    data = ansible_module.params["data"]
-
-    if token is not None:
-        auth_data = {
-            "ip": ip,
-            "auth_token": token,
-        }
-    else:
-        auth_data = {
-            "ip": ip,
-            "username": username,
-            "password": password,
-        }
-
-    afc_instance = instantiate_afc_object(data=auth_data)
-
-    result = {"changed": False}
-
-    if ansible_module.check_mode:
-        ansible_module.exit_json(**result)
+def run_module(afc_module):
+    afc_instance = afc_module.afc_instance
+    operation = afc_module.params["operation"]
+    data = afc_module.params["data"]
 
     status = False
     changed = False
     message = ""
 
-    if afc_instance.afc_connected:
-        radius_instance = radius.Radius(
-            afc_instance.client,
-            name=data["name"],
+    if operation == "create":
+        outcome = afc_module.update_existing(
+            "auth/sources",
+            data["name"],
+            lambda: aaa_body(data),
+            lookup="auth/sources?type=radius",
         )
-        if operation == "create":
-            message, status, changed = radius_instance.create_radius(**data)
-        elif operation == "delete":
-            if radius_instance.uuid:
-                message, status, changed = radius_instance.delete_radius()
-            else:
-                message = "Radius Server does not exist - No action taken"
-        # Disconnect session if username and password are passed
-        if username and password:
-            afc_instance.disconnect()
-    else:
-        message = "Not connected to AFC"
-
-    result["message"] = message
-    result["status"] = status
-    result["changed"] = changed
-
-    # Exit
-    if status:
-        ansible_module.exit_json(changed=changed, msg=message)
-    else:
-        ansible_module.fail_json(changed=changed, msg=message)
+        if outcome is not None:
+            return outcome
+
+    radius_instance = radius.Radius(
+        afc_instance.client,
+        name=data["name"],
+    )
+    if operation == "create":
+        message, status, changed = radius_instance.create_radius(**data)
+    elif operation == "delete":
+        if radius_instance.uuid:
+            message, status, changed = radius_instance.delete_radius()
+        else:
+            message = "Radius Server does not exist - No action taken"
+
+    return message, status, changed
+
+
+def main():
+    module_args = {
+        "operation": {"type": "str", "required": True},
+        "data": {"type": "dict", "required": False},
+    }
+
+    afc_module = AfcModule(
+        argument_spec=module_args,
+        states={"present": "create", "absent": "delete"},
+    )
+    afc_module.run(run_module)
 
 
 if __name__ == "__main__":
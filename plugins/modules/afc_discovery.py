@@ -60,6 +60,8 @@ options:
                 default: admin
                 required: false
 
+extends_documentation_fragment:
+    - arubanetworks.afc.afc
 author: Aruba Networks (@ArubaNetworks)
 """
 
@@ -116,78 +118,45 @@ changed:
     type: bool
     returned: always
     sample: True
+timings:
+    description: >
+        Durations of the phases of the task and HTTP requests sent to AFC,
+        see the notes.
+    type: dict
+    returned: when afc_timings is enabled
 """
 
-from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.arubanetworks.afc.plugins.module_utils.afc import (
-    instantiate_afc_object,
+    AfcModule,
 )
 from pyafc.switches import switches
 
 
-def main():
-    module_args = {
-        "afc_ip": {"type": "str", "required": True},
-        "afc_username": {"type": "str", "required": False},
-        "afc_password": {"type": "str", "required": False},
-        "auth_token": {"type": "str", "required": False},
-        "data": {"type": "dict", "required": True},
-    }
+def run_module(afc_module):
+    afc_instance = afc_module.afc_instance
+    data = afc_module.params["data"]
 
-    ansible_module = AnsibleModule(
-        argument_spec=module_args,
-        supports_check_mode=True,
-    )
-
-    # Get playbook's arguments
-    token = None
-    ip = ansible_module.params["afc_ip"]
-    if "afc_username" in list(ansible_module.params.keys()):
-        username = ansible_module.params["afc_username"]
-    if "afc_password" in list(ansible_module.params.keys()):
-        password = ansible_module.params["afc_password"]
-    if "auth_token" in list(ansible_module.params.keys()):
-        token = ansible_module.params["auth_token"]
-    data = ansible_module.params["data"]
+    status = False
+    changed = False
+    message = ""
 
-    if token is not None:
-        auth_data = {"ip": ip, "auth_token": token}
-    else:
-        auth_data = {"ip": ip, "username": username, "password": password}
+    switches_instance = switches.Switch(
+        afc_instance.client,
+    )
+    message, status, changed = switches_instance.discover_multiple_devices(
+        **data,
+    )
 
-    result = {"changed": False}
+    return message, status, changed
 
-    if ansible_module.check_mode:
-        ansible_module.exit_json(**result)
 
-    status = False
-    changed = False
-    message = ""
+def main():
+    module_args = {
+        "data": {"type": "dict", "required": True},
+    }
 
-    afc_instance = instantiate_afc_object(data=auth_data)
-
-    if afc_instance.afc_connected:
-        switches_instance = switches.Switch(
-            afc_instance.client,
-        )
-        message, status, changed = switches_instance.discover_multiple_devices(
-            **data,
-        )
-        # Disconnect session if username and password are passed
-        if username and password:
-            afc_instance.disconnect()
-    else:
-        message = "Not connected to AFC"
-
-    result["message"] = message
-    result["status"] = status
-    result["changed"] = changed
-
-    # Exit
-    if status:
-        ansible_module.exit_json(changed=changed, msg=message)
-    else:
-        ansible_module.fail_json(changed=changed, msg=message)
+    afc_module = AfcModule(argument_spec=module_args)
+    afc_module.run(run_module)
 
 
 if __name__ == "__main__":
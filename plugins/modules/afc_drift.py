@@ -0,0 +1,358 @@
+#!/usr/bin/python
+
+# (C) Copyright 2020-2025 Hewlett Packard Enterprise Development LP.
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+
+DOCUMENTATION = r"""
+---
+module: afc_drift
+version_added: "1.1.0"
+short_description: Detect the AFC objects which drifted from a baseline.
+description: >
+    This module reads the objects of the HPE ANW Fabric Composer once,
+    hashes each object and compares the hashes to a baseline, either a
+    snapshot written by afc_export or a baseline file of hashes written
+    by this module. Only the objects added, removed or modified since the
+    baseline are returned. Nothing is sent to AFC but reads, and the
+    module also runs in check mode.
+options:
+    afc_ip:
+        description: >
+            IP address of the HPE ANW Fabric Composer.
+        type: str
+        required: true
+    afc_username:
+        description:
+        - User account having read permission on the HPE ANW Fabric Composer
+        type: str
+        required: false
+    afc_password:
+        description:
+        - Password of the user account
+        type: str
+        required: false
+    auth_token:
+        description: >
+            Auth token from the create session playbook.
+        type: str
+        required: false
+    baseline:
+        description: >
+            Snapshot directory written by afc_export, holding the desired
+            objects, or JSON file of object hashes written with
+            update_baseline.
+        type: path
+        required: true
+    update_baseline:
+        description: >
+            Write the hashes of the objects read from AFC to the baseline
+            file, to accept the current state, e.g. after a push. The
+            differences with the previous baseline are still returned.
+        type: bool
+        default: false
+        required: false
+    object_types:
+        description: >
+            Types of objects to compare, with the same values as the
+            object_types option of afc_export. Only the types found in the
+            baseline are compared, unless update_baseline is set.
+        type: list
+        elements: str
+        default:
+            - all
+        required: false
+    ignore_fields:
+        description: >
+            Object fields left out of the hashes, at any depth of the
+            objects, such as operational status fields changing without a
+            configuration change.
+        type: list
+        elements: str
+        default: []
+        required: false
+extends_documentation_fragment:
+    - arubanetworks.afc.afc
+author: Aruba Networks (@ArubaNetworks)
+"""
+
+EXAMPLES = r"""
+-   name: Record the configuration pushed by the play
+    arubanetworks.afc.afc_drift:
+        afc_ip: "10.10.10.10"
+        afc_username: "afc_admin"
+        afc_password: "afc_password"
+        baseline: "/var/lib/afc/baseline.json"
+        update_baseline: true
+
+-   name: Check for changes made outside of Ansible
+    arubanetworks.afc.afc_drift:
+        afc_ip: "10.10.10.10"
+        afc_username: "afc_admin"
+        afc_password: "afc_password"
+        baseline: "/var/lib/afc/baseline.json"
+    register: drift
+
+-   name: Compare AFC to an exported snapshot
+    arubanetworks.afc.afc_drift:
+        afc_ip: "10.10.10.10"
+        afc_username: "afc_admin"
+        afc_password: "afc_password"
+        baseline: "/var/backups/afc"
+        object_types:
+            - vrfs
+            - route_policies
+"""
+
+RETURN = r"""
+message:
+    description: The output generated by the module
+    type: str
+    returned: always
+    sample: "2 objects drifted from the baseline"
+status:
+    description: True or False depending on the action taken
+    type: bool
+    returned: always
+    sample: True
+changed:
+    description: True when update_baseline changed the baseline file
+    type: bool
+    returned: always
+    sample: False
+drift:
+    description: True when at least one object differs from the baseline
+    type: bool
+    returned: always
+    sample: True
+differences:
+    description: >
+        Objects added, removed or modified since the baseline, sorted by
+        type of object and UUID.
+    type: list
+    elements: dict
+    returned: always
+    sample:
+        - object_type: vrfs
+          uuid: 8c5e3ac2-ac19-5057-8868-bc70ab760195
+          name: Aruba-VRF
+          change: modified
+objects:
+    description: Number of objects compared per type of object.
+    type: dict
+    returned: always
+    sample:
+        vrfs: 2
+"""
+
+import hashlib
+import os
+
+from ansible.module_utils.basic import missing_required_lib
+from ansible_collections.arubanetworks.afc.plugins.module_utils.afc import (
+    HAS_YAML,
+    SNAPSHOT_MANIFEST,
+    SNAPSHOT_TYPE_GROUPS,
+    SNAPSHOT_TYPES,
+    AfcModule,
+    canonical_json,
+    iter_snapshot,
+    read_json_file,
+    read_snapshot,
+    snapshot_types,
+    write_json_file,
+)
+
+
+def normalize(value, ignore_fields=()):
+    """Return value without ignore_fields and with sorted lists of strings.
+
+    The order of lists of UUIDs or names returned by AFC is not
+    significant, the order of lists of objects, e.g. route map entries, is
+    kept.
+    """
+    if isinstance(value, dict):
+        return {
+            key: normalize(item, ignore_fields)
+            for key, item in value.items()
+            if key not in ignore_fields
+        }
+    if isinstance(value, list):
+        if all(isinstance(item, str) for item in value):
+            return sorted(value)
+        return [normalize(item, ignore_fields) for item in value]
+    return value
+
+
+def object_hash(item, ignore_fields):
+    content = canonical_json(normalize(item, ignore_fields))
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def entry(item, ignore_fields):
+    return {
+        "sha256": object_hash(item, ignore_fields),
+        "name": item.get("name"),
+    }
+
+
+def load_baseline(path, object_types, ignore_fields, update_baseline):
+    """Return the object hashes of the baseline, per type and UUID."""
+    if os.path.isdir(path):
+        manifest = read_json_file(os.path.join(path, SNAPSHOT_MANIFEST))
+        if not manifest.get("types"):
+            raise ValueError(f"No snapshot in {path}")
+        if manifest["format"] == "yaml" and not HAS_YAML:
+            raise ValueError(missing_required_lib("PyYAML"))
+        return {
+            object_type: {
+                item.get("uuid"): entry(item, ignore_fields)
+                for item in read_snapshot(path, manifest, object_type)
+            }
+            for object_type in object_types
+            if object_type in manifest["types"]
+        }
+    baseline = read_json_file(path)
+    if baseline.get("ignore_fields", []) != ignore_fields:
+        # Hashes computed without the same fields are all different
+        if not update_baseline:
+            raise ValueError(
+                f"{path} was recorded with the ignore_fields "
+                f"{baseline.get('ignore_fields', [])}",
+            )
+        return {}
+    return baseline.get("types", {})
+
+
+def compare(object_type, live, baseline):
+    """Return the differences between the live and baseline hashes."""
+    differences = []
+    for uuid in sorted(set(live) | set(baseline), key=str):
+        if uuid not in baseline:
+            change = "added"
+        elif uuid not in live:
+            change = "removed"
+        elif live[uuid]["sha256"] != baseline[uuid]["sha256"]:
+            change = "modified"
+        else:
+            continue
+        differences.append(
+            {
+                "object_type": object_type,
+                "uuid": uuid,
+                "name": (live.get(uuid) or baseline[uuid]).get("name"),
+                "change": change,
+            },
+        )
+    return differences
+
+
+def detect_drift(afc_module, client):
+    params = afc_module.params
+    path = params["baseline"]
+    ignore_fields = sorted(params["ignore_fields"])
+    update_baseline = params["update_baseline"]
+    if update_baseline and os.path.isdir(path):
+        raise ValueError("update_baseline requires a baseline file")
+
+    object_types = snapshot_types(params["object_types"])
+    baseline = load_baseline(
+        path,
+        object_types,
+        ignore_fields,
+        update_baseline,
+    )
+    if not update_baseline:
+        object_types = [
+            object_type
+            for object_type in object_types
+            if object_type in baseline
+        ]
+        if not object_types:
+            raise ValueError(f"No object of the selected types in {path}")
+
+    live = {}
+    differences = []
+    for object_type in object_types:
+        live[object_type] = {
+            item.get("uuid"): entry(item, ignore_fields)
+            for item in iter_snapshot(client, object_type)
+        }
+        differences.extend(
+            compare(
+                object_type,
+                live[object_type],
+                baseline.get(object_type, {}),
+            ),
+        )
+
+    changed = False
+    if update_baseline:
+        # The types which were not compared are kept
+        content = {
+            "ignore_fields": ignore_fields,
+            "types": dict(baseline, **live),
+        }
+        changed = content != read_json_file(path)
+        if changed and not afc_module.ansible_module.check_mode:
+            write_json_file(path, content)
+    objects = {
+        object_type: len(hashes) for object_type, hashes in live.items()
+    }
+    return differences, objects, changed
+
+
+def run_module(afc_module):
+    afc_instance = afc_module.afc_instance
+
+    try:
+        differences, objects, changed = detect_drift(
+            afc_module,
+            afc_instance.client,
+        )
+    except (ValueError, KeyError, OSError) as exc:
+        return f"Unable to compare with the baseline: {exc}", False, False
+
+    afc_module.result["drift"] = bool(differences)
+    afc_module.result["differences"] = differences
+    afc_module.result["objects"] = objects
+    if differences:
+        message = f"{len(differences)} objects drifted from the baseline"
+    else:
+        message = f"No drift in {sum(objects.values())} objects"
+    return message, True, changed
+
+
+def main():
+    module_args = {
+        "baseline": {"type": "path", "required": True},
+        "update_baseline": {
+            "type": "bool",
+            "required": False,
+            "default": False,
+        },
+        "object_types": {
+            "type": "list",
+            "elements": "str",
+            "required": False,
+            "default": ["all"],
+            "choices": ["all"]
+            + list(SNAPSHOT_TYPES)
+            + list(SNAPSHOT_TYPE_GROUPS),
+        },
+        "ignore_fields": {
+            "type": "list",
+            "elements": "str",
+            "required": False,
+            "default": [],
+        },
+    }
+
+    # Only the baseline file is written, in check mode it is left as is
+    afc_module = AfcModule(argument_spec=module_args, read_only=True)
+    afc_module.run(run_module)
+
+
+if __name__ == "__main__":
+    main()
@@ -42,7 +42,17 @@ options:
             - create
             - delete
             - update
-        required: true
+        required: false
+    state:
+        description: >
+            Desired state, present or absent, to use instead of operation.
+            The configuration is read first and only created, updated or
+            deleted when it differs from the desired one.
+        type: str
+        choices:
+            - present
+            - absent
+        required: false
     data:
         description: >
             Object specific data for policy, endpoint_group, rule, qualifier
@@ -221,6 +231,8 @@ options:
                 required: true
         required: true
 
+extends_documentation_fragment:
+    - arubanetworks.afc.afc
 author: Aruba Networks (@ArubaNetworks)
 """
 
@@ -550,174 +562,227 @@ changed:
     type: bool
     returned: always
     sample: True
+timings:
+    description: >
+        Durations of the phases of the task and HTTP requests sent to AFC,
+        see the notes.
+    type: dict
+    returned: when afc_timings is enabled
 """
 
-from ansible.module_utils.basic import AnsibleModule
+import copy
+
 from ansible_collections.arubanetworks.afc.plugins.module_utils.afc import (
-    instantiate_afc_object,
+    AfcModule,
+    model_body,
 )
-from pyafc.dss import endpoint_groups, policies, qualifiers, rules
+from pyafc.dss import endpoint_groups, models, policies, qualifiers, rules
 from pyafc.fabric import fabric
+from pyafc.vrf import models as vrf_models
 from pyafc.vrf import vrf
 
+DSS_PATHS = {
+    "policy": "policies",
+    "rule": "rules",
+    "endpoint_group": "endpoint_groups",
+    "qualifier": "qualifiers",
+}
+
+
+def policy_body(client, data):
+    policy_instance = policies.Policy(client, name=data["name"])
+    values = copy.deepcopy(data)
+    if values.get("rules"):
+        values["rules"] = [
+            policy_instance._get_rules(rule) for rule in values["rules"]
+        ]
+    for enforcer in values.get("enforcers") or []:
+        enforcer["uuid"] = policy_instance._get_enforcer(**enforcer)
+    return model_body(models.PsmPolicies(**values))
+
+
+def rule_body(client, data):
+    rule_instance = rules.Rule(client, name=data["name"])
+    values = dict(data)
+    references = (
+        ("source_endpoint_groups", rule_instance._get_eg),
+        ("destination_endpoint_groups", rule_instance._get_eg),
+        ("service_qualifiers", rule_instance._get_qualifier),
+        ("applications", rule_instance._get_application),
+    )
+    for field, resolve in references:
+        if values.get(field):
+            values[field] = [resolve(item) for item in values[field]]
+    return model_body(models.PsmRule(**values))
+
+
+def endpoint_group_body(client, data):
+    eg_instance = endpoint_groups.EndpointGroup(client, name=data["name"])
+    values = copy.deepcopy(data)
+    for endpoint in values.get("endpoints") or []:
+        if (
+            endpoint.get("vm_name")
+            or endpoint.get("vm_tag")
+            or endpoint.get("vmkernel_adapter_name")
+        ):
+            (
+                endpoint["vsphere_uuid"],
+                endpoint["host_name"],
+                endpoint["ipv4_range"],
+            ) = eg_instance._get_vm_detail(**endpoint)
+        else:
+            endpoint["ipv4_range"] = endpoint["ip"]
+    return model_body(models.PsmEndpointGroups(**values))
 
-def main():
-    module_args = {
-        "afc_ip": {"type": "str", "required": True},
-        "afc_username": {"type": "str", "required": False},
-        "afc_password": {"type": "str", "required": False},
-        "auth_token": {"type": "str", "required": False},
-        "operation": {"type": "str", "required": True},
-        "data": {"type": "dict", "required": False},
-    }
 
-    ansible_module = AnsibleModule(
-        argument_spec=module_args,
-        supports_check_mode=True,
-    )
+def qualifier_body(client, data):
+    return model_body(models.PsmQualifiers(**data))
 
-    # Get playbook's arguments
-    token = None
-    ip = ansible_module.params["afc_ip"]
-    if "afc_username" in list(ansible_module.params.keys()):
-        username = ansible_module.params["afc_username"]
-    if "afc_password" in list(ansible_module.params.keys()):
-        password = ansible_module.params["afc_password"]
-    if "auth_token" in list(ansible_module.params.keys()):
-        token = ansible_module.params["auth_token"]
-    data = ansible_module.params["data"]
-    operation = ansible_module.params["operation"]
-
-    if token is not None:
-        auth_data = {"ip": ip, "auth_token": token}
-    else:
-        auth_data = {"ip": ip, "username": username, "password": password}
 
-    result = {"changed": False}
+DSS_BODIES = {
+    "policy": policy_body,
+    "rule": rule_body,
+    "endpoint_group": endpoint_group_body,
+    "qualifier": qualifier_body,
+}
+
 
-    if ansible_module.check_mode:
-        ansible_module.exit_json(**result)
+def run_module(afc_module):
+    afc_instance = afc_module.afc_instance
+    data = afc_module.params["data"]
+    operation = afc_module.params["operation"]
 
     status = False
     changed = False
     message = ""
 
-    afc_instance = instantiate_afc_object(data=auth_data)
-
-    if afc_instance.afc_connected:
-
-        if operation == "create":
-            if data["type"] == "policy":
-                policy_instance = policies.Policy(
-                    afc_instance.client,
-                    name=data["name"],
-                )
-                message, status, changed = policy_instance.create_policy(
-                    **data,
-                )
-            elif data["type"] == "rule":
-                rule_instance = rules.Rule(
-                    afc_instance.client,
-                    name=data["name"],
-                )
-                message, status, changed = rule_instance.create_rule(**data)
-            elif data["type"] == "endpoint_group":
-                eg_instance = endpoint_groups.EndpointGroup(
-                    afc_instance.client,
-                    **data,
-                )
-                message, status, changed = eg_instance.create_eg(**data)
-            elif data["type"] == "qualifier":
-                qualifier_instance = qualifiers.Qualifier(
-                    afc_instance.client,
-                    **data,
-                )
-                message, status, changed = qualifier_instance.create_qualifier(
-                    **data,
+    if operation == "create" and data["type"] in DSS_PATHS:
+        outcome = afc_module.update_existing(
+            DSS_PATHS[data["type"]],
+            data["name"],
+            lambda: DSS_BODIES[data["type"]](afc_instance.client, data),
+        )
+        if outcome is not None:
+            return outcome
+
+    if operation == "create":
+        if data["type"] == "policy":
+            policy_instance = policies.Policy(
+                afc_instance.client,
+                name=data["name"],
+            )
+            message, status, changed = policy_instance.create_policy(
+                **data,
+            )
+        elif data["type"] == "rule":
+            rule_instance = rules.Rule(
+                afc_instance.client,
+                name=data["name"],
+            )
+            message, status, changed = rule_instance.create_rule(**data)
+        elif data["type"] == "endpoint_group":
+            eg_instance = endpoint_groups.EndpointGroup(
+                afc_instance.client,
+                **data,
+            )
+            message, status, changed = eg_instance.create_eg(**data)
+        elif data["type"] == "qualifier":
+            qualifier_instance = qualifiers.Qualifier(
+                afc_instance.client,
+                **data,
+            )
+            message, status, changed = qualifier_instance.create_qualifier(
+                **data,
+            )
+        elif data["type"] == "network":
+            fabric_instance = fabric.Fabric(
+                afc_instance.client,
+                name=data["fabric"],
+            )
+            vrf_instance = vrf.Vrf(
+                afc_instance.client,
+                name=data["vrf"],
+                fabric_uuid=fabric_instance.uuid,
+            )
+            if vrf_instance.uuid:
+                outcome = afc_module.update_existing(
+                    f"vrfs/{vrf_instance.uuid}/networks",
+                    data["name"],
+                    lambda: model_body(vrf_models.Network(**data)),
                 )
-            elif data["type"] == "network":
-                fabric_instance = fabric.Fabric(
-                    afc_instance.client,
-                    name=data["fabric"],
-                )
-                vrf_instance = vrf.Vrf(
-                    afc_instance.client,
-                    name=data["vrf"],
-                    fabric_uuid=fabric_instance.uuid,
-                )
-                message, status, changed = vrf_instance.create_network(
-                    **data,
-                )
-        elif operation == "update":
-            if data["type"] == "network":
-                fabric_instance = fabric.Fabric(
-                    afc_instance.client,
-                    name=data["fabric"],
-                )
-                vrf_instance = vrf.Vrf(
-                    afc_instance.client,
-                    name=data["vrf"],
-                    fabric_uuid=fabric_instance.uuid,
-                )
-                message, status, changed = vrf_instance.update_network(
-                    **data,
-                )
-        elif operation == "delete":
-            if data["type"] == "policy":
-                policy_instance = policies.Policy(
-                    afc_instance.client,
-                    **data,
-                )
-                message, status, changed = policy_instance.delete_policy()
-            elif data["type"] == "rule":
-                rule_instance = rules.Rule(afc_instance.client, **data)
-                message, status, changed = rule_instance.delete_rule()
-            elif data["type"] == "endpoint_group":
-                eg_instance = endpoint_groups.EndpointGroup(
-                    afc_instance.client,
-                    **data,
-                )
-                message, status, changed = eg_instance.delete_eg()
-            elif data["type"] == "qualifier":
-                qualifier_instance = qualifiers.Qualifier(
-                    afc_instance.client,
-                    **data,
-                )
-                message, status, changed = (
-                    qualifier_instance.delete_qualifier()
-                )
-            elif data["type"] == "network":
-                fabric_instance = fabric.Fabric(
-                    afc_instance.client,
-                    **data,
-                )
-                vrf_instance = vrf.Vrf(
-                    afc_instance.client,
-                    name=data["vrf"],
-                    fabric_uuid=fabric_instance.uuid,
-                )
-                message, status, changed = vrf_instance.delete_network(
-                    **data,
-                )
-        else:
-            message = "Operation not supported - No action taken"
+                if outcome is not None:
+                    return outcome
+            message, status, changed = vrf_instance.create_network(
+                **data,
+            )
+    elif operation == "update":
+        if data["type"] == "network":
+            fabric_instance = fabric.Fabric(
+                afc_instance.client,
+                name=data["fabric"],
+            )
+            vrf_instance = vrf.Vrf(
+                afc_instance.client,
+                name=data["vrf"],
+                fabric_uuid=fabric_instance.uuid,
+            )
+            message, status, changed = vrf_instance.update_network(
+                **data,
+            )
+    elif operation == "delete":
+        if data["type"] == "policy":
+            policy_instance = policies.Policy(
+                afc_instance.client,
+                **data,
+            )
+            message, status, changed = policy_instance.delete_policy()
+        elif data["type"] == "rule":
+            rule_instance = rules.Rule(afc_instance.client, **data)
+            message, status, changed = rule_instance.delete_rule()
+        elif data["type"] == "endpoint_group":
+            eg_instance = endpoint_groups.EndpointGroup(
+                afc_instance.client,
+                **data,
+            )
+            message, status, changed = eg_instance.delete_eg()
+        elif data["type"] == "qualifier":
+            qualifier_instance = qualifiers.Qualifier(
+                afc_instance.client,
+                **data,
+            )
+            message, status, changed = (
+                qualifier_instance.delete_qualifier()
+            )
+        elif data["type"] == "network":
+            fabric_instance = fabric.Fabric(
+                afc_instance.client,
+                **data,
+            )
+            vrf_instance = vrf.Vrf(
+                afc_instance.client,
+                name=data["vrf"],
+                fabric_uuid=fabric_instance.uuid,
+            )
+            message, status, changed = vrf_instance.delete_network(
+                **data,
+            )
+    else:
+        message = "Operation not supported - No action taken"
 
-        # Disconnect session if username and password are passed
-        if username and password:
-            afc_instance.disconnect()
+    return message, status, changed
 
-    else:
-        message = "Not connected to AFC"
 
-    result["message"] = message
-    result["status"] = status
-    result["changed"] = changed
+def main():
+    module_args = {
+        "operation": {"type": "str", "required": True},
+        "data": {"type": "dict", "required": False},
+    }
 
-    # Exit
-    if status:
-        ansible_module.exit_json(changed=changed, msg=message)
-    else:
-        ansible_module.fail_json(changed=changed, msg=message)
+    afc_module = AfcModule(
+        argument_spec=module_args,
+        states={"present": "create", "absent": "delete"},
+    )
+    afc_module.run(run_module)
 
 
 if __name__ == "__main__":
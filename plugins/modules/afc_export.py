@@ -0,0 +1,333 @@
+#!/usr/bin/python
+
+# (C) Copyright 2020-2025 Hewlett Packard Enterprise Development LP.
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+
+DOCUMENTATION = r"""
+---
+module: afc_export
+version_added: "1.1.0"
+short_description: Export the AFC configuration to a snapshot directory.
+description: >
+    This module exports the fabrics, resource pools, VRFs, IP interfaces,
+    route policies, DSS objects, SNMP, syslog, NTP, DNS, AAA, sFlow and STP
+    configurations of the HPE ANW Fabric Composer to a directory, with one
+    file per type of object. The objects are written to the file as they
+    are read from AFC, one page at a time, with sorted keys. A manifest
+    records the hash of each file, the types whose content did not change
+    since the previous export are not rewritten.
+options:
+    afc_ip:
+        description: >
+            IP address of the HPE ANW Fabric Composer.
+        type: str
+        required: true
+    afc_username:
+        description:
+        - User account having read permission on the HPE ANW Fabric Composer
+        type: str
+        required: false
+    afc_password:
+        description:
+        - Password of the user account
+        type: str
+        required: false
+    auth_token:
+        description: >
+            Auth token from the create session playbook.
+        type: str
+        required: false
+    dest:
+        description: >
+            Directory of the snapshot, created if it does not exist.
+        type: path
+        required: true
+    format:
+        description: >
+            Format of the files, json writes one object per line.
+        type: str
+        choices:
+            - yaml
+            - json
+        default: yaml
+        required: false
+    object_types:
+        description: >
+            Types of objects to export. all exports every type. The
+            route_policies and dss values select the prefix lists,
+            community lists, AS path lists and route maps, and the
+            endpoint groups, qualifiers, rules and policies.
+        type: list
+        elements: str
+        choices:
+            - all
+            - fabrics
+            - resource_pools
+            - vrfs
+            - ip_interfaces
+            - route_policies
+            - prefix_lists
+            - community_lists
+            - aspath_lists
+            - route_maps
+            - dss
+            - endpoint_groups
+            - qualifiers
+            - rules
+            - policies
+            - snmp
+            - syslog
+            - ntp
+            - dns
+            - aaa
+            - sflow
+            - stp
+        default:
+            - all
+        required: false
+    incremental:
+        description: >
+            Keep the files whose content hash is the one recorded in the
+            manifest by the previous export. When disabled, every file is
+            rewritten.
+        type: bool
+        default: true
+        required: false
+extends_documentation_fragment:
+    - arubanetworks.afc.afc
+author: Aruba Networks (@ArubaNetworks)
+"""
+
+EXAMPLES = r"""
+-   name: Export the AFC configuration
+    arubanetworks.afc.afc_export:
+        afc_ip: "10.10.10.10"
+        afc_username: "afc_admin"
+        afc_password: "afc_password"
+        dest: "/var/backups/afc"
+
+-   name: Export the route policies as JSON
+    arubanetworks.afc.afc_export:
+        afc_ip: "10.10.10.10"
+        auth_token: "xxlkjlsdfluwoeirkjlkjsldjjjlkj23423ljlkj"
+        dest: "/var/backups/afc"
+        format: json
+        object_types:
+            - route_policies
+"""
+
+RETURN = r"""
+message:
+    description: The output generated by the module
+    type: str
+    returned: always
+    sample: "Exported 2 types of objects, 17 unchanged"
+status:
+    description: True or False depending on the action taken
+    type: bool
+    returned: always
+    sample: True
+changed:
+    description: True when at least one file was written
+    type: bool
+    returned: always
+    sample: True
+exported:
+    description: Types of objects whose file was written.
+    type: list
+    elements: str
+    returned: always
+    sample:
+        - vrfs
+        - ip_interfaces
+unchanged:
+    description: Types of objects whose file was kept as it was.
+    type: list
+    elements: str
+    returned: always
+    sample:
+        - fabrics
+manifest:
+    description: >
+        Content of the manifest.json file of the snapshot, with the hash,
+        number of objects and file name of each exported type.
+    type: dict
+    returned: always
+    sample:
+        format: yaml
+        types:
+            vrfs:
+                count: 2
+                file: vrfs.yaml
+                sha256: 9c56cc51b374c3ba189210d5b6d4bf57790d351c96c47c02190ecf1e430635ab
+"""
+
+import hashlib
+import os
+import tempfile
+
+from ansible.module_utils.basic import missing_required_lib
+from ansible_collections.arubanetworks.afc.plugins.module_utils.afc import (
+    HAS_YAML,
+    SNAPSHOT_MANIFEST,
+    SNAPSHOT_TYPE_GROUPS,
+    SNAPSHOT_TYPES,
+    AfcModule,
+    canonical_json,
+    iter_snapshot,
+    read_json_file,
+    snapshot_types,
+    write_json_file,
+    write_snapshot_object,
+)
+
+
+def hash_type(client, object_type):
+    """Return the hash of the objects of object_type and their number."""
+    digest = hashlib.sha256()
+    count = 0
+    for item in iter_snapshot(client, object_type):
+        digest.update(canonical_json(item).encode("utf-8") + b"\n")
+        count += 1
+    return digest.hexdigest(), count
+
+
+def export_type(client, dest, object_type, file_format):
+    """Write the objects of object_type to a temporary file of dest.
+
+    Return the path of the temporary file, the hash of the objects and
+    their number. The hash does not depend on the format of the file and
+    is the one of hash_type(). The file is only readable by its owner,
+    AAA sources include their secret.
+    """
+    digest = hashlib.sha256()
+    count = 0
+    tmp_fd, tmp_path = tempfile.mkstemp(
+        prefix=f".{object_type}.",
+        suffix=".tmp",
+        dir=dest,
+    )
+    try:
+        with os.fdopen(tmp_fd, "w") as snapshot_file:
+            if file_format == "yaml":
+                # An empty type is written as an empty list
+                snapshot_file.write("---\n")
+            for item in iter_snapshot(client, object_type):
+                digest.update(canonical_json(item).encode("utf-8") + b"\n")
+                write_snapshot_object(snapshot_file, item, file_format)
+                count += 1
+            if file_format == "yaml" and not count:
+                snapshot_file.write("[]\n")
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return tmp_path, digest.hexdigest(), count
+
+
+def export_snapshot(afc_module, client):
+    params = afc_module.params
+    dest = params["dest"]
+    file_format = params["format"]
+    check_mode = afc_module.ansible_module.check_mode
+
+    # In check mode nothing is written, the objects are only hashed
+    if not check_mode:
+        os.makedirs(dest, exist_ok=True)
+    manifest_path = os.path.join(dest, SNAPSHOT_MANIFEST)
+    previous = read_json_file(manifest_path)
+    if previous.get("format") != file_format:
+        previous = {}
+    manifest = {
+        "format": file_format,
+        "types": dict(previous.get("types", {})),
+    }
+
+    exported = []
+    unchanged = []
+    for object_type in snapshot_types(params["object_types"]):
+        if check_mode:
+            tmp_path = None
+            sha256, count = hash_type(client, object_type)
+        else:
+            tmp_path, sha256, count = export_type(
+                client,
+                dest,
+                object_type,
+                file_format,
+            )
+        file_name = f"{object_type}.{file_format}"
+        path = os.path.join(dest, file_name)
+        entry = {"sha256": sha256, "count": count, "file": file_name}
+        if (
+            params["incremental"]
+            and manifest["types"].get(object_type) == entry
+            and os.path.exists(path)
+        ):
+            if tmp_path:
+                os.unlink(tmp_path)
+            unchanged.append(object_type)
+            continue
+        if tmp_path:
+            os.replace(tmp_path, path)
+        manifest["types"][object_type] = entry
+        exported.append(object_type)
+
+    if exported and not check_mode:
+        write_json_file(manifest_path, manifest)
+    return manifest, exported, unchanged
+
+
+def run_module(afc_module):
+    afc_instance = afc_module.afc_instance
+
+    try:
+        manifest, exported, unchanged = export_snapshot(
+            afc_module,
+            afc_instance.client,
+        )
+    except (ValueError, KeyError, OSError) as exc:
+        return f"Unable to export the configuration: {exc}", False, False
+
+    afc_module.result["manifest"] = manifest
+    afc_module.result["exported"] = exported
+    afc_module.result["unchanged"] = unchanged
+    message = (
+        f"Exported {len(exported)} types of objects, "
+        f"{len(unchanged)} unchanged"
+    )
+    return message, True, bool(exported)
+
+
+def main():
+    module_args = {
+        "dest": {"type": "path", "required": True},
+        "format": {
+            "type": "str",
+            "required": False,
+            "default": "yaml",
+            "choices": ["yaml", "json"],
+        },
+        "object_types": {
+            "type": "list",
+            "elements": "str",
+            "required": False,
+            "default": ["all"],
+            "choices": ["all"]
+            + list(SNAPSHOT_TYPES)
+            + list(SNAPSHOT_TYPE_GROUPS),
+        },
+        "incremental": {"type": "bool", "required": False, "default": True},
+    }
+
+    # Nothing is changed on AFC, in check mode the snapshot is read and
+    # compared to the manifest but no file is written
+    afc_module = AfcModule(argument_spec=module_args, read_only=True)
+    if afc_module.params["format"] == "yaml" and not HAS_YAML:
+        afc_module.ansible_module.fail_json(msg=missing_required_lib("PyYAML"))
+    afc_module.run(run_module)
+
+
+if __name__ == "__main__":
+    main()
@@ -44,7 +44,17 @@ options:
             - create
             - assign
             - delete
-        required: true
+        required: false
+    state:
+        description: >
+            Desired state, present or absent, to use instead of operation.
+            The configuration is read first and only created, updated or
+            deleted when it differs from the desired one.
+        type: str
+        choices:
+            - present
+            - absent
+        required: false
     data:
         description: >
             Device assignment or Fabric Data.
@@ -76,6 +86,8 @@ options:
                 type: dict
                 required: false
 
+extends_documentation_fragment:
+    - arubanetworks.afc.afc
 author: Aruba Networks (@ArubaNetworks)
 """
 
@@ -167,96 +179,72 @@ changed:
     type: bool
     returned: always
     sample: True
+timings:
+    description: >
+        Durations of the phases of the task and HTTP requests sent to AFC,
+        see the notes.
+    type: dict
+    returned: when afc_timings is enabled
 """
 
-from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.arubanetworks.afc.plugins.module_utils.afc import (
-    instantiate_afc_object,
+    AfcModule,
+    model_body,
 )
-from pyafc.fabric import fabric
-
-
-def main():
-    module_args = {
-        "afc_ip": {"type": "str", "required": True},
-        "afc_username": {"type": "str", "required": False},
-        "afc_password": {"type": "str", "required": False},
-        "auth_token": {"type": "str", "required": False},
-        "operation": {"type": "str", "required": True},
-        "data": {"type": "dict", "required": False},
-    }
-
-    ansible_module = AnsibleModule(
-        argument_spec=module_args,
-        supports_check_mode=True,
-    )
-
-    # Get playbook's arguments
-    token = None
-    ip = ansible_module.params["afc_ip"]
-    if "afc_username" in list(ansible_module.params.keys()):
-        username = ansible_module.params["afc_username"]
-    if "afc_password" in list(ansible_module.params.keys()):
-        password = ansible_module.params["afc_password"]
-    if "auth_token" in list(ansible_module.params.keys()):
-        token = ansible_module.params["auth_token"]
-    data = ansible_module.params["data"]
-    operation = ansible_module.params["operation"]
+from pyafc.fabric import fabric, models
 
-    if token is not None:
-        auth_data = {"ip": ip, "auth_token": token}
-    else:
-        auth_data = {"ip": ip, "username": username, "password": password}
-
-    result = {"changed": False}
 
-    if ansible_module.check_mode:
-        ansible_module.exit_json(**result)
+def run_module(afc_module):
+    afc_instance = afc_module.afc_instance
+    data = afc_module.params["data"]
+    operation = afc_module.params["operation"]
 
     status = False
     changed = False
     message = ""
 
-    afc_instance = instantiate_afc_object(data=auth_data)
-
-    if afc_instance.afc_connected:
-
-        if operation == "create":
-            fabric_instance = fabric.Fabric(afc_instance.client, **data)
-            message, status, changed = fabric_instance.create_fabric(**data)
-        else:
-            fabric_instance = fabric.Fabric(
-                afc_instance.client,
-                name=data["fabric"],
-                **data,
-            )
-            if fabric_instance.uuid:
-                if operation == "delete":
-                    message, status, changed = fabric_instance.delete_fabric()
-                elif operation == "assign":
-                    message, status, changed = (
-                        fabric_instance.add_multiple_to_fabric(**data)
-                    )
-                else:
-                    message = "Operation not supported - No action taken"
+    if operation == "create":
+        outcome = afc_module.update_existing(
+            "fabrics",
+            data["name"],
+            lambda: model_body(models.Fabric(**data)),
+        )
+        if outcome is not None:
+            return outcome
+        fabric_instance = fabric.Fabric(afc_instance.client, **data)
+        message, status, changed = fabric_instance.create_fabric(**data)
+    else:
+        fabric_instance = fabric.Fabric(
+            afc_instance.client,
+            name=data["fabric"],
+            **data,
+        )
+        if fabric_instance.uuid:
+            if operation == "delete":
+                message, status, changed = fabric_instance.delete_fabric()
+            elif operation == "assign":
+                message, status, changed = (
+                    fabric_instance.add_multiple_to_fabric(**data)
+                )
             else:
-                message = "Fabric does not exist - No action Taken"
-        # Disconnect session if username and password are passed
-        if username and password:
-            afc_instance.disconnect()
+                message = "Operation not supported - No action taken"
+        else:
+            message = "Fabric does not exist - No action Taken"
 
-    else:
-        message = "Not connected to AFC"
+    return message, status, changed
 
-    result["message"] = message
-    result["status"] = status
-    result["changed"] = changed
 
-    # Exit
-    if status:
-        ansible_module.exit_json(changed=changed, msg=message)
-    else:
-        ansible_module.fail_json(changed=changed, msg=message)
+def main():
+    module_args = {
+        "operation": {"type": "str", "required": True},
+        "data": {"type": "dict", "required": False},
+    }
+
+    afc_module = AfcModule(
+        argument_spec=module_args,
+        states={"present": "create", "absent": "delete"},
+    )
+    afc_module.run(run_module)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,335 @@
+#!/usr/bin/python
+
+# (C) Copyright 2020-2025 Hewlett Packard Enterprise Development LP.
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+
+DOCUMENTATION = r"""
+---
+module: afc_facts
+version_added: "1.1.0"
+short_description: Gather facts about the objects configured in AFC.
+description: >
+    This module reads the fabrics, switches, ports, VRFs, IP interfaces,
+    VLAN groups, LAGs, route policies and DSS objects configured in the
+    HPE ANW Fabric Composer and returns them as the afc_facts fact.
+    The subsets are fetched concurrently over one session. The module
+    does not change anything and also runs in check mode.
+options:
+    afc_ip:
+        description: >
+            IP address of the HPE ANW Fabric Composer.
+        type: str
+        required: true
+    afc_username:
+        description:
+        - User account having read permission on the HPE ANW Fabric Composer
+        type: str
+        required: false
+    afc_password:
+        description:
+        - Password of the user account
+        type: str
+        required: false
+    auth_token:
+        description: >
+            Auth token from the create session playbook.
+        type: str
+        required: false
+    gather_subset:
+        description: >
+            Subsets of facts to gather. all gathers every subset. The
+            fabrics are always read from AFC, to add the fabric name to the
+            other objects.
+        type: list
+        elements: str
+        choices:
+            - all
+            - fabrics
+            - switches
+            - ports
+            - vrfs
+            - ip_interfaces
+            - vlan_groups
+            - lags
+            - route_policies
+            - dss
+        default:
+            - all
+        required: false
+    switches:
+        description: >
+            Names or IP addresses of the switches whose ports are gathered
+            by the ports subset. The ports of all the switches are gathered
+            by default.
+        type: list
+        elements: str
+        required: false
+    max_workers:
+        description: >
+            Number of requests sent at the same time to AFC.
+        type: int
+        default: 4
+        required: false
+extends_documentation_fragment:
+    - arubanetworks.afc.afc
+author: Aruba Networks (@ArubaNetworks)
+"""
+
+EXAMPLES = r"""
+-   name: Gather all the facts
+    arubanetworks.afc.afc_facts:
+        afc_ip: "10.10.10.10"
+        afc_username: "afc_admin"
+        afc_password: "afc_password"
+
+-   name: Gather the switches and VRFs facts
+    arubanetworks.afc.afc_facts:
+        afc_ip: "10.10.10.10"
+        auth_token: "xxlkjlsdfluwoeirkjlkjsldjjjlkj23423ljlkj"
+        gather_subset:
+            - switches
+            - vrfs
+
+-   name: Create the VRF if it does not exist yet
+    arubanetworks.afc.afc_vrf:
+        afc_ip: "10.10.10.10"
+        auth_token: "xxlkjlsdfluwoeirkjlkjsldjjjlkj23423ljlkj"
+        operation: "create"
+        data:
+            name: "Aruba-VRF"
+            fabric: "Aruba-Fabric"
+    when: >
+        afc_facts.vrfs
+        | selectattr('fabric', 'equalto', 'Aruba-Fabric')
+        | selectattr('name', 'equalto', 'Aruba-VRF')
+        | list | length == 0
+"""
+
+RETURN = r"""
+message:
+    description: The output generated by the module
+    type: str
+    returned: always
+    sample: "Successfully gathered facts"
+status:
+    description: True or False depending on the action taken
+    type: bool
+    returned: always
+    sample: True
+changed:
+    description: Always False, the module does not change anything
+    type: bool
+    returned: always
+    sample: False
+ansible_facts:
+    description: >
+        The afc_facts fact, with one list of objects per gathered subset,
+        as returned by AFC and sorted by name. The fabric, switch and VRF
+        names are added next to the fabric_uuid, switch_uuid and vrf_uuid
+        fields, as fabric, switch and vrf. The ports are sorted by switch
+        and name. route_policies and dss are dictionaries of lists, per
+        type of object.
+    type: dict
+    returned: always
+    sample:
+        afc_facts:
+            gather_subset:
+                - fabrics
+                - vrfs
+            fabrics:
+                - name: Aruba-Fabric
+                  uuid: 1b4c2a2e-62a3-4ec4-9c57-2e0c8c2f8a11
+            vrfs:
+                - name: default
+                  fabric: Aruba-Fabric
+                  fabric_uuid: 1b4c2a2e-62a3-4ec4-9c57-2e0c8c2f8a11
+                  uuid: 6f1c9d0e-8c1b-4b52-9a5e-0e4f2f1d3a77
+timings:
+    description: >
+        Durations of the phases of the task and HTTP requests sent to AFC,
+        see the notes.
+    type: dict
+    returned: when afc_timings is enabled
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from ansible_collections.arubanetworks.afc.plugins.module_utils.afc import (
+    AfcModule,
+    iter_ports,
+)
+from pyafc.common import utils
+
+# AFC endpoints read for each subset, ip_interfaces are read per VRF and
+# ports page by page
+SUBSET_ENDPOINTS = {
+    "fabrics": {"fabrics": "fabrics"},
+    "switches": {"switches": "switches"},
+    "ports": {},
+    "vrfs": {"vrfs": "vrfs"},
+    "ip_interfaces": {"vrfs": "vrfs"},
+    "vlan_groups": {"vlan_groups": "vlan_groups"},
+    "lags": {"lags": "lags"},
+    "route_policies": {
+        "route_maps": "route_maps",
+        "prefix_lists": "prefix_lists",
+        "community_lists": "community_lists",
+        "aspath_lists": "aspath_lists",
+    },
+    "dss": {
+        "policies": "policies",
+        "rules": "rules",
+        "endpoint_groups": "endpoint_groups",
+        "qualifiers": "qualifiers",
+    },
+}
+# Subsets whose objects reference switches by UUID
+SWITCH_REFERENCES = ("switches", "ports", "ip_interfaces", "lags")
+
+
+def get_result(client, path):
+    """Return the result of GET path, raise ValueError on failure."""
+    response = client.get(path)
+    if response.status_code not in utils.response_ok:
+        raise ValueError(f"GET {path} returned {response.status_code}")
+    return response.json()["result"]
+
+
+def add_names(item, names):
+    """Add the names of the fabric, switch and VRF referenced by item."""
+    for field, name_field in (
+        ("fabric_uuid", "fabric"),
+        ("switch_uuid", "switch"),
+        ("vrf_uuid", "vrf"),
+    ):
+        if item.get(field) in names and name_field not in item:
+            item[name_field] = names[item[field]]
+    return item
+
+
+def normalize(items, names):
+    if not isinstance(items, list):
+        items = [items] if items else []
+    return sorted(
+        (add_names(dict(item), names) for item in items),
+        key=lambda item: str(item.get("name") or item.get("uuid") or ""),
+    )
+
+
+def gather_ports(client, switches, selected, names):
+    """Return the ports of the selected switches, read page by page."""
+    switch_uuids = None
+    if selected:
+        switch_uuids = [
+            switch["uuid"]
+            for switch in switches or []
+            if switch.get("name") in selected
+            or switch.get("ip_address") in selected
+        ]
+        if not switch_uuids:
+            return []
+    return sorted(
+        (add_names(port, names) for port in iter_ports(client, switch_uuids)),
+        key=lambda port: (str(port.get("switch")), str(port.get("name"))),
+    )
+
+
+def gather_facts(client, gather_subset, max_workers, switches=None):
+    subsets = [
+        subset
+        for subset in SUBSET_ENDPOINTS
+        if "all" in gather_subset or subset in gather_subset
+    ]
+    paths = {"fabrics"}
+    if any(subset in SWITCH_REFERENCES for subset in subsets):
+        paths.add("switches")
+    for subset in subsets:
+        paths.update(SUBSET_ENDPOINTS[subset].values())
+    paths = sorted(paths)
+
+    with ThreadPoolExecutor(max_workers=max(max_workers, 1)) as executor:
+        results = dict(
+            zip(
+                paths,
+                executor.map(lambda path: get_result(client, path), paths),
+            ),
+        )
+        if "ip_interfaces" in subsets:
+            vrfs = results["vrfs"] or []
+            ip_interfaces = executor.map(
+                lambda vrf: get_result(
+                    client,
+                    f"vrfs/{vrf['uuid']}/ip_interfaces",
+                ),
+                vrfs,
+            )
+            results["ip_interfaces"] = [
+                dict(interface, vrf_uuid=vrf["uuid"])
+                for vrf, interfaces in zip(vrfs, ip_interfaces)
+                for interface in interfaces or []
+            ]
+
+    names = {}
+    for path in ("fabrics", "switches", "vrfs"):
+        for item in results.get(path) or []:
+            names[item["uuid"]] = item.get("name")
+
+    facts = {"gather_subset": subsets}
+    for subset in subsets:
+        if subset == "ports":
+            facts[subset] = gather_ports(
+                client,
+                results["switches"],
+                switches,
+                names,
+            )
+        elif subset == "ip_interfaces":
+            facts[subset] = normalize(results["ip_interfaces"], names)
+        elif subset in ("route_policies", "dss"):
+            facts[subset] = {
+                name: normalize(results[path], names)
+                for name, path in SUBSET_ENDPOINTS[subset].items()
+            }
+        else:
+            facts[subset] = normalize(results[subset], names)
+    return facts
+
+
+def run_module(afc_module):
+    afc_instance = afc_module.afc_instance
+
+    try:
+        facts = gather_facts(
+            afc_instance.client,
+            afc_module.params["gather_subset"],
+            afc_module.params["max_workers"],
+            afc_module.params["switches"],
+        )
+    except (ValueError, KeyError) as exc:
+        return f"Unable to gather facts: {exc}", False, False
+
+    afc_module.result["ansible_facts"] = {"afc_facts": facts}
+    return "Successfully gathered facts", True, False
+
+
+def main():
+    module_args = {
+        "gather_subset": {
+            "type": "list",
+            "elements": "str",
+            "required": False,
+            "default": ["all"],
+            "choices": ["all"] + list(SUBSET_ENDPOINTS),
+        },
+        "switches": {"type": "list", "elements": "str", "required": False},
+        "max_workers": {"type": "int", "required": False, "default": 4},
+    }
+
+    afc_module = AfcModule(argument_spec=module_args, read_only=True)
+    afc_module.run(run_module)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,437 @@
+#!/usr/bin/python
+
+# (C) Copyright 2020-2025 Hewlett Packard Enterprise Development LP.
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+
+DOCUMENTATION = r"""
+---
+module: afc_import
+version_added: "1.1.0"
+short_description: Restore an AFC configuration snapshot.
+description: >
+    This module applies a snapshot written by afc_export to the HPE ANW
+    Fabric Composer. The objects are applied in dependency order, fabrics,
+    resource pools and AAA sources first, then VRFs and the fabric
+    services, IP interfaces, route policy lists and DSS groups, route maps
+    and DSS rules, and DSS policies last. The objects of one level are
+    applied concurrently. An object is matched to an existing one by UUID,
+    then by name within its fabric or VRF, it is created when missing and
+    updated when it differs from the snapshot. The UUIDs of the created
+    objects replace the ones of the snapshot in the objects referencing
+    them.
+options:
+    afc_ip:
+        description: >
+            IP address of the HPE ANW Fabric Composer.
+        type: str
+        required: true
+    afc_username:
+        description:
+        - User account having write permission on the HPE ANW Fabric Composer
+        type: str
+        required: false
+    afc_password:
+        description:
+        - Password of the user account
+        type: str
+        required: false
+    auth_token:
+        description: >
+            Auth token from the create session playbook.
+        type: str
+        required: false
+    src:
+        description: >
+            Directory of the snapshot written by afc_export.
+        type: path
+        required: true
+    object_types:
+        description: >
+            Types of objects to import, with the same values as the
+            object_types option of afc_export. The objects referenced by
+            the imported ones must already exist.
+        type: list
+        elements: str
+        default:
+            - all
+        required: false
+    update:
+        description: >
+            Update the existing objects which differ from the snapshot.
+            When disabled, only the missing objects are created.
+        type: bool
+        default: true
+        required: false
+    max_workers:
+        description: >
+            Number of objects of one dependency level applied at the same
+            time.
+        type: int
+        default: 4
+        required: false
+extends_documentation_fragment:
+    - arubanetworks.afc.afc
+author: Aruba Networks (@ArubaNetworks)
+"""
+
+EXAMPLES = r"""
+-   name: Export the configuration of the lab fabric
+    arubanetworks.afc.afc_export:
+        afc_ip: "10.10.10.10"
+        afc_username: "afc_admin"
+        afc_password: "afc_password"
+        dest: "/var/backups/afc"
+
+-   name: Rebuild the lab fabric from the snapshot
+    arubanetworks.afc.afc_import:
+        afc_ip: "10.10.10.20"
+        afc_username: "afc_admin"
+        afc_password: "afc_password"
+        src: "/var/backups/afc"
+        max_workers: 8
+"""
+
+RETURN = r"""
+message:
+    description: The output generated by the module
+    type: str
+    returned: always
+    sample: "Imported 12 objects, 40 unchanged"
+status:
+    description: True or False depending on the action taken
+    type: bool
+    returned: always
+    sample: True
+changed:
+    description: True when at least one object was created or updated
+    type: bool
+    returned: always
+    sample: True
+objects:
+    description: >
+        Number of objects created, updated, unchanged and failed per type
+        of object.
+    type: dict
+    returned: always
+    sample:
+        vrfs:
+            created: 1
+            updated: 0
+            unchanged: 1
+            failed: 0
+errors:
+    description: >
+        Errors of the objects which could not be applied. The levels
+        following a level with errors are not applied.
+    type: list
+    elements: str
+    returned: always
+    sample:
+        - "vrfs Aruba-VRF: POST vrfs returned 400"
+"""
+
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from ansible.module_utils.basic import missing_required_lib
+from ansible_collections.arubanetworks.afc.plugins.module_utils.afc import (
+    HAS_YAML,
+    SNAPSHOT_LEVELS,
+    SNAPSHOT_MANIFEST,
+    SNAPSHOT_TYPE_GROUPS,
+    SNAPSHOT_TYPES,
+    AfcModule,
+    canonical_json,
+    iter_snapshot,
+    read_json_file,
+    read_snapshot,
+    snapshot_types,
+)
+from pyafc.common import utils
+
+# Fields scoping the name of an object
+SCOPE_FIELDS = ("fabric_uuid", "vrf_uuid", "switch_uuid")
+# Types created at another path than the one they are read and updated at
+CREATE_PATHS = {"aaa": "auth/sources/radius"}
+# Types created by a POST of a list of objects
+LIST_BODY_TYPES = ("ip_interfaces",)
+# Fields added by the export, which are not fields of the objects
+EXPORT_FIELDS = {"ip_interfaces": ("vrf_uuid",)}
+ACTIONS = ("created", "updated", "unchanged", "failed")
+
+
+def check_snapshot(src, manifest, object_types):
+    """Raise ValueError if a file does not match the manifest."""
+    for object_type in object_types:
+        entry = manifest["types"][object_type]
+        digest = hashlib.sha256()
+        for item in read_snapshot(src, manifest, object_type):
+            digest.update(canonical_json(item).encode("utf-8") + b"\n")
+        if digest.hexdigest() != entry["sha256"]:
+            raise ValueError(
+                f"{entry['file']} does not match {SNAPSHOT_MANIFEST}",
+            )
+
+
+def remap(value, uuid_map):
+    """Replace the snapshot UUIDs of value by the UUIDs of the objects."""
+    if isinstance(value, dict):
+        return {key: remap(item, uuid_map) for key, item in value.items()}
+    if isinstance(value, list):
+        return [remap(item, uuid_map) for item in value]
+    if isinstance(value, str):
+        return uuid_map.get(value, value)
+    return value
+
+
+def identity(item):
+    """Return the key matching item to an object of another AFC, or None."""
+    if not item.get("name"):
+        return None
+    return (item["name"],) + tuple(item.get(field) for field in SCOPE_FIELDS)
+
+
+def is_applied(item, existing):
+    return all(
+        canonical_json(existing.get(field)) == canonical_json(value)
+        for field, value in item.items()
+    )
+
+
+def collection_path(object_type, item, create=False):
+    """Return the path at which item is created or updated."""
+    path = SNAPSHOT_TYPES[object_type]
+    if create:
+        path = CREATE_PATHS.get(object_type, path)
+    path = path.split("?")[0]
+    return path.format(vrf_uuid=item.get("vrf_uuid"))
+
+
+def object_body(object_type, item):
+    """Return item without the fields added to it by the export."""
+    return {
+        field: value
+        for field, value in item.items()
+        if field not in EXPORT_FIELDS.get(object_type, ())
+    }
+
+
+def created_uuid(response):
+    """Return the UUID of the object created by response, if returned."""
+    try:
+        result = response.json().get("result")
+    except (ValueError, AttributeError):
+        return None
+    if isinstance(result, list) and len(result) == 1:
+        result = result[0]
+    if isinstance(result, dict):
+        return result.get("uuid")
+    return None
+
+
+class SnapshotImporter:
+    """Apply the objects of a snapshot, one dependency level at a time."""
+
+    def __init__(self, client, update, max_workers):
+        self.client = client
+        self.update = update
+        self.max_workers = max(max_workers, 1)
+        # UUID in the snapshot: UUID of the object in AFC
+        self.uuid_map = {}
+        self.counts = {}
+        self.errors = []
+
+    def existing_objects(self, object_type):
+        by_uuid = {}
+        by_identity = {}
+        for item in iter_snapshot(self.client, object_type):
+            by_uuid[item.get("uuid")] = item
+            key = identity(item)
+            if key is not None:
+                by_identity[key] = item
+        return by_uuid, by_identity
+
+    def apply(self, object_type, item, existing):
+        """Create or update item, return (action, UUID in AFC, error)."""
+        by_uuid, by_identity = existing
+        snapshot_uuid = item.get("uuid")
+        item = remap(item, self.uuid_map)
+        current = by_uuid.get(snapshot_uuid) or by_identity.get(
+            identity(item),
+        )
+        path = collection_path(object_type, item, create=current is None)
+        if current is None:
+            body = object_body(object_type, item)
+            body.pop("uuid", None)
+            if object_type in LIST_BODY_TYPES:
+                body = [body]
+            method = "POST"
+            response = self.client.post(path, data=json.dumps(body))
+        else:
+            item["uuid"] = current.get("uuid")
+            if is_applied(item, current) or not self.update:
+                return "unchanged", current.get("uuid"), None
+            method = "PUT"
+            if current.get("uuid"):
+                path = f"{path}/{current['uuid']}"
+            response = self.client.put(
+                path,
+                data=json.dumps(object_body(object_type, item)),
+            )
+        if response.status_code not in utils.response_ok:
+            return (
+                "failed",
+                None,
+                f"{object_type} {item.get('name') or snapshot_uuid}: "
+                f"{method} {path} returned {response.status_code}",
+            )
+        if current is None:
+            return "created", created_uuid(response), None
+        return "updated", current.get("uuid"), None
+
+    def resolve_created(self, object_type, created):
+        """Map the created objects whose UUID was not returned by AFC."""
+        missing = [
+            item for item in created if item["uuid"] not in self.uuid_map
+        ]
+        if not missing:
+            return
+        _by_uuid, by_identity = self.existing_objects(object_type)
+        for item in missing:
+            current = by_identity.get(identity(remap(item, self.uuid_map)))
+            if current and current.get("uuid"):
+                self.uuid_map[item["uuid"]] = current["uuid"]
+
+    def apply_level(self, objects, executor):
+        """Apply the objects of one level, a list of (type, object)."""
+        object_types = sorted({object_type for object_type, _ in objects})
+        existing = dict(
+            zip(
+                object_types,
+                executor.map(self.existing_objects, object_types),
+            ),
+        )
+        # The UUIDs are mapped once every object of the level is applied
+        outcomes = list(
+            executor.map(
+                lambda entry: self.apply(
+                    entry[0],
+                    entry[1],
+                    existing[entry[0]],
+                ),
+                objects,
+            ),
+        )
+        created = {}
+        for (object_type, item), (action, uuid, error) in zip(
+            objects,
+            outcomes,
+        ):
+            counts = self.counts.setdefault(
+                object_type,
+                dict.fromkeys(ACTIONS, 0),
+            )
+            counts[action] += 1
+            if error:
+                self.errors.append(error)
+            if uuid and item.get("uuid"):
+                self.uuid_map[item["uuid"]] = uuid
+            elif action == "created" and item.get("uuid"):
+                created.setdefault(object_type, []).append(item)
+        for object_type, items in created.items():
+            self.resolve_created(object_type, items)
+
+    def run(self, src, manifest, object_types):
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for level in SNAPSHOT_LEVELS:
+                objects = [
+                    (object_type, item)
+                    for object_type in level
+                    if object_type in object_types
+                    for item in read_snapshot(src, manifest, object_type)
+                ]
+                if objects:
+                    self.apply_level(objects, executor)
+                if self.errors:
+                    return
+
+
+def import_snapshot(afc_module, client):
+    params = afc_module.params
+    src = params["src"]
+    manifest = read_json_file(os.path.join(src, SNAPSHOT_MANIFEST))
+    if not manifest.get("types"):
+        raise ValueError(f"No snapshot in {src}")
+    if manifest.get("format") == "yaml" and not HAS_YAML:
+        afc_module.ansible_module.fail_json(msg=missing_required_lib("PyYAML"))
+    object_types = [
+        object_type
+        for object_type in snapshot_types(params["object_types"])
+        if object_type in manifest["types"]
+    ]
+    # A partial or edited snapshot is rejected before anything is applied
+    check_snapshot(src, manifest, object_types)
+
+    importer = SnapshotImporter(
+        client,
+        params["update"],
+        params["max_workers"],
+    )
+    importer.run(src, manifest, object_types)
+    return importer
+
+
+def run_module(afc_module):
+    afc_instance = afc_module.afc_instance
+
+    try:
+        importer = import_snapshot(afc_module, afc_instance.client)
+    except (ValueError, KeyError, OSError) as exc:
+        return f"Unable to import the snapshot: {exc}", False, False
+
+    afc_module.result["objects"] = importer.counts
+    afc_module.result["errors"] = importer.errors
+    totals = dict.fromkeys(ACTIONS, 0)
+    for counts in importer.counts.values():
+        for action, count in counts.items():
+            totals[action] += count
+    changed = bool(totals["created"] or totals["updated"])
+    if importer.errors:
+        message = (
+            f"Unable to import {totals['failed']} objects: "
+            f"{'; '.join(importer.errors)}"
+        )
+        return message, False, changed
+    message = (
+        f"Imported {totals['created'] + totals['updated']} objects, "
+        f"{totals['unchanged']} unchanged"
+    )
+    return message, True, changed
+
+
+def main():
+    module_args = {
+        "src": {"type": "path", "required": True},
+        "object_types": {
+            "type": "list",
+            "elements": "str",
+            "required": False,
+            "default": ["all"],
+            "choices": ["all"]
+            + list(SNAPSHOT_TYPES)
+            + list(SNAPSHOT_TYPE_GROUPS),
+        },
+        "update": {"type": "bool", "required": False, "default": True},
+        "max_workers": {"type": "int", "required": False, "default": 4},
+    }
+
+    afc_module = AfcModule(argument_spec=module_args)
+    afc_module.run(run_module)
+
+
+if __name__ == "__main__":
+    main()
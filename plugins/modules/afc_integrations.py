@@ -143,94 +143,54 @@ options:
         default: false
         required: false
 
+extends_documentation_fragment:
+  - arubanetworks.afc.afc
 author:
   - Aruba Networks (@ArubaNetworks)
 """
 
-from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.arubanetworks.afc.plugins.module_utils.afc import (
-    instantiate_afc_object,
+    AfcModule,
 )
 from pyafc.integrations import integrations
 
 
-def main():
-    module_args = {
-        "afc_ip": {"type": "str", "required": True},
-        "afc_username": {"type": "str", "required": False},
-        "afc_password": {"type": "str", "required": False},
-        "auth_token": {"type": "str", "required": False},
-        "operation": {"type": "str", "required": False},
-        "data": {"type": "dict", "required": True},
-    }
-
-    ansible_module = AnsibleModule(
-        argument_spec=module_args,
-        supports_check_mode=True,
-    )
-
-    # Get playbook's arguments
-    token = None
-    ip = ansible_module.params["afc_ip"]
-    if "afc_username" in list(ansible_module.params.keys()):
-        username = ansible_module.params["afc_username"]
-    if "afc_password" in list(ansible_module.params.keys()):
-        password = ansible_module.params["afc_password"]
-    if "auth_token" in list(ansible_module.params.keys()):
-        token = ansible_module.params["auth_token"]
-    operation = ansible_module.params["operation"]
-    data = ansible_module.params["data"]
-
-    if token is not None:
-        auth_data = {"ip": ip, "auth_token": token}
-    else:
-        auth_data = {"ip": ip, "username": username, "password": password}
-
-    result = {"changed": False}
-
-    if ansible_module.check_mode:
-        ansible_module.exit_json(**result)
+def run_module(afc_module):
+    afc_instance = afc_module.afc_instance
+    operation = afc_module.params["operation"]
+    data = afc_module.params["data"]
 
     status = False
     changed = False
     message = ""
 
-    afc_instance = instantiate_afc_object(data=auth_data)
-
-    if afc_instance.afc_connected:
-
-        integration_instance = integrations.Integration(afc_instance.client)
-
-        if operation == "create":
-            if data["type"] == "vmware_vsphere":
-                message, status, changed = (
-                    integration_instance.create_vmware_vsphere(**data)
-                )
-            elif data["type"] == "pensando_psm":
-                message, status, changed = integration_instance.create_psm(
-                    **data,
-                )
-            else:
-                message = "Integration type not supported - No action taken"
+    integration_instance = integrations.Integration(afc_instance.client)
+
+    if operation == "create":
+        if data["type"] == "vmware_vsphere":
+            message, status, changed = (
+                integration_instance.create_vmware_vsphere(**data)
+            )
+        elif data["type"] == "pensando_psm":
+            message, status, changed = integration_instance.create_psm(
+                **data,
+            )
         else:
-            message = "Operation not supported - No action taken"
+            message = "Integration type not supported - No action taken"
+    else:
+        message = "Operation not supported - No action taken"
 
-        # Disconnect session if username and password are passed
-        if username and password:
-            afc_instance.disconnect()
+    return message, status, changed
 
-    else:
-        message = "Not connected to AFC"
 
-    result["message"] = message
-    result["status"] = status
-    result["changed"] = changed
+def main():
+    module_args = {
+        "operation": {"type": "str", "required": False},
+        "data": {"type": "dict", "required": True},
+    }
 
-    # Exit
-    if status:
-        ansible_module.exit_json(changed=changed, msg=message)
-    else:
-        ansible_module.fail_json(changed=changed, msg=message)
+    afc_module = AfcModule(argument_spec=module_args)
+    afc_module.run(run_module)
 
 
 if __name__ == "__main__":
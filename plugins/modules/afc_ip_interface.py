@@ -41,7 +41,18 @@ options:
         choices:
             - create
             - delete
-        required: true
+        required: false
+    state:
+        description: >
+            Desired state, present or absent, to use instead of operation.
+            The configuration is created when it is missing and deleted when
+            it exists. An existing configuration given in data is not
+            updated, the ones given in interfaces are.
+        type: str
+        choices:
+            - present
+            - absent
+        required: false
     data:
         description: >
             IP Interface data containing if_type, vlan, active_gateway,
@@ -115,8 +126,29 @@ options:
                 type: list
                 elements: str
                 required: false
-        required: true
+        required: false
+    interfaces:
+        description: >
+            IP interfaces to create or delete in bulk, each with the
+            structure of data, fabric and vrf included. The fabrics and
+            VRFs are resolved once, the existing IP interfaces of each VRF
+            read once, and the interfaces of a VRF created by requests of
+            batch_size interfaces. The interfaces which already exist on a
+            switch are compared with the given fields and updated by a PUT
+            when they differ. Mutually exclusive with data.
+        type: list
+        elements: dict
+        required: false
+    batch_size:
+        description: >
+            Number of IP interfaces, one per switch, created by one request
+            with interfaces.
+        type: int
+        default: 100
+        required: false
 
+extends_documentation_fragment:
+    - arubanetworks.afc.afc
 author: Aruba Networks (@ArubaNetworks)
 """
 
@@ -263,6 +295,37 @@ EXAMPLES = r"""
             switches:
                 - "10.10.10.7"
 
+-   name: Create the SVIs of a tenant in bulk
+    arubanetworks.afc.afc_ip_interface:
+        afc_ip: "10.10.10.10"
+        afc_username: "afc_admin"
+        afc_password: "afc_password"
+        state: present
+        interfaces:
+            -   fabric: "Aruba-Fabric"
+                vrf: "Tenant-VRF"
+                name: "VLAN301"
+                vlan: 301
+                if_type: vlan
+                ipv4_primary_address:
+                    address: "10.3.1.2-10.3.1.9"
+                    prefix_length: 24
+                active_gateway:
+                    ipv4_address: "10.3.1.1"
+                    mac_address: "00:00:00:00:00:01"
+                switches:
+                    - "leaf"
+            -   fabric: "Aruba-Fabric"
+                vrf: "Tenant-VRF"
+                name: "VLAN302"
+                vlan: 302
+                if_type: vlan
+                ipv4_primary_address:
+                    address: "10.3.2.2-10.3.2.9"
+                    prefix_length: 24
+                switches:
+                    - "leaf"
+
 -   name: Create IP Interface using token
     arubanetworks.afc.afc_ip_interface:
         afc_ip: "10.10.10.10"
@@ -414,106 +477,508 @@ changed:
     type: bool
     returned: always
     sample: True
+interfaces:
+    description: >
+        Outcome of each IP interface of interfaces, created, updated,
+        deleted, unchanged or failed.
+    type: list
+    elements: dict
+    returned: when interfaces is set
+    sample:
+        - fabric: Aruba-Fabric
+          vrf: Tenant-VRF
+          name: VLAN301
+          action: created
+errors:
+    description: Errors of the IP interfaces of interfaces which failed.
+    type: list
+    elements: str
+    returned: when interfaces is set
+    sample:
+        - "Tenant-VRF VLAN302: Not enough IP addresses"
+timings:
+    description: >
+        Durations of the phases of the task and HTTP requests sent to AFC,
+        see the notes.
+    type: dict
+    returned: when afc_timings is enabled
 """
 
-from ansible.module_utils.basic import AnsibleModule
+import ipaddress
+import json
+
 from ansible_collections.arubanetworks.afc.plugins.module_utils.afc import (
-    instantiate_afc_object,
+    AfcModule,
+    batches,
+    is_subset,
+    iter_collection,
+    model_body,
+    read_switch_ports,
 )
+from pyafc.common import exceptions, utils
 from pyafc.fabric import fabric
-from pyafc.vrf import vrf
-
+from pyafc.vrf import models, vrf
+
+# Fields of an entry of interfaces which are not IP interface fields
+GROUP_FIELDS = ("fabric", "vrf", "switches")
+
+
+class IpInterfaceBatch:
+    """Create or delete the IP interfaces of one VRF in bulk.
+
+    The IP interfaces of the VRF, the internal LAGs of the routed ports
+    and the ports of their switches are read once for all the interfaces,
+    and the switches of each list of switches resolved once.
+    """
+
+    def __init__(self, client, vrf_instance, fabric_name, batch_size):
+        self.client = client
+        self.vrf = vrf_instance
+        self.fabric = fabric_name
+        self.batch_size = max(batch_size, 1)
+        self.path = f"vrfs/{vrf_instance.uuid}/ip_interfaces"
+        self.existing = list(iter_collection(client, self.path))
+        self._switch_uuids = {}
+        self._internal_lags = None
+        self._routed_switches = {}
+        self._routed_ports = {}
+        # (fabric, VRF, name, action) of each interface and the errors
+        self.outcomes = []
+        self.errors = []
+
+    def record(self, interface, action, error=None):
+        self.outcomes.append(
+            {
+                "fabric": self.fabric,
+                "vrf": self.vrf.name,
+                "name": interface["name"],
+                "action": action,
+            },
+        )
+        if error:
+            self.errors.append(
+                f"{self.vrf.name} {interface['name']}: {error}",
+            )
 
-def main():
-    module_args = {
-        "afc_ip": {"type": "str", "required": True},
-        "afc_username": {"type": "str", "required": False},
-        "afc_password": {"type": "str", "required": False},
-        "auth_token": {"type": "str", "required": False},
-        "operation": {"type": "str", "required": False},
-        "data": {"type": "dict", "required": True},
-    }
+    def switch_uuids(self, switches):
+        """Return the UUIDs of a list of switches, IPs, ranges or roles."""
+        if isinstance(switches, str):
+            switches = [switches]
+        key = tuple(switches)
+        if key not in self._switch_uuids:
+            values = utils.populate_list_fabrics_switches(
+                self.client,
+                {"switches": list(switches), "roles_fabrics": [self.fabric]},
+            )
+            self._switch_uuids[key] = [
+                uuid for uuid in values["switch_uuids"] if uuid
+            ]
+        return self._switch_uuids[key]
+
+    @staticmethod
+    def routed_switch(interface):
+        switches = interface["switches"]
+        return switches if isinstance(switches, str) else switches[0]
+
+    def read_routed_ports(self, interfaces):
+        """Read the internal LAGs and the ports of the routed interfaces.
+
+        The ports of all their switches are read in one go, an unknown
+        switch only fails its interfaces.
+        """
+        switches = sorted(
+            {
+                self.routed_switch(interface)
+                for interface in interfaces
+                if interface.get("if_type") == "routed"
+                and interface.get("switches")
+            },
+        )
+        if not switches:
+            return
+        self._internal_lags = list(
+            iter_collection(
+                self.client,
+                "lags",
+                filters={"type": "internal"},
+            ),
+        )
+        self._routed_switches, self._routed_ports = read_switch_ports(
+            self.client,
+            switches,
+            skip_unknown=True,
+        )
 
-    ansible_module = AnsibleModule(
-        argument_spec=module_args,
-        supports_check_mode=True,
+    def routed_values(self, interface):
+        """Return the internal LAG fields of a routed port interface."""
+        switch = self.routed_switch(interface)
+        if switch not in self._routed_switches:
+            raise ValueError(f"unknown switch {switch}")
+        port = self._routed_ports.get((switch, interface["interface"]))
+        for lag in self._internal_lags or []:
+            properties = lag["port_properties"][0]
+            if (
+                port
+                and lag["name"] == f"LAG#{interface['interface']}"
+                and properties["port_uuids"][0] == port["uuid"]
+            ):
+                return {
+                    "lag_uuid": lag["uuid"],
+                    "fabric_uuid": lag["fabric_uuid"],
+                    "switch_uuid": properties["switch_uuid"],
+                }
+        raise ValueError(f"port {interface['interface']} not found")
+
+    def values(self, interface, switch_uuid, address):
+        """Return the fields of the IP interface of one switch."""
+        values = {
+            field: value
+            for field, value in interface.items()
+            if field not in GROUP_FIELDS
+        }
+        values["switch_uuid"] = switch_uuid
+        values["ipv4_primary_address"] = dict(
+            interface["ipv4_primary_address"],
+            address=address,
+        )
+        if values["if_type"] == "routed":
+            values.update(self.routed_values(interface))
+        return models.IPInterface(**values)
+
+    def changes(self, interface, used_ips):
+        """Return the IP interfaces to create and to update.
+
+        One interface is created per missing switch. The existing ones are
+        compared with the given fields and updated when they differ, an
+        existing address within a range is kept. The other addresses of a
+        range are picked among the ones not used in the VRF nor by the
+        previous interfaces. The updates are (existing object, PUT body).
+        """
+        switch_uuids = self.switch_uuids(interface["switches"])
+        if not switch_uuids:
+            raise ValueError("No device found")
+        existing = {
+            item.get("switch_uuid"): item
+            for item in self.existing
+            if item.get("name") == interface["name"]
+            and item.get("switch_uuid") in switch_uuids
+        }
+        address = interface["ipv4_primary_address"]["address"]
+        addresses = {}
+        if "-" in address:
+            first, last = (
+                int(ipaddress.IPv4Address(bound))
+                for bound in address.split("-")
+            )
+            for switch_uuid, item in existing.items():
+                current = (item.get("ipv4_primary_address") or {}).get(
+                    "address",
+                )
+                if current and first <= int(
+                    ipaddress.IPv4Address(current),
+                ) <= last:
+                    addresses[switch_uuid] = current
+            missing = [
+                uuid for uuid in switch_uuids if uuid not in addresses
+            ]
+            picked = []
+            for value in range(first, last + 1):
+                if len(picked) == len(missing):
+                    break
+                if str(ipaddress.IPv4Address(value)) not in used_ips:
+                    picked.append(str(ipaddress.IPv4Address(value)))
+            if len(picked) < len(missing):
+                raise ValueError("Not enough IP addresses")
+            used_ips.update(picked)
+            addresses.update(zip(missing, picked))
+        else:
+            addresses = {uuid: address for uuid in switch_uuids}
+
+        payloads = []
+        updates = []
+        for switch_uuid in switch_uuids:
+            model = self.values(interface, switch_uuid, addresses[switch_uuid])
+            item = existing.get(switch_uuid)
+            if item is None:
+                payloads.append(model.dict(exclude_none=True))
+                continue
+            desired = model_body(model)
+            if not is_subset(desired, item):
+                updates.append((item, dict(item, **desired)))
+        return payloads, updates
+
+    def update(self, updates):
+        """PUT the updated IP interfaces, return the errors."""
+        errors = []
+        for item, body in updates:
+            response = self.client.put(
+                f"{self.path}/{item['uuid']}",
+                data=json.dumps(body),
+            )
+            if response.status_code not in utils.response_ok:
+                errors.append(
+                    f"PUT {self.path}/{item['uuid']} returned "
+                    f"{response.status_code}: {response.text}",
+                )
+        return errors
+
+    def created_keys(self):
+        """Return the (name, switch UUID) of the IP interfaces of the VRF.
+
+        Read again after a failed bulk POST, AFC having possibly created
+        some of its interfaces.
+        """
+        try:
+            return {
+                (item.get("name"), item.get("switch_uuid"))
+                for item in iter_collection(self.client, self.path)
+            }
+        except ValueError:
+            return set()
+
+    def create(self, interfaces):
+        self.read_routed_ports(interfaces)
+        used_ips = {
+            item["ipv4_primary_address"]["address"]
+            for item in self.existing
+            if item.get("ipv4_primary_address")
+        }
+        pending = []
+        for interface in interfaces:
+            try:
+                payloads, updates = self.changes(interface, used_ips)
+            except (ValueError, KeyError, TypeError) as exc:
+                self.record(interface, "failed", exc)
+                continue
+            except exceptions.NoDeviceFound:
+                self.record(interface, "failed", "No device found")
+                continue
+            errors = self.update(updates)
+            if errors:
+                self.record(interface, "failed", "; ".join(errors))
+                continue
+            if not payloads:
+                self.record(
+                    interface,
+                    "updated" if updates else "unchanged",
+                )
+            pending.extend((interface, payload) for payload in payloads)
+
+        # The payloads of an interface may be split across two batches,
+        # its outcome is recorded once every batch is sent
+        created = {}
+        failed = {}
+        for batch in batches(pending, self.batch_size):
+            response = self.client.post(
+                self.path,
+                data=json.dumps([payload for _interface, payload in batch]),
+            )
+            keys = None
+            if response.status_code not in utils.response_ok:
+                keys = self.created_keys()
+            for interface, payload in batch:
+                created[id(interface)] = interface
+                if keys is not None and (
+                    payload.get("name"),
+                    payload["switch_uuid"],
+                ) not in keys:
+                    failed[id(interface)] = (
+                        f"POST {self.path} returned "
+                        f"{response.status_code}: {response.text}"
+                    )
+        for key, interface in created.items():
+            if key in failed:
+                self.record(interface, "failed", failed[key])
+            else:
+                self.record(interface, "created")
+
+    def delete(self, interfaces):
+        for interface in interfaces:
+            try:
+                switch_uuids = self.switch_uuids(interface["switches"])
+            except (ValueError, KeyError, TypeError) as exc:
+                self.record(interface, "failed", exc)
+                continue
+            except exceptions.NoDeviceFound:
+                self.record(interface, "failed", "No device found")
+                continue
+            selected = [
+                item
+                for item in self.existing
+                if item.get("switch_uuid") in switch_uuids
+                and (
+                    item.get("name") == interface["name"]
+                    or (
+                        interface.get("vlan") is not None
+                        and item.get("vlan") == interface["vlan"]
+                    )
+                )
+            ]
+            if not selected:
+                self.record(interface, "unchanged")
+                continue
+            failed = []
+            for item in selected:
+                response = self.client.delete(f"{self.path}/{item['uuid']}")
+                if response.status_code not in utils.response_ok:
+                    failed.append(
+                        f"DELETE {self.path}/{item['uuid']} returned "
+                        f"{response.status_code}",
+                    )
+            if failed:
+                self.record(interface, "failed", "; ".join(failed))
+            else:
+                self.record(interface, "deleted")
+
+
+def run_bulk(afc_module, client):
+    operation = afc_module.params["operation"]
+    if operation not in ("create", "delete"):
+        return "Operation not supported - No action taken", False, False
+
+    groups = {}
+    for interface in afc_module.params["interfaces"]:
+        missing = [
+            field
+            for field in ("fabric", "vrf", "name", "switches")
+            if not interface.get(field)
+        ]
+        if missing:
+            return (
+                f"IP interface {interface.get('name')} without "
+                f"{', '.join(missing)}",
+                False,
+                False,
+            )
+        key = (interface["fabric"], interface["vrf"])
+        groups.setdefault(key, []).append(interface)
+
+    fabric_uuids = {}
+    outcomes = []
+    errors = []
+    for (fabric_name, vrf_name), interfaces in groups.items():
+        if fabric_name not in fabric_uuids:
+            fabric_uuids[fabric_name] = fabric.Fabric(
+                client,
+                name=fabric_name,
+            ).uuid
+        vrf_instance = None
+        if fabric_uuids[fabric_name]:
+            vrf_instance = vrf.Vrf(
+                client,
+                name=vrf_name,
+                fabric_uuid=fabric_uuids[fabric_name],
+            )
+        if vrf_instance is None or not vrf_instance.uuid:
+            errors.append(f"VRF {vrf_name} of fabric {fabric_name} not found")
+            outcomes.extend(
+                {
+                    "fabric": fabric_name,
+                    "vrf": vrf_name,
+                    "name": interface["name"],
+                    "action": "failed",
+                }
+                for interface in interfaces
+            )
+            continue
+        batch = IpInterfaceBatch(
+            client,
+            vrf_instance,
+            fabric_name,
+            afc_module.params["batch_size"],
+        )
+        if operation == "create":
+            batch.create(interfaces)
+        else:
+            batch.delete(interfaces)
+        outcomes.extend(batch.outcomes)
+        errors.extend(batch.errors)
+
+    afc_module.result["interfaces"] = outcomes
+    afc_module.result["errors"] = errors
+    actions = [outcome["action"] for outcome in outcomes]
+    changed = any(
+        action in actions for action in ("created", "updated", "deleted")
+    )
+    if errors:
+        message = (
+            f"Unable to {operation} {actions.count('failed')} IP "
+            f"interfaces: {'; '.join(errors)}"
+        )
+        return message, False, changed
+    done = actions.count("created") + actions.count("deleted")
+    message = (
+        f"Successfully {operation}d {done} IP interfaces, "
+        f"{actions.count('updated')} updated, "
+        f"{actions.count('unchanged')} unchanged"
     )
+    return message, True, changed
 
-    # Get playbook's arguments
-    token = None
-    ip = ansible_module.params["afc_ip"]
-    if "afc_username" in list(ansible_module.params.keys()):
-        username = ansible_module.params["afc_username"]
-    if "afc_password" in list(ansible_module.params.keys()):
-        password = ansible_module.params["afc_password"]
-    if "auth_token" in list(ansible_module.params.keys()):
-        token = ansible_module.params["auth_token"]
-    operation = ansible_module.params["operation"]
-    data = ansible_module.params["data"]
-
-    if token is not None:
-        auth_data = {"ip": ip, "auth_token": token}
-    else:
-        auth_data = {"ip": ip, "username": username, "password": password}
 
-    result = {"changed": False}
+def run_module(afc_module):
+    afc_instance = afc_module.afc_instance
+    operation = afc_module.params["operation"]
+    data = afc_module.params["data"]
 
-    if ansible_module.check_mode:
-        ansible_module.exit_json(**result)
+    if afc_module.params["interfaces"] is not None:
+        return run_bulk(afc_module, afc_instance.client)
 
     status = False
     changed = False
     message = ""
 
-    afc_instance = instantiate_afc_object(data=auth_data)
-
-    if afc_instance.afc_connected:
-        fabric_instance = fabric.Fabric(
+    fabric_instance = fabric.Fabric(
+        afc_instance.client,
+        name=data["fabric"],
+    )
+    if fabric_instance.uuid:
+        vrf_instance = vrf.Vrf(
             afc_instance.client,
-            name=data["fabric"],
+            name=data["vrf"],
+            fabric_uuid=fabric_instance.uuid,
         )
-        if fabric_instance.uuid:
-            vrf_instance = vrf.Vrf(
-                afc_instance.client,
-                name=data["vrf"],
-                fabric_uuid=fabric_instance.uuid,
-            )
-            if vrf_instance.uuid:
-                if operation == "create":
-                    message, status, changed = (
-                        vrf_instance.create_ip_interface(**data)
-                    )
-                elif operation == "delete":
-                    message, status, changed = (
-                        vrf_instance.delete_ip_interface(**data)
-                    )
-                else:
-                    message = "Operation not supported - No action taken"
+        if vrf_instance.uuid:
+            if operation == "create":
+                message, status, changed = (
+                    vrf_instance.create_ip_interface(**data)
+                )
+            elif operation == "delete":
+                message, status, changed = (
+                    vrf_instance.delete_ip_interface(**data)
+                )
             else:
-                message = "VRF not found - No action taken"
-                status = False
-                changed = False
+                message = "Operation not supported - No action taken"
         else:
-            message = "Fabric not found - No action taken"
+            message = "VRF not found - No action taken"
             status = False
             changed = False
+    else:
+        message = "Fabric not found - No action taken"
+        status = False
+        changed = False
 
-        # Disconnect session if username and password are passed
-        if username and password:
-            afc_instance.disconnect()
+    return message, status, changed
 
-    else:
-        message = "Not connected to AFC"
 
-    result["message"] = message
-    result["status"] = status
-    result["changed"] = changed
+def main():
+    module_args = {
+        "operation": {"type": "str", "required": False},
+        "data": {"type": "dict", "required": False},
+        "interfaces": {
+            "type": "list",
+            "elements": "dict",
+            "required": False,
+        },
+        "batch_size": {"type": "int", "required": False, "default": 100},
+    }
 
-    # Exit
-    if status:
-        ansible_module.exit_json(changed=changed, msg=message)
-    else:
-        ansible_module.fail_json(changed=changed, msg=message)
+    afc_module = AfcModule(
+        argument_spec=module_args,
+        states={"present": "create", "absent": "delete"},
+        mutually_exclusive=[("data", "interfaces")],
+        required_one_of=[("data", "interfaces")],
+    )
+    afc_module.run(run_module)
 
 
 if __name__ == "__main__":
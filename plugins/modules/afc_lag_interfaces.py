@@ -46,6 +46,10 @@ options:
                 description: LAG ID
                 type: int
                 required: true
+            description:
+                description: LAG Description
+                type: str
+                required: false
             ports:
                 description: >
                     Physical ports to ne mapped to the LAG
@@ -103,11 +107,26 @@ options:
                     Speed-related configuration
                 type: dict
                 suboptions:
-                    speed:
+                    current:
                         description: LAG's speed Rate
                         type: str
                         required: true
         required: true
+    mode:
+        description: >
+            configure creates the LAG with the given configuration.
+            reconcile reads the existing LAGs and MC-LAGs of the switches
+            and, when the LAG exists, only sends the member ports added and
+            removed and the LACP, speed, global_config and top-level fields,
+            e.g. description, which differ, in a single request. A missing LAG is created as with configure.
+        type: str
+        choices:
+            - configure
+            - reconcile
+        default: configure
+        required: false
+extends_documentation_fragment:
+    - arubanetworks.afc.afc
 author: Aruba Networks (@ArubaNetworks)
 """
 
@@ -154,6 +173,27 @@ EXAMPLES = r"""
             lacp_config:
                 interval: "fast"
 
+-   name: Move the VSX LAG to other member ports
+    arubanetworks.afc.afc_lag_interfaces:
+        afc_ip: "10.10.10.10"
+        afc_username: "afc_admin"
+        afc_password: "afc_password"
+        mode: reconcile
+        data:
+            lag_name: 'lag15'
+            lag_id: 15
+            ports:
+                - switch: "10.10.10.7"
+                  ports:
+                    - "1/1/12"
+                - switch: "10.10.10.8"
+                  ports:
+                    - "1/1/12"
+            global_config:
+                ungrouped_vlans: "1253-1255"
+            lacp_config:
+                interval: "fast"
+
 -   name: Configure LAG using token
     arubanetworks.afc.afc_lag_interfaces:
         afc_ip: "10.10.10.10"
@@ -211,86 +251,262 @@ changed:
     type: bool
     returned: always
     sample: True
+changes:
+    description: >
+        Member ports added and removed, as "switch port", or as the UUID
+        of the port for the switches removed from the LAG, and LAG fields
+        updated by reconcile.
+    type: dict
+    returned: when mode is reconcile and the LAG exists
+    sample:
+        added:
+            - 10.10.10.7 1/1/12
+        removed:
+            - 10.10.10.7 1/1/10
+        updated:
+            - ungrouped_vlans
+            - lacp/interval
+            - speed/current
+timings:
+    description: >
+        Durations of the phases of the task and HTTP requests sent to AFC,
+        see the notes.
+    type: dict
+    returned: when afc_timings is enabled
 """
-from ansible.module_utils.basic import AnsibleModule
+import json
+
 from ansible_collections.arubanetworks.afc.plugins.module_utils.afc import (
-    instantiate_afc_object,
+    VLAN_RANGE_FIELDS,
+    AfcModule,
+    VlanSet,
+    iter_collection,
+    normalize_vlans,
+    read_switch_ports,
 )
-from pyafc.ports import ports
+from pyafc.common import utils
+from pyafc.ports import models, ports
 
+# LAG fields not set from the top-level fields of data
+LAG_ENTRY_FIELDS = ("name", "port_properties", "type")
 
-def main():
-    module_args = {
-        "afc_ip": {"type": "str", "required": True},
-        "afc_username": {"type": "str", "required": False},
-        "afc_password": {"type": "str", "required": False},
-        "auth_token": {"type": "str", "required": False},
-        "data": {"type": "dict", "required": True},
+
+def find_lag(client, name, switch_uuids):
+    """Return the LAG or MC-LAG named name on one of the switches."""
+    for lag in iter_collection(client, "lags"):
+        if lag.get("name") == name and any(
+            properties.get("switch_uuid") in switch_uuids
+            for properties in lag.get("port_properties") or []
+        ):
+            return lag
+    return None
+
+
+def desired_members(data, switch_uuids, switch_ports):
+    """Return the UUIDs of the member ports per switch UUID."""
+    members = {}
+    for device in data["ports"]:
+        switch = device["switch"]
+        port_uuids = members.setdefault(switch_uuids[switch], [])
+        for name in device["ports"]:
+            port = switch_ports.get((switch, name))
+            if port is None:
+                raise ValueError(f"unknown port {name} on {switch}")
+            port_uuids.append(port["uuid"])
+    return members
+
+
+def is_same(field, desired, current):
+    if field in VLAN_RANGE_FIELDS:
+        return VlanSet.parse(desired) == VlanSet.parse(current or "")
+    return desired == current
+
+
+def lag_fields(data):
+    """Return the top-level LAG fields set by data, as pyafc sends them.
+
+    The fields given in data, e.g. description, are overridden by the ones
+    of global_config and lag_id is sent as lag_number.
+    """
+    fields = {
+        field: value
+        for field, value in data.items()
+        if field in models.LAG.__fields__ and field not in LAG_ENTRY_FIELDS
     }
+    if data.get("lag_id") is not None:
+        fields["lag_number"] = data["lag_id"]
+    fields.update(data.get("global_config") or {})
+    return fields
+
+
+def reconcile_operations(lag, data, members, port_names):
+    """Return the JSON patch operations reconciling lag with data.
+
+    The member ports of the switches already in the LAG are added and
+    removed one by one, switches are added and removed with their
+    properties, and the LACP, speed and top-level fields which differ are
+    replaced. The operations are ordered so that the list indexes of
+    each operation are valid once the previous ones are applied. Also
+    return the changes as added and removed ports and updated fields.
+    """
+    operations = []
+    changes = {"added": [], "removed": [], "updated": []}
+    lacp = data.get("lacp_config") or {}
+    speed = data.get("speed_config") or {}
+    properties = lag.get("port_properties") or []
+    current_switches = set()
+    removed_entries = []
+    for index, entry in enumerate(properties):
+        switch_uuid = entry.get("switch_uuid")
+        current_switches.add(switch_uuid)
+        current = entry.get("port_uuids") or []
+        if switch_uuid not in members:
+            removed_entries.append(index)
+            changes["removed"].extend(
+                port_names.get(uuid, uuid) for uuid in current
+            )
+            continue
+        base = f"/port_properties/{index}"
+        desired = members[switch_uuid]
+        # From the end of the list, the previous indexes do not move
+        for position in reversed(range(len(current))):
+            if current[position] not in desired:
+                operations.append(
+                    {"op": "remove", "path": f"{base}/port_uuids/{position}"},
+                )
+                changes["removed"].append(
+                    port_names.get(current[position], current[position]),
+                )
+        for port_uuid in desired:
+            if port_uuid not in current:
+                operations.append(
+                    {
+                        "op": "add",
+                        "path": f"{base}/port_uuids/-",
+                        "value": port_uuid,
+                    },
+                )
+                changes["added"].append(port_names[port_uuid])
+        for name, config in (("lacp", lacp), ("speed", speed)):
+            current_config = entry.get(name) or {}
+            for field, value in sorted(config.items()):
+                if current_config.get(field) != value:
+                    operations.append(
+                        {
+                            "op": "replace",
+                            "path": f"{base}/{name}/{field}",
+                            "value": value,
+                        },
+                    )
+                    if f"{name}/{field}" not in changes["updated"]:
+                        changes["updated"].append(f"{name}/{field}")
+
+    for switch_uuid, port_uuids in members.items():
+        if switch_uuid in current_switches:
+            continue
+        entry = {"switch_uuid": switch_uuid, "port_uuids": port_uuids}
+        if lacp:
+            entry["lacp"] = lacp
+        if speed:
+            entry["speed"] = speed
+        operations.append(
+            {
+                "op": "add",
+                "path": "/port_properties/-",
+                "value": models.PortProperties(**entry).dict(),
+            },
+        )
+        changes["added"].extend(port_names[uuid] for uuid in port_uuids)
+    # Appended entries follow the removed ones, removed from the end
+    for index in reversed(removed_entries):
+        operations.append(
+            {"op": "remove", "path": f"/port_properties/{index}"},
+        )
+
+    for field, value in sorted(lag_fields(data).items()):
+        if not is_same(field, value, lag.get(field)):
+            operations.append(
+                {"op": "replace", "path": f"/{field}", "value": value},
+            )
+            changes["updated"].append(field)
+    return operations, changes
 
-    ansible_module = AnsibleModule(
-        argument_spec=module_args,
-        supports_check_mode=True,
+
+def reconcile_lag(afc_module, client, data):
+    switches = [device["switch"] for device in data["ports"]]
+    switch_uuids, switch_ports = read_switch_ports(client, switches)
+    lag = find_lag(client, data["lag_name"], set(switch_uuids.values()))
+    if lag is None:
+        return ports.PORT.configure_lags(client, data)
+
+    members = desired_members(data, switch_uuids, switch_ports)
+    port_names = {
+        port["uuid"]: f"{switch} {name}"
+        for (switch, name), port in switch_ports.items()
+        if name == port.get("name")
+    }
+    operations, changes = reconcile_operations(
+        lag,
+        data,
+        members,
+        port_names,
     )
+    afc_module.result["changes"] = changes
+    if not operations:
+        return "LAG already configured as per the input", True, False
+    response = client.patch(
+        "lags",
+        data=json.dumps([{"uuids": [lag["uuid"]], "patch": operations}]),
+    )
+    if response.status_code not in utils.response_ok:
+        return f"Unable to reconcile the LAG: {response.text}", False, False
+    return "Successfully reconciled LAG as per the input", True, True
+
 
-    # Get playbook's arguments
-    token = None
-    ip = ansible_module.params["afc_ip"]
-    if "afc_username" in list(ansible_module.params.keys()):
-        username = ansible_module.params["afc_username"]
-    if "afc_password" in list(ansible_module.params.keys()):
-        password = ansible_module.params["afc_password"]
-    if "auth_token" in list(ansible_module.params.keys()):
-        token = ansible_module.params["auth_token"]
-    data = ansible_module.params["data"]
-
-    if token is not None:
-        auth_data = {
-            "ip": ip,
-            "auth_token": token,
-        }
-    else:
-        auth_data = {
-            "ip": ip,
-            "username": username,
-            "password": password,
-        }
-
-    afc_instance = instantiate_afc_object(data=auth_data)
-
-    result = {"changed": False}
-
-    if ansible_module.check_mode:
-        ansible_module.exit_json(**result)
+def run_module(afc_module):
+    afc_instance = afc_module.afc_instance
+    data = afc_module.params["data"]
 
     status = False
     changed = False
     message = ""
 
-    afc_instance = instantiate_afc_object(data=auth_data)
+    try:
+        if data.get("global_config"):
+            data = dict(
+                data,
+                global_config=normalize_vlans(data["global_config"]),
+            )
+    except ValueError as exc:
+        return f"Invalid LAG configuration: {exc}", False, False
 
-    if afc_instance.afc_connected:
-        message, status, changed = ports.PORT.configure_lags(
-            afc_instance.client,
-            data,
-        )
+    if afc_module.params["mode"] == "reconcile":
+        try:
+            return reconcile_lag(afc_module, afc_instance.client, data)
+        except (ValueError, KeyError, TypeError) as exc:
+            return f"Unable to reconcile the LAG: {exc}", False, False
 
-        # Disconnect session if username and password are passed
-        if username and password:
-            afc_instance.disconnect()
+    message, status, changed = ports.PORT.configure_lags(
+        afc_instance.client,
+        data,
+    )
+
+    return message, status, changed
 
-    else:
-        message = "Not connected to AFC"
 
-    result["message"] = message
-    result["status"] = status
-    result["changed"] = changed
+def main():
+    module_args = {
+        "data": {"type": "dict", "required": True},
+        "mode": {
+            "type": "str",
+            "required": False,
+            "default": "configure",
+            "choices": ["configure", "reconcile"],
+        },
+    }
 
-    # Exit
-    if status:
-        ansible_module.exit_json(changed=changed, msg=message)
-    else:
-        ansible_module.fail_json(changed=changed, msg=message)
+    afc_module = AfcModule(argument_spec=module_args)
+    afc_module.run(run_module)
 
 
 if __name__ == "__main__":
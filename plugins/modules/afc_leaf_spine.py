@@ -62,6 +62,8 @@ options:
                 required: false
         required: true
 
+extends_documentation_fragment:
+    - arubanetworks.afc.afc
 author: Aruba Networks (@ArubaNetworks)
 """
 
@@ -123,94 +125,58 @@ changed:
     type: bool
     returned: always
     sample: True
+timings:
+    description: >
+        Durations of the phases of the task and HTTP requests sent to AFC,
+        see the notes.
+    type: dict
+    returned: when afc_timings is enabled
 """
 
-from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.arubanetworks.afc.plugins.module_utils.afc import (
-    instantiate_afc_object,
+    AfcModule,
 )
 from pyafc.fabric import fabric
 
 
-def main():
-    module_args = {
-        "afc_ip": {"type": "str", "required": True},
-        "afc_username": {"type": "str", "required": False},
-        "afc_password": {"type": "str", "required": False},
-        "auth_token": {"type": "str", "required": False},
-        "operation": {"type": "str", "required": False},
-        "data": {"type": "dict", "required": True},
-    }
-
-    ansible_module = AnsibleModule(
-        argument_spec=module_args,
-        supports_check_mode=True,
-    )
-
-    # Get playbook's arguments
-    token = None
-    ip = ansible_module.params["afc_ip"]
-    if "afc_username" in list(ansible_module.params.keys()):
-        username = ansible_module.params["afc_username"]
-    if "afc_password" in list(ansible_module.params.keys()):
-        password = ansible_module.params["afc_password"]
-    if "auth_token" in list(ansible_module.params.keys()):
-        token = ansible_module.params["auth_token"]
-    data = ansible_module.params["data"]
-
-    if token is not None:
-        auth_data = {"ip": ip, "auth_token": token}
-    else:
-        auth_data = {"ip": ip, "username": username, "password": password}
-
-    result = {"changed": False}
-
-    if ansible_module.check_mode:
-        ansible_module.exit_json(**result)
+def run_module(afc_module):
+    afc_instance = afc_module.afc_instance
+    data = afc_module.params["data"]
 
     status = False
     changed = False
     message = ""
 
-    afc_instance = instantiate_afc_object(data=auth_data)
-
-    if afc_instance.afc_connected:
-
-        fabric_instance = fabric.Fabric(
-            afc_instance.client,
-            name=data["fabric"],
-        )
+    fabric_instance = fabric.Fabric(
+        afc_instance.client,
+        name=data["fabric"],
+    )
 
-        if fabric_instance.uuid:
-            if data["type"] == "l3":
-                message, status, changed = fabric_instance.create_l3ls(**data)
-            elif data["type"] == "subleaf":
-                message, status, changed = fabric_instance.create_subleaf(
-                    **data,
-                )
-            else:
-                message = "Operation not supported - No action taken"
+    if fabric_instance.uuid:
+        if data["type"] == "l3":
+            message, status, changed = fabric_instance.create_l3ls(**data)
+        elif data["type"] == "subleaf":
+            message, status, changed = fabric_instance.create_subleaf(
+                **data,
+            )
         else:
-            message = "Fabric not found - No action taken"
-            status = False
-            changed = False
+            message = "Operation not supported - No action taken"
+    else:
+        message = "Fabric not found - No action taken"
+        status = False
+        changed = False
 
-        # Disconnect session if username and password are passed
-        if username and password:
-            afc_instance.disconnect()
+    return message, status, changed
 
-    else:
-        message = "Not connected to AFC"
 
-    result["message"] = message
-    result["status"] = status
-    result["changed"] = changed
+def main():
+    module_args = {
+        "operation": {"type": "str", "required": False},
+        "data": {"type": "dict", "required": True},
+    }
 
-    # Exit
-    if status:
-        ansible_module.exit_json(changed=changed, msg=message)
-    else:
-        ansible_module.fail_json(changed=changed, msg=message)
+    afc_module = AfcModule(argument_spec=module_args)
+    afc_module.run(run_module)
 
 
 if __name__ == "__main__":
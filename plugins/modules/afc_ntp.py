@@ -41,7 +41,17 @@ options:
         choices:
             - create
             - delete
-        required: true
+        required: false
+    state:
+        description: >
+            Desired state, present or absent, to use instead of operation.
+            The configuration is read first and only created, updated or
+            deleted when it differs from the desired one.
+        type: str
+        choices:
+            - present
+            - absent
+        required: false
     data:
         description: >
             Data of NTP configuration as depicted in the example.
@@ -92,6 +102,8 @@ options:
                 elements: str
                 required: false
         required: true
+extends_documentation_fragment:
+    - arubanetworks.afc.afc
 author: Aruba Networks (@ArubaNetworks)
 """
 
@@ -159,84 +171,68 @@ changed:
     type: bool
     returned: always
     sample: True
+timings:
+    description: >
+        Durations of the phases of the task and HTTP requests sent to AFC,
+        see the notes.
+    type: dict
+    returned: when afc_timings is enabled
 """
 
-from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.arubanetworks.afc.plugins.module_utils.afc import (
-    instantiate_afc_object,
+    AfcModule,
+    model_body,
+    resolve_targets,
 )
-from pyafc.services import ntp
-
+from pyafc.services import models, ntp
 
-def main():
-    module_args = {
-        "afc_ip": {"type": "str", "required": True},
-        "afc_username": {"type": "str", "required": False},
-        "afc_password": {"type": "str", "required": False},
-        "auth_token": {"type": "str", "required": False},
-        "operation": {"type": "str", "required": False},
-        "data": {"type": "dict", "required": True},
-    }
-
-    ansible_module = AnsibleModule(
-        argument_spec=module_args,
-        supports_check_mode=True,
-    )
 
-    # Get playbook's arguments
-    token = None
-    ip = ansible_module.params["afc_ip"]
-    if "afc_username" in list(ansible_module.params.keys()):
-        username = ansible_module.params["afc_username"]
-    if "afc_password" in list(ansible_module.params.keys()):
-        password = ansible_module.params["afc_password"]
-    if "auth_token" in list(ansible_module.params.keys()):
-        token = ansible_module.params["auth_token"]
-    data = ansible_module.params["data"]
-    operation = ansible_module.params["operation"]
-
-    if token is not None:
-        auth_data = {"ip": ip, "auth_token": token}
-    else:
-        auth_data = {"ip": ip, "username": username, "password": password}
+def ntp_body(client, data):
+    return model_body(models.Ntp(**resolve_targets(client, data)))
 
-    result = {"changed": False}
 
-    if ansible_module.check_mode:
-        ansible_module.exit_json(**result)
+def run_module(afc_module):
+    afc_instance = afc_module.afc_instance
+    data = afc_module.params["data"]
+    operation = afc_module.params["operation"]
 
     status = False
     changed = False
     message = ""
 
-    afc_instance = instantiate_afc_object(data=auth_data)
-
-    if afc_instance.afc_connected:
-
-        ntp_instance = ntp.Ntp(afc_instance.client, **data)
+    if operation == "create":
+        outcome = afc_module.update_existing(
+            "ntp_client_configurations",
+            data["name"],
+            lambda: ntp_body(afc_instance.client, data),
+            lookup="ntp_client_configurations?in_use_only=false",
+        )
+        if outcome is not None:
+            return outcome
+
+    ntp_instance = ntp.Ntp(afc_instance.client, **data)
+
+    if operation == "create":
+        message, status, changed = ntp_instance.create_ntp(**data)
+    elif operation == "delete":
+        message, status, changed = ntp_instance.delete_ntp()
+    else:
+        message = "Operation not supported - No action taken"
 
-        if operation == "create":
-            message, status, changed = ntp_instance.create_ntp(**data)
-        elif operation == "delete":
-            message, status, changed = ntp_instance.delete_ntp()
-        else:
-            message = "Operation not supported - No action taken"
-        # Disconnect session if username and password are passed
-        if username and password:
-            afc_instance.disconnect()
+    return message, status, changed
 
-    else:
-        message = "Not connected to AFC"
 
-    result["message"] = message
-    result["status"] = status
-    result["changed"] = changed
+def main():
+    module_args = {
+        "operation": {"type": "str", "required": False},
+        "data": {"type": "dict", "required": True},
+    }
 
-    # Exit
-    if status:
-        ansible_module.exit_json(changed=changed, msg=message)
-    else:
-        ansible_module.fail_json(changed=changed, msg=message)
+    afc_module = AfcModule(
+        argument_spec=module_args,
+        states={"present": "create", "absent": "delete"},
+    )
+    afc_module.run(run_module)
 
 
 if __name__ == "__main__":
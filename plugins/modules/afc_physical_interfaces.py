@@ -127,6 +127,21 @@ options:
                         description: Enable RPVST Filtering
                         type: str
                         required: false
+    batch_size:
+        description: >
+            Number of switches configured by one request. By default every
+            switch is configured by the same request. With 1, the outcome
+            of each switch is known separately.
+        type: int
+        required: false
+    max_workers:
+        description: >
+            Number of batches of switches configured at the same time.
+        type: int
+        default: 1
+        required: false
+extends_documentation_fragment:
+    - arubanetworks.afc.afc
 author: Aruba Networks (@ArubaNetworks)
 """
 
@@ -172,6 +187,13 @@ EXAMPLES = r"""
                   ungrouped_vlans: "250-252"
                   native_vlan: 250
 
+-   name: Configure the ports of the leaf switches, 8 switches at a time
+    arubanetworks.afc.afc_physical_interfaces:
+        afc_ip: "10.10.10.10"
+        auth_token: "xxlkjlsdfluwoeirkjlkjsldjjjlkj23423ljlkj"
+        batch_size: 1
+        max_workers: 8
+        data: "{{ leaf_ports }}"
 """
 
 RETURN = r"""
@@ -190,87 +212,205 @@ changed:
     type: bool
     returned: always
     sample: True
+switches:
+    description: >
+        Outcome of the configuration of each switch, with the message of
+        the request configuring its batch. A switch or port unknown to AFC
+        fails its switch, without being sent in the request.
+    type: dict
+    returned: always
+    sample:
+        10.10.10.7:
+            status: true
+            changed: true
+            message: Successfully configured ports according to input
+errors:
+    description: Messages of the switches which could not be configured.
+    type: list
+    elements: str
+    returned: always
+    sample:
+        - "10.10.10.8: Unknown switch"
+timings:
+    description: >
+        Durations of the phases of the task and HTTP requests sent to AFC,
+        see the notes.
+    type: dict
+    returned: when afc_timings is enabled
 """
 
-from ansible.module_utils.basic import AnsibleModule
+import json
+from concurrent.futures import ThreadPoolExecutor
+
 from ansible_collections.arubanetworks.afc.plugins.module_utils.afc import (
-    instantiate_afc_object,
+    AfcModule,
+    batches,
+    normalize_vlans,
+    read_switch_ports,
 )
-from pyafc.ports import ports
+from pyafc.common import utils
 
+# Patch paths of the fields not patched at the top level of the port
+PATCH_PATHS = {"speed": "speed/configure"}
 
-def main():
-    module_args = {
-        "afc_ip": {"type": "str", "required": True},
-        "afc_username": {"type": "str", "required": False},
-        "afc_password": {"type": "str", "required": False},
-        "auth_token": {"type": "str", "required": False},
-        "data": {"type": "raw", "required": True},
+
+def normalize_data(data):
+    """Return data with the VLANs of the ports as canonical ranges."""
+    return [
+        dict(
+            switch,
+            ports_config=[
+                normalize_vlans(port) for port in switch["ports_config"]
+            ],
+        )
+        for switch in data
+    ]
+
+
+def port_change(port, config):
+    """Return the bulk patch entry replacing the fields of config on port."""
+    return {
+        "uuids": [port["uuid"]],
+        "patch": [
+            {
+                "path": f"/{PATCH_PATHS.get(field, field)}",
+                "value": value,
+                "op": "replace",
+            }
+            for field, value in config.items()
+            if field != "name"
+        ],
     }
 
-    ansible_module = AnsibleModule(
-        argument_spec=module_args,
-        supports_check_mode=True,
-    )
 
-    # Get playbook's arguments
-    token = None
-    ip = ansible_module.params["afc_ip"]
-    if "afc_username" in list(ansible_module.params.keys()):
-        username = ansible_module.params["afc_username"]
-    if "afc_password" in list(ansible_module.params.keys()):
-        password = ansible_module.params["afc_password"]
-    if "auth_token" in list(ansible_module.params.keys()):
-        token = ansible_module.params["auth_token"]
-    data = ansible_module.params["data"]
+def configure_batch(client, batch):
+    """Configure the ports of a batch of switches, return their outcome.
 
-    if token is not None:
-        auth_data = {
-            "ip": ip,
-            "auth_token": token,
-        }
-    else:
-        auth_data = {
-            "ip": ip,
-            "username": username,
-            "password": password,
+    The switches and ports are resolved first, an unknown switch or port
+    fails its switch only. The ports of the other switches are configured
+    by one request, whose outcome is reported for each of them.
+    """
+    try:
+        switch_uuids, ports = read_switch_ports(
+            client,
+            [switch["switch"] for switch in batch],
+            skip_unknown=True,
+        )
+    except (ValueError, KeyError) as exc:
+        return {
+            switch["switch"]: {
+                "status": False,
+                "changed": False,
+                "message": f"Unable to read the ports: {exc}",
+            }
+            for switch in batch
         }
 
-    afc_instance = instantiate_afc_object(data=auth_data)
+    results = {}
+    changes = []
+    patched = []
+    for switch in batch:
+        name = switch["switch"]
+        if name not in switch_uuids:
+            results[name] = {
+                "status": False,
+                "changed": False,
+                "message": "Unknown switch",
+            }
+            continue
+        unknown = [
+            port["name"]
+            for port in switch["ports_config"]
+            if (name, port["name"]) not in ports
+        ]
+        if unknown:
+            results[name] = {
+                "status": False,
+                "changed": False,
+                "message": f"Unknown ports {', '.join(unknown)}",
+            }
+            continue
+        if not switch["ports_config"]:
+            results[name] = {
+                "status": True,
+                "changed": False,
+                "message": "Nothing to configure",
+            }
+            continue
+        changes.extend(
+            port_change(ports[(name, port["name"])], port)
+            for port in switch["ports_config"]
+        )
+        patched.append(name)
 
-    result = {"changed": False}
+    if changes:
+        try:
+            response = client.patch("ports", data=json.dumps(changes))
+            status = response.status_code in utils.response_ok
+            message = (
+                "Successfully configured ports according to input"
+                if status
+                else response.json()["result"]
+            )
+        except Exception as exc:
+            # The other batches are still configured
+            message, status = f"An exception {exc} occurred", False
+        for name in patched:
+            results[name] = {
+                "status": status,
+                "changed": status,
+                "message": message,
+            }
+    return results
 
-    if ansible_module.check_mode:
-        ansible_module.exit_json(**result)
 
-    status = False
-    changed = False
-    message = ""
+def run_module(afc_module):
+    afc_instance = afc_module.afc_instance
+    max_workers = max(afc_module.params["max_workers"], 1)
+    try:
+        data = normalize_data(afc_module.params["data"])
+    except (ValueError, KeyError, TypeError) as exc:
+        return f"Invalid port configuration: {exc}", False, False
 
-    afc_instance = instantiate_afc_object(data=auth_data)
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for outcome in executor.map(
+            lambda batch: configure_batch(afc_instance.client, batch),
+            batches(data, afc_module.params["batch_size"]),
+        ):
+            results.update(outcome)
 
-    if afc_instance.afc_connected:
-        message, status, changed = ports.PORT.configure_multiple_physical_port(
-            afc_instance.client,
-            data,
+    errors = [
+        f"{switch}: {outcome['message']}"
+        for switch, outcome in results.items()
+        if not outcome["status"]
+    ]
+    afc_module.result["switches"] = results
+    afc_module.result["errors"] = errors
+    changed = any(outcome["changed"] for outcome in results.values())
+    if errors:
+        message = (
+            f"Unable to configure {len(errors)} of {len(results)} "
+            f"switches: {'; '.join(errors)}"
         )
+        return message, False, changed
+    if not changed:
+        return "Nothing to configure", True, False
+    messages = {outcome["message"] for outcome in results.values()}
+    if len(messages) == 1:
+        return messages.pop(), True, changed
+    return f"Successfully configured {len(results)} switches", True, changed
 
-        # Disconnect session if username and password are passed
-        if username and password:
-            afc_instance.disconnect()
-
-    else:
-        message = "Not connected to AFC"
 
-    result["message"] = message
-    result["status"] = status
-    result["changed"] = changed
+def main():
+    module_args = {
+        "data": {"type": "raw", "required": True},
+        "batch_size": {"type": "int", "required": False},
+        "max_workers": {"type": "int", "required": False, "default": 1},
+    }
 
-    # Exit
-    if status:
-        ansible_module.exit_json(changed=changed, msg=message)
-    else:
-        ansible_module.fail_json(changed=changed, msg=message)
+    afc_module = AfcModule(argument_spec=module_args)
+    afc_module.run(run_module)
 
 
 if __name__ == "__main__":
@@ -45,9 +45,25 @@ options:
         required: true
     ports_data:
         description: >
-            Port configuration data.
+            Port configuration data, the ports of each switch, by IP address
+            or name, with the port fields to configure.
         type: dict
         required: true
+    mode:
+        description: >
+            all configures every listed port with the given values. changed
+            reads the current ports of the listed switches at once, compares
+            the VLANs, speed, admin state, description and any other given
+            field of each port, and only sends the fields of the ports which
+            differ, in a single request.
+        type: str
+        choices:
+            - all
+            - changed
+        default: all
+        required: false
+extends_documentation_fragment:
+    - arubanetworks.afc.afc
 author: Aruba Networks (@ArubaNetworks)
 '''
 
@@ -68,6 +84,21 @@ EXAMPLES = r'''
                     native_vlan: 250
                 "1/1/31":
                     native_vlan: 250
+
+-   name: Configure only the ports which differ
+    arubanetworks.afc.afc_ports:
+        afc_ip: "10.10.10.10"
+        afc_username: "afc_admin"
+        afc_password: "afc_password"
+        mode: changed
+        ports_data:
+            leaf1:
+                "1/1/30":
+                    admin_state: up
+                    description: "server-30"
+                    speed: 25000
+                    native_vlan: 250
+                    ungrouped_vlans: "250-252"
 '''
 
 RETURN = r'''
@@ -86,71 +117,160 @@ changed:
     type: bool
     returned: always
     sample: True
+ports:
+    description: >
+        Names of the ports which were configured, or would be in check
+        mode, per switch.
+    type: dict
+    returned: when mode is changed
+    sample:
+        leaf1:
+            - 1/1/30
+timings:
+    description: >
+        Durations of the phases of the task and HTTP requests sent to AFC,
+        see the notes.
+    type: dict
+    returned: when afc_timings is enabled
 '''
 
-from pyafc.ports import ports
-from ansible.module_utils.basic import AnsibleModule
-from ansible_collections.arubanetworks.afc.plugins.module_utils.afc import instantiate_afc_object
+import json
 
+from ansible_collections.arubanetworks.afc.plugins.module_utils.afc import (
+    VLAN_RANGE_FIELDS,
+    AfcModule,
+    VlanSet,
+    normalize_vlans,
+    read_switch_ports,
+)
+from pyafc.common import utils
+from pyafc.ports import ports
 
-def main():
-    module_args = dict(
-        afc_ip=dict(type="str", required=True),
-        afc_username=dict(type="str", required=False),
-        afc_password=dict(type="str", required=False),
-        auth_token=dict(type="str", required=False),
-        ports_data=dict(type="dict", required=True)
-    )
+# Port fields holding lists of UUIDs
+LIST_FIELDS = ("vlan_group_uuids",)
+# Patch paths of the fields not patched at the top level of the port
+PATCH_PATHS = {"speed": "speed/configure"}
 
-    ansible_module = AnsibleModule(
-        argument_spec=module_args, supports_check_mode=True
-    )
 
-    # Get playbook's arguments
-    token = None
-    ip = ansible_module.params["afc_ip"]
-    if 'afc_username' in list(ansible_module.params.keys()):
-        username = ansible_module.params["afc_username"]
-    if 'afc_password' in list(ansible_module.params.keys()):
-        password = ansible_module.params["afc_password"]
-    if 'auth_token' in list(ansible_module.params.keys()):
-        token = ansible_module.params["auth_token"]
-    ports_data = ansible_module.params["ports_data"]
-
-    if token is not None:
-        data = {
-            "ip": ip,
-            "auth_token": token
-        }
-    else:
-        data = {
-            "ip": ip,
-            "username": username,
-            "password": password
+def devices_list(ports_data):
+    """Return ports_data as the list of switches expected by pyafc."""
+    return [
+        {
+            "switch": switch,
+            "ports_config": [
+                dict(normalize_vlans(config or {}), name=name)
+                for name, config in switch_ports.items()
+            ],
         }
+        for switch, switch_ports in ports_data.items()
+    ]
+
+
+def current_value(port, field):
+    value = port.get(field)
+    if field == "speed" and isinstance(value, dict):
+        return value.get("configure")
+    return value
+
+
+def is_same(field, desired, current):
+    if field in VLAN_RANGE_FIELDS:
+        return VlanSet.parse(desired) == VlanSet.parse(current or "")
+    if field in LIST_FIELDS and isinstance(desired, list):
+        return sorted(desired) == sorted(current or [])
+    if isinstance(desired, (dict, list)) or isinstance(current, (dict, list)):
+        return desired == current
+    # Values given as strings in the playbook, e.g. native_vlan: "250"
+    return str(desired) == str(current)
+
+
+def changed_ports(client, ports_data):
+    """Return the bulk patch of the ports differing from ports_data.
+
+    Only the differing fields are patched, the ports receiving the same
+    changes share one entry of the patch. The names of the changed ports
+    are also returned per switch.
+    """
+    _switch_uuids, current = read_switch_ports(client, list(ports_data))
+    patches = {}
+    changed = {}
+    for switch, switch_ports in ports_data.items():
+        for name, config in switch_ports.items():
+            config = normalize_vlans(config or {})
+            port = current.get((switch, name))
+            if port is None:
+                raise ValueError(f"unknown port {name} on {switch}")
+            operations = [
+                {
+                    "path": f"/{PATCH_PATHS.get(field, field)}",
+                    "value": value,
+                    "op": "replace",
+                }
+                for field, value in sorted(config.items())
+                if not is_same(field, value, current_value(port, field))
+            ]
+            if not operations:
+                continue
+            key = json.dumps(operations, sort_keys=True)
+            patches.setdefault(key, {"uuids": [], "patch": operations})
+            patches[key]["uuids"].append(port["uuid"])
+            changed.setdefault(switch, []).append(name)
+    return list(patches.values()), changed
 
-    afc_instance = instantiate_afc_object(data=data)
 
-    result = dict(changed=False)
+def configure_changed_ports(afc_module, client):
+    ports_data = afc_module.params["ports_data"]
+    try:
+        patches, changed = changed_ports(client, ports_data)
+    except (ValueError, KeyError) as exc:
+        return f"Unable to compare the ports: {exc}", False, False
 
-    if ansible_module.check_mode:
-        ansible_module.exit_json(**result)
+    afc_module.result["ports"] = changed
+    if not patches:
+        return "Ports already configured according to input", True, False
+    response = client.patch("ports", data=json.dumps(patches))
+    if response.status_code not in utils.response_ok:
+        return (
+            f"Unable to configure the ports: {response.text}",
+            False,
+            False,
+        )
+    count = sum(len(names) for names in changed.values())
+    return f"Successfully configured {count} ports", True, True
 
-    message, status, changed = ports.PORT.configure_multiple_physical_port(afc_instance.client, **ports_data)
 
-    result['message'] = message
-    result['status'] = status
-    result['changed'] = changed
+def run_module(afc_module):
+    afc_instance = afc_module.afc_instance
+    ports_data = afc_module.params["ports_data"]
 
-    # Disconnect session if username and password are passed
-    if username and password:
-        afc_instance.disconnect()
+    if afc_module.params["mode"] == "changed":
+        return configure_changed_ports(afc_module, afc_instance.client)
+
+    try:
+        devices = devices_list(ports_data)
+    except ValueError as exc:
+        return f"Invalid port configuration: {exc}", False, False
+    message, status, changed = ports.PORT.configure_multiple_physical_port(
+        afc_instance.client,
+        devices,
+    )
+
+    return message, status, changed
+
+
+def main():
+    module_args = dict(
+        ports_data=dict(type="dict", required=True),
+        mode=dict(
+            type="str",
+            required=False,
+            default="all",
+            choices=["all", "changed"],
+        ),
+    )
 
-    # Exit
-    if status:
-        ansible_module.exit_json(changed=changed, msg=message)
-    else:
-        ansible_module.fail_json(changed=changed, msg=message)
+    afc_module = AfcModule(argument_spec=module_args)
+    afc_module.run(run_module)
 
 
 if __name__ == "__main__":
@@ -43,7 +43,17 @@ options:
         choices:
             - create
             - delete
-        required: true
+        required: false
+    state:
+        description: >
+            Desired state, present or absent, to use instead of operation.
+            The configuration is read first and only created, updated or
+            deleted when it differs from the desired one.
+        type: str
+        choices:
+            - present
+            - absent
+        required: false
     data:
         description: >
             Object specific data for route_map, prefix_list, community_list,
@@ -360,6 +370,8 @@ options:
                 type: list
                 elements: str
                 required: false
+extends_documentation_fragment:
+    - arubanetworks.afc.afc
 author: Aruba Networks (@ArubaNetworks)
 """
 
@@ -691,164 +703,157 @@ changed:
     type: bool
     returned: always
     sample: True
+timings:
+    description: >
+        Durations of the phases of the task and HTTP requests sent to AFC,
+        see the notes.
+    type: dict
+    returned: when afc_timings is enabled
 """
 
-from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.arubanetworks.afc.plugins.module_utils.afc import (
-    instantiate_afc_object,
+    AfcModule,
+    model_body,
+    resolve_targets,
 )
 from pyafc.route_policies import (
     as_path_lists,
     community_lists,
+    models,
     prefix_lists,
     route_maps,
 )
 
+ROUTE_POLICY_PATHS = {
+    "route_map": "route_maps",
+    "aspath_list": "aspath_lists",
+    "prefix_list": "prefix_lists",
+    "community_list": "community_lists",
+}
+ROUTE_POLICY_MODELS = {
+    "route_map": models.RouteMap,
+    "aspath_list": models.ASPathList,
+    "prefix_list": models.PrefixList,
+    "community_list": models.CommunityList,
+}
 
-def main():
-    module_args = {
-        "afc_ip": {"type": "str", "required": True},
-        "afc_username": {"type": "str", "required": False},
-        "afc_password": {"type": "str", "required": False},
-        "auth_token": {"type": "str", "required": False},
-        "operation": {"type": "str", "required": False},
-        "data": {"type": "dict", "required": True},
-    }
 
-    ansible_module = AnsibleModule(
-        argument_spec=module_args,
-        supports_check_mode=True,
-    )
-
-    # Get playbook"s arguments
-    token = None
-    ip = ansible_module.params["afc_ip"]
-    if "afc_username" in list(ansible_module.params.keys()):
-        username = ansible_module.params["afc_username"]
-    if "afc_password" in list(ansible_module.params.keys()):
-        password = ansible_module.params["afc_password"]
-    if "auth_token" in list(ansible_module.params.keys()):
-        token = ansible_module.params["auth_token"]
-    operation = ansible_module.params["operation"]
-    data = ansible_module.params["data"]
-
-    if token is not None:
-        auth_data = {
-            "ip": ip,
-            "auth_token": token,
-        }
-    else:
-        auth_data = {
-            "ip": ip,
-            "username": username,
-            "password": password,
-        }
+def route_policy_body(client, data):
+    values = resolve_targets(client, data)
+    if data["type"] == "community_list":
+        values["type"] = values["object_type"]
+    return model_body(ROUTE_POLICY_MODELS[data["type"]](**values))
 
-    result = {"changed": False}
 
-    if ansible_module.check_mode:
-        ansible_module.exit_json(**result)
+def run_module(afc_module):
+    afc_instance = afc_module.afc_instance
+    operation = afc_module.params["operation"]
+    data = afc_module.params["data"]
 
     status = False
     changed = False
     message = ""
 
-    afc_instance = instantiate_afc_object(data=auth_data)
-
-    if afc_instance.afc_connected:
-        if operation == "create":
-            if data["type"] == "route_map":
-                route_map_instance = route_maps.RouteMap(
-                    afc_instance.client,
+    if operation == "create" and data["type"] in ROUTE_POLICY_PATHS:
+        outcome = afc_module.update_existing(
+            ROUTE_POLICY_PATHS[data["type"]],
+            data["name"],
+            lambda: route_policy_body(afc_instance.client, data),
+        )
+        if outcome is not None:
+            return outcome
+
+    if operation == "create":
+        if data["type"] == "route_map":
+            route_map_instance = route_maps.RouteMap(
+                afc_instance.client,
+                **data,
+            )
+            message, status, changed = route_map_instance.create_routemap(
+                **data,
+            )
+        elif data["type"] == "aspath_list":
+            aspath_list_instance = as_path_lists.ASPathList(
+                afc_instance.client,
+                **data,
+            )
+            message, status, changed = (
+                aspath_list_instance.create_aspath_list(
                     **data,
                 )
-                message, status, changed = route_map_instance.create_routemap(
+            )
+        elif data["type"] == "prefix_list":
+            prefix_list_instance = prefix_lists.PrefixList(
+                afc_instance.client,
+                **data,
+            )
+            message, status, changed = (
+                prefix_list_instance.create_prefix_list(
                     **data,
                 )
-            elif data["type"] == "aspath_list":
-                aspath_list_instance = as_path_lists.ASPathList(
-                    afc_instance.client,
+            )
+        elif data["type"] == "community_list":
+            community_list_instance = community_lists.CommunityList(
+                afc_instance.client,
+                **data,
+            )
+            message, status, changed = (
+                community_list_instance.create_community_list(
                     **data,
                 )
-                message, status, changed = (
-                    aspath_list_instance.create_aspath_list(
-                        **data,
-                    )
-                )
-            elif data["type"] == "prefix_list":
-                prefix_list_instance = prefix_lists.PrefixList(
-                    afc_instance.client,
-                    **data,
-                )
-                message, status, changed = (
-                    prefix_list_instance.create_prefix_list(
-                        **data,
-                    )
-                )
-            elif data["type"] == "community_list":
-                community_list_instance = community_lists.CommunityList(
-                    afc_instance.client,
-                    **data,
-                )
-                message, status, changed = (
-                    community_list_instance.create_community_list(
-                        **data,
-                    )
-                )
-            else:
-                message = "Route Policy type not supported - No action taken"
-        elif operation == "delete":
-            if data["type"] == "route_map":
-                route_map_instance = route_maps.RouteMap(
-                    afc_instance.client,
-                    **data,
-                )
-                message, status, changed = route_map_instance.delete_routemap()
-            elif data["type"] == "aspath_list":
-                aspath_list_instance = as_path_lists.ASPathList(
-                    afc_instance.client,
-                    **data,
-                )
-                message, status, changed = (
-                    aspath_list_instance.delete_aspath_list()
-                )
-            elif data["type"] == "prefix_list":
-                prefix_list_instance = prefix_lists.PrefixList(
-                    afc_instance.client,
-                    **data,
-                )
-                message, status, changed = (
-                    prefix_list_instance.delete_prefix_list()
-                )
-            elif data["type"] == "community_list":
-                community_list_instance = community_lists.CommunityList(
-                    afc_instance.client,
-                    **data,
-                )
-                message, status, changed = (
-                    community_list_instance.delete_community_list()
-                )
-            else:
-                message = "Route Policy type not supported - No action taken"
+            )
         else:
-            message = "Operation not supported - No action taken"
+            message = "Route Policy type not supported - No action taken"
+    elif operation == "delete":
+        if data["type"] == "route_map":
+            route_map_instance = route_maps.RouteMap(
+                afc_instance.client,
+                **data,
+            )
+            message, status, changed = route_map_instance.delete_routemap()
+        elif data["type"] == "aspath_list":
+            aspath_list_instance = as_path_lists.ASPathList(
+                afc_instance.client,
+                **data,
+            )
+            message, status, changed = (
+                aspath_list_instance.delete_aspath_list()
+            )
+        elif data["type"] == "prefix_list":
+            prefix_list_instance = prefix_lists.PrefixList(
+                afc_instance.client,
+                **data,
+            )
+            message, status, changed = (
+                prefix_list_instance.delete_prefix_list()
+            )
+        elif data["type"] == "community_list":
+            community_list_instance = community_lists.CommunityList(
+                afc_instance.client,
+                **data,
+            )
+            message, status, changed = (
+                community_list_instance.delete_community_list()
+            )
+        else:
+            message = "Route Policy type not supported - No action taken"
+    else:
+        message = "Operation not supported - No action taken"
 
-        # Disconnect session if username and password are passed
-        if username and password:
-            afc_instance.disconnect()
+    return message, status, changed
 
-    else:
-        message = "Not connected to AFC"
 
-    result["message"] = message
-    result["status"] = status
-    result["changed"] = changed
+def main():
+    module_args = {
+        "operation": {"type": "str", "required": False},
+        "data": {"type": "dict", "required": True},
+    }
 
-    # Exit
-    if status:
-        ansible_module.exit_json(changed=changed, msg=message)
-    else:
-        ansible_module.fail_json(changed=changed, msg=message)
+    afc_module = AfcModule(
+        argument_spec=module_args,
+        states={"present": "create", "absent": "delete"},
+    )
+    afc_module.run(run_module)
 
 
 if __name__ == "__main__":
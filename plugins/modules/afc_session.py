@@ -28,6 +28,8 @@ options:
         - Password of the user account
         type: str
         required: true
+extends_documentation_fragment:
+    - arubanetworks.afc.afc
 author: Aruba Networks (@ArubaNetworks)
 """
 
@@ -74,64 +76,47 @@ headers:
     description: Headers for connection
     type: dict
     returned: always
+timings:
+    description: >
+        Durations of the phases of the task and HTTP requests sent to AFC,
+        see the notes.
+    type: dict
+    returned: when afc_timings is enabled
 """
 
-from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.arubanetworks.afc.plugins.module_utils.afc import (
-    instantiate_afc_object,
+    AfcModule,
 )
 
 
-def main():
-    module_args = {
-        "afc_ip": {"type": "str", "required": True},
-        "afc_username": {"type": "str", "required": True},
-        "afc_password": {"type": "str", "required": True},
-    }
-
-    ansible_module = AnsibleModule(
-        argument_spec=module_args,
-        supports_check_mode=True,
-    )
-
-    # Get playbook's arguments
-    ip = ansible_module.params["afc_ip"]
-    username = ansible_module.params["afc_username"]
-    password = ansible_module.params["afc_password"]
-
-    result = {"changed": False}
-
-    if ansible_module.check_mode:
-        ansible_module.exit_json(**result)
+def run_module(afc_module):
+    afc_instance = afc_module.afc_instance
 
     status = False
     changed = False
     message = ""
-    auth_token = None
-
-    data = {"ip": ip, "username": username, "password": password}
-
-    auth_token = None
-
-    afc_instance = instantiate_afc_object(data=data)
 
     if afc_instance.client.is_closed is False:
-        auth_token = afc_instance.auth_token
+        afc_module.result["auth_token"] = afc_instance.auth_token
         message = "Successfully created afc_instance"
         status = True
         changed = True
     else:
         message = "Unable to create afc_instance"
 
-    # Exit
-    if status:
-        ansible_module.exit_json(
-            changed=changed,
-            msg=message,
-            auth_token=auth_token,
-        )
-    else:
-        ansible_module.fail_json(changed=changed, msg=message)
+    return message, status, changed
+
+
+def main():
+    module_args = {
+        "afc_username": {"type": "str", "required": True},
+        "afc_password": {"type": "str", "required": True},
+        "auth_token": None,
+    }
+
+    # The session is handed over to the next tasks through auth_token
+    afc_module = AfcModule(argument_spec=module_args, keep_session=True)
+    afc_module.run(run_module)
 
 
 if __name__ == "__main__":
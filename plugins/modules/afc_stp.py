@@ -41,7 +41,17 @@ options:
         choices:
             - create
             - delete
-        required: true
+        required: false
+    state:
+        description: >
+            Desired state, present or absent, to use instead of operation.
+            The configuration is read first and only created, updated or
+            deleted when it differs from the desired one.
+        type: str
+        choices:
+            - present
+            - absent
+        required: false
     data:
         description: >
             STP configuration data. Structure is provided in the example.
@@ -104,6 +114,8 @@ options:
                                 required: true
                 required: true
         required: true
+extends_documentation_fragment:
+    - arubanetworks.afc.afc
 author: Aruba Networks (@ArubaNetworks)
 """
 
@@ -171,91 +183,69 @@ changed:
     type: bool
     returned: always
     sample: True
+timings:
+    description: >
+        Durations of the phases of the task and HTTP requests sent to AFC,
+        see the notes.
+    type: dict
+    returned: when afc_timings is enabled
 """
 
-from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.arubanetworks.afc.plugins.module_utils.afc import (
-    instantiate_afc_object,
+    AfcModule,
+    model_body,
 )
-from pyafc.services import stp
+from pyafc.services import models, stp
 
 
-def main():
-    module_args = {
-        "afc_ip": {"type": "str", "required": True},
-        "afc_username": {"type": "str", "required": False},
-        "afc_password": {"type": "str", "required": False},
-        "auth_token": {"type": "str", "required": False},
-        "operation": {"type": "str", "required": False},
-        "data": {"type": "dict", "required": True},
-    }
+def stp_body(name, data):
+    return model_body(models.Stp(name=name, **data))
 
-    ansible_module = AnsibleModule(
-        argument_spec=module_args,
-        supports_check_mode=True,
-    )
-
-    # Get playbook's arguments
-    token = None
-    ip = ansible_module.params["afc_ip"]
-    if "afc_username" in list(ansible_module.params.keys()):
-        username = ansible_module.params["afc_username"]
-    if "afc_password" in list(ansible_module.params.keys()):
-        password = ansible_module.params["afc_password"]
-    if "auth_token" in list(ansible_module.params.keys()):
-        token = ansible_module.params["auth_token"]
-    stp_name = ansible_module.params["stp_name"]
-    operation = ansible_module.params["operation"]
-    if "stp_data" in list(ansible_module.params.keys()):
-        stp_data = ansible_module.params["stp_data"]
 
-    if token is not None:
-        auth_data = {"ip": ip, "auth_token": token}
-    else:
-        auth_data = {"ip": ip, "username": username, "password": password}
-
-    result = {"changed": False}
-
-    if ansible_module.check_mode:
-        ansible_module.exit_json(**result)
+def run_module(afc_module):
+    afc_instance = afc_module.afc_instance
+    operation = afc_module.params["operation"]
+    stp_data = dict(afc_module.params["data"])
+    stp_name = stp_data.pop("name")
 
     status = False
     changed = False
     message = ""
 
-    afc_instance = instantiate_afc_object(data=auth_data)
-
-    if afc_instance.afc_connected:
-
-        if operation == "create":
-            stp_instance = stp.STP(
-                afc_instance.client,
-                name=stp_name,
-                **stp_data,
-            )
-            message, status, changed = stp_instance.create_stp(**stp_data)
-        elif operation == "delete":
-            stp_instance = stp.STP(afc_instance.client, name=stp_name)
-            message, status, changed = stp_instance.delete_stp()
-        else:
-            message = "Operation not supported - No action taken"
+    if operation == "create":
+        outcome = afc_module.update_existing(
+            "spanning_tree/stp_configuration",
+            stp_name,
+            lambda: stp_body(stp_name, stp_data),
+        )
+        if outcome is not None:
+            return outcome
+        stp_instance = stp.STP(
+            afc_instance.client,
+            name=stp_name,
+            **stp_data,
+        )
+        message, status, changed = stp_instance.create_stp(**stp_data)
+    elif operation == "delete":
+        stp_instance = stp.STP(afc_instance.client, name=stp_name)
+        message, status, changed = stp_instance.delete_stp()
+    else:
+        message = "Operation not supported - No action taken"
 
-        # Disconnect session if username and password are passed
-        if username and password:
-            afc_instance.disconnect()
+    return message, status, changed
 
-    else:
-        message = "Not connected to AFC"
 
-    result["message"] = message
-    result["status"] = status
-    result["changed"] = changed
+def main():
+    module_args = {
+        "operation": {"type": "str", "required": False},
+        "data": {"type": "dict", "required": True},
+    }
 
-    # Exit
-    if status:
-        ansible_module.exit_json(changed=changed, msg=message)
-    else:
-        ansible_module.fail_json(changed=changed, msg=message)
+    afc_module = AfcModule(
+        argument_spec=module_args,
+        states={"present": "create", "absent": "delete"},
+    )
+    afc_module.run(run_module)
 
 
 if __name__ == "__main__":
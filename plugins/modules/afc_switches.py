@@ -73,6 +73,8 @@ options:
                 elements: str
                 required: false
         required: true
+extends_documentation_fragment:
+    - arubanetworks.afc.afc
 author: Aruba Networks (@ArubaNetworks)
 """
 
@@ -214,100 +216,64 @@ changed:
     type: bool
     returned: always
     sample: True
+timings:
+    description: >
+        Durations of the phases of the task and HTTP requests sent to AFC,
+        see the notes.
+    type: dict
+    returned: when afc_timings is enabled
 """
 
-from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.arubanetworks.afc.plugins.module_utils.afc import (
-    instantiate_afc_object,
+    AfcModule,
 )
 from pyafc.switches import switches
 
 
-def main():
-    module_args = {
-        "afc_ip": {"type": "str", "required": True},
-        "afc_username": {"type": "str", "required": False},
-        "afc_password": {"type": "str", "required": False},
-        "auth_token": {"type": "str", "required": False},
-        "operation": {"type": "str", "required": False},
-        "data": {"type": "dict", "required": True},
-    }
-
-    ansible_module = AnsibleModule(
-        argument_spec=module_args,
-        supports_check_mode=True,
-    )
-
-    # Get playbook's arguments
-    token = None
-    ip = ansible_module.params["afc_ip"]
-    if "afc_username" in list(ansible_module.params.keys()):
-        username = ansible_module.params["afc_username"]
-    if "afc_password" in list(ansible_module.params.keys()):
-        password = ansible_module.params["afc_password"]
-    if "auth_token" in list(ansible_module.params.keys()):
-        token = ansible_module.params["auth_token"]
-    operation = ansible_module.params["operation"]
-    data = ansible_module.params["data"]
-
-    if token is not None:
-        auth_data = {"ip": ip, "auth_token": token}
-    else:
-        auth_data = {"ip": ip, "username": username, "password": password}
-
-    result = {"changed": False}
-
-    if ansible_module.check_mode:
-        ansible_module.exit_json(**result)
+def run_module(afc_module):
+    afc_instance = afc_module.afc_instance
+    operation = afc_module.params["operation"]
+    data = afc_module.params["data"]
 
     status = False
     changed = False
     message = ""
 
-    afc_instance = instantiate_afc_object(data=auth_data)
-
-    if afc_instance.afc_connected:
+    if operation == "update":
+        switches_instance = switches.Switch(
+            afc_instance.client,
+            device=data["switches"],
+        )
+        message, status, changed = switches_instance.update(data)
+    elif operation == "reconcile":
+        message, status, changed = switches.Switch.reconcile(
+            afc_instance.client,
+            data,
+        )
+    elif operation == "reboot":
+        message, status, changed = switches.Switch.reboot(
+            afc_instance.client,
+            data,
+        )
+    elif operation == "save":
+        message, status, changed = switches.Switch.save_config(
+            afc_instance.client,
+            data,
+        )
+    else:
+        message = "Operation not supported - No action taken"
 
-        if operation == "update":
-            switches_instance = switches.Switch(
-                afc_instance.client,
-                device=data["switches"],
-            )
-            message, status, changed = switches_instance.update(data)
-        elif operation == "reconcile":
-            message, status, changed = switches.Switch.reconcile(
-                afc_instance.client,
-                data,
-            )
-        elif operation == "reboot":
-            message, status, changed = switches.Switch.reboot(
-                afc_instance.client,
-                data,
-            )
-        elif operation == "save":
-            message, status, changed = switches.Switch.save_config(
-                afc_instance.client,
-                data,
-            )
-        else:
-            message = "Operation not supported - No action taken"
+    return message, status, changed
 
-        # Disconnect session if username and password are passed
-        if username and password:
-            afc_instance.disconnect()
 
-    else:
-        message = "Not connected to AFC"
-
-    result["message"] = message
-    result["status"] = status
-    result["changed"] = changed
+def main():
+    module_args = {
+        "operation": {"type": "str", "required": False},
+        "data": {"type": "dict", "required": True},
+    }
 
-    # Exit
-    if status:
-        ansible_module.exit_json(changed=changed, msg=message)
-    else:
-        ansible_module.fail_json(changed=changed, msg=message)
+    afc_module = AfcModule(argument_spec=module_args)
+    afc_module.run(run_module)
 
 
 if __name__ == "__main__":
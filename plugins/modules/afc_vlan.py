@@ -43,7 +43,17 @@ options:
         operation:
             - create
             - delete
-        required: true
+        required: false
+    state:
+        description: >
+            Desired state, present or absent, to use instead of operation.
+            The configuration is read first and only created, updated or
+            deleted when it differs from the desired one.
+        type: str
+        choices:
+            - present
+            - absent
+        required: false
     data:
         description: >
             Data to manipulate VLANs.
@@ -101,6 +111,8 @@ options:
                         type: str
                         required: false
         required: true
+extends_documentation_fragment:
+    - arubanetworks.afc.afc
 author: Aruba Networks (@ArubaNetworks)
 """
 
@@ -198,124 +210,100 @@ changed:
     type: bool
     returned: always
     sample: True
+timings:
+    description: >
+        Durations of the phases of the task and HTTP requests sent to AFC,
+        see the notes.
+    type: dict
+    returned: when afc_timings is enabled
 """
 
-from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.arubanetworks.afc.plugins.module_utils.afc import (
-    instantiate_afc_object,
+    AfcModule,
+    model_body,
+    normalize_vlans,
 )
 from pyafc.fabric import fabric
-from pyafc.ports import vlan_group
+from pyafc.ports import models, vlan_group
 
 
-def main():
-    module_args = {
-        "afc_ip": {"type": "str", "required": True},
-        "afc_username": {"type": "str", "required": False},
-        "afc_password": {"type": "str", "required": False},
-        "auth_token": {"type": "str", "required": False},
-        "operation": {"type": "str", "required": True},
-        "data": {"type": "dict", "required": True},
-    }
-
-    ansible_module = AnsibleModule(
-        argument_spec=module_args,
-        supports_check_mode=True,
-    )
-
-    # Get playbook's arguments
-    token = None
-    ip = ansible_module.params["afc_ip"]
-    if "afc_username" in list(ansible_module.params.keys()):
-        username = ansible_module.params["afc_username"]
-    if "afc_password" in list(ansible_module.params.keys()):
-        password = ansible_module.params["afc_password"]
-    if "auth_token" in list(ansible_module.params.keys()):
-        token = ansible_module.params["auth_token"]
-    operation = ansible_module.params["operation"]
-    data = ansible_module.params["data"]
-
-    if token is not None:
-        auth_data = {
-            "ip": ip,
-            "auth_token": token,
-        }
-    else:
-        auth_data = {
-            "ip": ip,
-            "username": username,
-            "password": password,
-        }
-
-    afc_instance = instantiate_afc_object(data=auth_data)
-
-    result = {"changed": False}
-
-    if ansible_module.check_mode:
-        ansible_module.exit_json(**result)
+def run_module(afc_module):
+    afc_instance = afc_module.afc_instance
+    operation = afc_module.params["operation"]
+    data = afc_module.params["data"]
 
     status = False
     changed = False
     message = ""
 
-    if afc_instance.afc_connected:
-        if operation == "create":
-            if data["type"] == "vlan_group":
-                vlan_instance = vlan_group.VlanGroup(
-                    afc_instance.client,
-                    **data,
-                )
-                message, status, changed = vlan_instance.create_vlan_group(
-                    **data,
-                )
-            elif data["type"] == "stretched_vlan":
-                fabric_instance = fabric.Fabric(
-                    afc_instance.client,
-                    name=data["fabrics"][0],
-                )
-                message, status, changed = (
-                    fabric_instance.create_vlan_stretching(**data)
-                )
-            else:
-                message = "Type not supported - No action taken"
-        elif operation == "update":
-            if data["type"] == "stretched_vlan":
-                fabric_instance = fabric.Fabric(
-                    afc_instance.client,
-                    name=data["fabrics"][0],
-                )
-                message, status, changed = (
-                    fabric_instance.update_vlan_stretching(**data)
-                )
-            else:
-                message = "Type not supported - No action taken"
-        elif operation == "delete":
-            if data["type"] == "vlan_group":
-                vlan_instance = vlan_group.VlanGroup(
-                    afc_instance.client,
-                    **data,
-                )
-                message, status, changed = vlan_instance.delete_vlan_group()
-            else:
-                message = "Type not supported - No action taken"
-        else:
-            message = "Operation not supported - No action taken"
-        # Disconnect session if username and password are passed
-        if username and password:
-            afc_instance.disconnect()
+    try:
+        data = normalize_vlans(data, ("vlans",))
+    except ValueError as exc:
+        return f"Invalid VLAN group: {exc}", False, False
 
+    if operation == "create":
+        if data["type"] == "vlan_group":
+            outcome = afc_module.update_existing(
+                "vlan_groups",
+                data["name"],
+                lambda: model_body(models.VlanGroup(**data)),
+            )
+            if outcome is not None:
+                return outcome
+            vlan_instance = vlan_group.VlanGroup(
+                afc_instance.client,
+                **data,
+            )
+            message, status, changed = vlan_instance.create_vlan_group(
+                **data,
+            )
+        elif data["type"] == "stretched_vlan":
+            fabric_instance = fabric.Fabric(
+                afc_instance.client,
+                name=data["fabrics"][0],
+            )
+            message, status, changed = (
+                fabric_instance.create_vlan_stretching(**data)
+            )
+        else:
+            message = "Type not supported - No action taken"
+    elif operation == "update":
+        if data["type"] == "stretched_vlan":
+            fabric_instance = fabric.Fabric(
+                afc_instance.client,
+                name=data["fabrics"][0],
+            )
+            message, status, changed = (
+                fabric_instance.update_vlan_stretching(**data)
+            )
+        else:
+            message = "Type not supported - No action taken"
+    elif operation == "delete":
+        if data["type"] == "vlan_group":
+            vlan_instance = vlan_group.VlanGroup(
+                afc_instance.client,
+                **data,
+            )
+            message, status, changed = vlan_instance.delete_vlan_group()
+        else:
+            message = "Type not supported - No action taken"
     else:
-        message = "Not connected to AFC"
+        message = "Operation not supported - No action taken"
 
-    result["message"] = message
-    result["status"] = status
-    result["changed"] = changed
+    return message, status, changed
 
-    # Exit
-    if status:
-        ansible_module.exit_json(changed=changed, msg=message)
-    else:
-        ansible_module.fail_json(changed=changed, msg=message)
+
+def main():
+    module_args = {
+        "operation": {"type": "str", "required": True},
+        "data": {"type": "dict", "required": True},
+    }
+
+    afc_module = AfcModule(
+        argument_spec=module_args,
+        states={"present": "create", "absent": "delete"},
+    )
+    afc_module.run(run_module)
 
 
 if __name__ == "__main__":
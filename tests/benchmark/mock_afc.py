@@ -0,0 +1,401 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# (C) Copyright 2020-2025 Hewlett Packard Enterprise Development LP.
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""Local stand-in for the HPE ANW Fabric Composer REST API.
+
+The server keeps the objects of fixtures/afc.json in memory and implements
+a generic REST behaviour on top of them, enough for the afc_* modules to
+run their usual workflow: login, name lookups, creation, update and
+deletion. Every request is recorded so that the number of requests, the
+number of logins and the bytes exchanged can be reported per module.
+
+Run it standalone to point playbooks at it:
+
+    python tests/benchmark/mock_afc.py --port 8443
+
+The statistics are returned by GET /__stats and cleared, together with the
+objects, by POST /__reset.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import argparse
+import copy
+import hashlib
+import json
+import os
+import ssl
+import subprocess
+import tempfile
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "afc.json")
+
+# Query parameters filtering on a field with a different name
+QUERY_FIELDS = {
+    "fabrics": "fabric_uuid",
+    "switches": "switch_uuid",
+    "vrfs": "vrf_uuid",
+}
+
+# Endpoints writing to a collection read at another path
+COLLECTION_ALIASES = {"auth/sources/radius": "auth/sources"}
+
+# Endpoints answered with a single object instead of a collection
+STATIC_RESULTS = {
+    "system": {"uuid": "afc-mock", "name": "afc-mock", "software": "7.1.0"},
+    "versions": {"qualified_cx_api_versions": ["10.13"]},
+}
+
+
+class MockAfc:
+    """In-memory AFC state and request statistics."""
+
+    def __init__(self, fixtures=FIXTURES):
+        with open(fixtures) as fixtures_file:
+            self.fixtures = json.load(fixtures_file)
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self, keep_tokens=False):
+        with self.lock:
+            self.state = copy.deepcopy(self.fixtures)
+            if not keep_tokens:
+                self.tokens = set()
+            self.stats = {
+                "requests": 0,
+                "logins": 0,
+                "request_bytes": 0,
+                "response_bytes": 0,
+                "log": [],
+            }
+
+    def record(self, method, path, status, request_bytes, response_bytes):
+        with self.lock:
+            self.stats["requests"] += 1
+            self.stats["request_bytes"] += request_bytes
+            self.stats["response_bytes"] += response_bytes
+            self.stats["log"].append([method, path, status])
+
+    def get_stats(self):
+        with self.lock:
+            return copy.deepcopy(self.stats)
+
+    def login(self, username, password):
+        if not username or not password:
+            return None
+        token = uuid.uuid4().hex
+        with self.lock:
+            self.tokens.add(token)
+            self.stats["logins"] += 1
+        return token
+
+    def logout(self, token):
+        with self.lock:
+            self.tokens.discard(token)
+
+    def is_authorized(self, token):
+        with self.lock:
+            return token in self.tokens
+
+    def _find(self, segments):
+        """Return (collection path, object) addressed by the URL segments.
+
+        Unknown paths are handled as empty collections.
+        """
+        path = "/".join(segments)
+        if path in COLLECTION_ALIASES:
+            return COLLECTION_ALIASES[path], None
+        if path not in self.state and len(segments) > 1:
+            parent = "/".join(segments[:-1])
+            for item in self.state.get(parent, []):
+                if item.get("uuid") == segments[-1]:
+                    return parent, item
+        return path, None
+
+    @staticmethod
+    def _matches(item, query):
+        for key, value in query.items():
+            field = QUERY_FIELDS.get(key, key)
+            if field not in item:
+                continue
+            item_value = item[field]
+            # Comma separated values select any of them, as on AFC
+            values = value.split(",")
+            if isinstance(item_value, list):
+                if not set(values) & set(item_value):
+                    return False
+            elif str(item_value) not in values:
+                return False
+        return True
+
+    def handle(self, method, segments, query, body):
+        """Return the (status code, result) of a request."""
+        with self.lock:
+            if segments and segments[0] in STATIC_RESULTS:
+                return 200, STATIC_RESULTS[segments[0]]
+            if method == "POST" and segments == ["switches", "discover"]:
+                return self._discover(body)
+            collection, item = self._find(segments)
+            items = self.state.setdefault(collection, [])
+            if method == "GET":
+                if item is not None:
+                    return 200, item
+                offset = int(query.pop("offset", 0))
+                limit = query.pop("limit", None)
+                result = [i for i in items if self._matches(i, query)]
+                if limit is not None:
+                    result = result[offset:offset + int(limit)]
+                return 200, result
+            if method == "POST":
+                return self._create(items, body)
+            if method in ("PUT", "PATCH"):
+                return self._update(items, item, body)
+            if method == "DELETE":
+                if item is not None:
+                    items.remove(item)
+                return 200, "Object deleted"
+        return 405, f"Method {method} not allowed"
+
+    @staticmethod
+    def _create(items, body):
+        for new_item in body if isinstance(body, list) else [body]:
+            if not isinstance(new_item, dict):
+                continue
+            duplicate = any(
+                existing.get("name") == new_item.get("name")
+                and existing.get("fabric_uuid") == new_item.get("fabric_uuid")
+                and existing.get("switch_uuid") == new_item.get("switch_uuid")
+                for existing in items
+                if existing.get("name")
+            )
+            if duplicate:
+                return 400, f"{new_item['name']} already exists"
+            new_item.setdefault("uuid", str(uuid.uuid4()))
+            items.append(new_item)
+        return 200, "Object created"
+
+    def _discover(self, body):
+        """Add the requested switches as UNASSIGNED, as AFC does."""
+        switches = self.state.setdefault("switches", [])
+        known = {switch["ip_address"] for switch in switches}
+        result = []
+        for ip_address in body.get("switches", []):
+            if ip_address not in known:
+                switches.append(
+                    {
+                        "uuid": str(uuid.uuid4()),
+                        "name": f"switch-{ip_address}",
+                        "ip_address": ip_address,
+                        "fabric_uuid": None,
+                        "role": None,
+                        "status": "UNASSIGNED",
+                        "health": {"status": "healthy"},
+                    },
+                )
+            result.append({"ip_address": ip_address, "status": "success"})
+        return 200, result
+
+    @staticmethod
+    def _apply(target, operation):
+        """Apply a JSON patch operation, list indexes and - included."""
+        fields = operation["path"].strip("/").split("/")
+        for field in fields[:-1]:
+            if isinstance(target, list):
+                target = target[int(field)]
+            else:
+                target = target.setdefault(field, {})
+        field = fields[-1]
+        if isinstance(target, list):
+            if operation.get("op") == "remove":
+                del target[int(field)]
+            elif field == "-":
+                target.append(operation.get("value"))
+            elif operation.get("op") == "add":
+                target.insert(int(field), operation.get("value"))
+            else:
+                target[int(field)] = operation.get("value")
+        elif operation.get("op") == "remove":
+            target.pop(field, None)
+        else:
+            target[field] = operation.get("value")
+
+    @staticmethod
+    def _update(items, item, body):
+        if item is not None and isinstance(body, dict):
+            item.update(body)
+        elif isinstance(body, list):
+            # Bulk JSON patch: [{"uuids": [...], "patch": [...]}]
+            for change in body:
+                if not isinstance(change, dict):
+                    continue
+                for target in items:
+                    if target.get("uuid") not in change.get("uuids", []):
+                        continue
+                    for operation in change.get("patch", []):
+                        MockAfc._apply(target, operation)
+        return 200, "Object updated"
+
+
+class MockAfcHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    afc = None
+
+    def log_message(self, *args):
+        return None
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _send(self, status, result, received):
+        content = json.dumps({"result": result}).encode("utf-8")
+        etag = None
+        if self.command == "GET" and status == 200:
+            # Lets the resolution cache revalidate with If-None-Match
+            etag = f'"{hashlib.sha256(content).hexdigest()[:16]}"'
+            if self.headers.get("If-None-Match") == etag:
+                status = 304
+                content = b""
+        self.afc.record(
+            self.command,
+            self.path,
+            status,
+            received,
+            len(content),
+        )
+        self.send_response(status)
+        if etag:
+            self.send_header("ETag", etag)
+        if status != 304:
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def _send_stats(self):
+        content = json.dumps(self.afc.get_stats()).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def handle_request(self):
+        raw_body = self._read_body()
+        url = urlsplit(self.path)
+        if url.path == "/__stats":
+            return self._send_stats()
+        if url.path == "/__reset":
+            self.afc.reset()
+            return self._send_stats()
+
+        segments = [segment for segment in url.path.split("/") if segment]
+        if segments[:1] == ["api"]:
+            segments = segments[1:]
+        received = len(raw_body)
+
+        if segments == ["auth", "token"]:
+            if self.command == "POST":
+                token = self.afc.login(
+                    self.headers.get("X-Auth-Username"),
+                    self.headers.get("X-Auth-Password"),
+                )
+                if token:
+                    return self._send(200, token, received)
+                return self._send(401, "Invalid credentials", received)
+            self.afc.logout(self.headers.get("Authorization"))
+            return self._send(200, "Logged out", received)
+
+        if not self.afc.is_authorized(self.headers.get("Authorization")):
+            return self._send(401, "Unauthorized", received)
+
+        try:
+            body = json.loads(raw_body) if raw_body else None
+        except ValueError:
+            return self._send(400, "Invalid JSON body", received)
+        status, result = self.afc.handle(
+            self.command,
+            segments,
+            dict(parse_qsl(url.query)),
+            body,
+        )
+        return self._send(status, result, received)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = handle_request
+
+
+def generate_certificate(directory):
+    """Create a self-signed certificate with openssl, return its paths."""
+    cert = os.path.join(directory, "mock_afc.crt")
+    key = os.path.join(directory, "mock_afc.key")
+    subprocess.run(
+        [
+            "openssl",
+            "req",
+            "-x509",
+            "-newkey",
+            "rsa:2048",
+            "-nodes",
+            "-days",
+            "1",
+            "-subj",
+            "/CN=localhost",
+            "-keyout",
+            key,
+            "-out",
+            cert,
+        ],
+        check=True,
+        capture_output=True,
+    )
+    return cert, key
+
+
+def start_server(afc, port=0, cert=None, key=None):
+    """Serve afc over HTTPS in a background thread, return the server."""
+    if cert is None:
+        cert, key = generate_certificate(tempfile.mkdtemp())
+    handler = type("Handler", (MockAfcHandler,), {"afc": afc})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert, key)
+    server.socket = context.wrap_socket(server.socket, server_side=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8443)
+    parser.add_argument("--fixtures", default=FIXTURES)
+    parser.add_argument("--cert", help="defaults to a self-signed one")
+    parser.add_argument("--key")
+    args = parser.parse_args()
+
+    server = start_server(
+        MockAfc(args.fixtures),
+        port=args.port,
+        cert=args.cert,
+        key=args.key,
+    )
+    print(f"Mock AFC listening on https://127.0.0.1:{args.port}/api/")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# (C) Copyright 2020-2025 Hewlett Packard Enterprise Development LP.
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""Measure the cost of every afc_* module against the mock AFC.
+
+Each scenario of scenarios.yml runs the module once per repetition, in a
+new interpreter as Ansible would, against a freshly reset mock AFC. The
+report gives, per scenario, the median wall time, the number of HTTP
+requests and logins, the request and response bytes and the peak RSS of the
+module process.
+
+    python tests/benchmark/run_benchmark.py
+    python tests/benchmark/run_benchmark.py --repeat 5 afc_vrf afc_fabric
+    python tests/benchmark/run_benchmark.py --json results.json
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import yaml
+from mock_afc import MockAfc, start_server
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+COLLECTION_DIR = os.path.dirname(os.path.dirname(BENCHMARK_DIR))
+SCENARIOS = os.path.join(BENCHMARK_DIR, "scenarios.yml")
+MODULES_PACKAGE = "ansible_collections.arubanetworks.afc.plugins.modules"
+
+AFC_USERNAME = "admin"
+AFC_PASSWORD = "admin_password"
+MODULE_TIMEOUT = 120
+
+
+def collections_path(work_dir):
+    """Return a path from which arubanetworks.afc can be imported."""
+    parts = COLLECTION_DIR.split(os.sep)
+    if parts[-3:-1] == ["ansible_collections", "arubanetworks"]:
+        return os.sep.join(parts[:-3])
+    namespace_dir = os.path.join(
+        work_dir,
+        "ansible_collections",
+        "arubanetworks",
+    )
+    os.makedirs(namespace_dir)
+    os.symlink(COLLECTION_DIR, os.path.join(namespace_dir, "afc"))
+    return work_dir
+
+
+def load_scenarios(path, selected):
+    with open(path) as scenarios_file:
+        scenarios = yaml.safe_load(scenarios_file)
+    if selected:
+        scenarios = [
+            scenario
+            for scenario in scenarios
+            if scenario["module"] in selected or scenario["name"] in selected
+        ]
+    return scenarios
+
+
+def run_module(module, args, env, work_dir):
+    """Run module with args, return (result, wall time, peak RSS in KiB)."""
+    module_path = f"{MODULES_PACKAGE}.{module}"
+    args_path = os.path.join(work_dir, "args.json")
+    with open(args_path, "w") as args_file:
+        json.dump({"ANSIBLE_MODULE_ARGS": args}, args_file)
+    output_path = os.path.join(work_dir, "output.json")
+    errors_path = os.path.join(work_dir, "errors.txt")
+    with open(output_path, "w") as output_file, open(
+        errors_path,
+        "w",
+    ) as errors_file:
+        start = time.perf_counter()
+        process = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                module_path,
+                args_path,
+            ],
+            stdout=output_file,
+            stderr=errors_file,
+            env=env,
+            cwd=work_dir,
+        )
+        # Modules polling for a state the mock never reaches are killed
+        timer = threading.Timer(MODULE_TIMEOUT, process.kill)
+        timer.start()
+        # wait4 returns the resource usage of this process only
+        _pid, status, rusage = os.wait4(process.pid, 0)
+        wall_time = time.perf_counter() - start
+        timer.cancel()
+        process.returncode = os.waitstatus_to_exitcode(status)
+    with open(output_path) as output_file:
+        output = output_file.read()
+    try:
+        result = json.loads(output[output.index("{"):])
+    except ValueError:
+        with open(errors_path) as errors_file:
+            errors = errors_file.read().strip().splitlines()
+        result = {
+            "failed": True,
+            "msg": errors[-1] if errors else "No output",
+        }
+    return result, wall_time, rusage.ru_maxrss
+
+
+def run_scenario(
+    scenario,
+    afc,
+    afc_ip,
+    env,
+    work_dir,
+    repeat,
+    cache,
+    check=False,
+):
+    args = {
+        "afc_ip": afc_ip,
+        "afc_username": AFC_USERNAME,
+        "afc_password": AFC_PASSWORD,
+    }
+    args.update(scenario.get("args") or {})
+    if check:
+        args["_ansible_check_mode"] = True
+        args["_ansible_diff"] = True
+
+    runs = []
+    for _iteration in range(repeat):
+        afc.reset(keep_tokens=cache)
+        result, wall_time, peak_rss = run_module(
+            scenario["module"],
+            args,
+            env,
+            work_dir,
+        )
+        stats = afc.get_stats()
+        runs.append(
+            {
+                "wall_time": wall_time,
+                "peak_rss_kib": peak_rss,
+                "requests": stats["requests"],
+                "logins": stats["logins"],
+                "request_bytes": stats["request_bytes"],
+                "response_bytes": stats["response_bytes"],
+                "failed": bool(result.get("failed")),
+                "changed": bool(result.get("changed")),
+                "msg": str(result.get("msg", "")),
+                "endpoints": stats["log"],
+            },
+        )
+
+    last = runs[-1]
+    return {
+        "name": scenario["name"],
+        "module": scenario["module"],
+        "wall_time": statistics.median(run["wall_time"] for run in runs),
+        "peak_rss_kib": max(run["peak_rss_kib"] for run in runs),
+        "requests": last["requests"],
+        "logins": last["logins"],
+        "request_bytes": last["request_bytes"],
+        "response_bytes": last["response_bytes"],
+        "failed": last["failed"],
+        "changed": last["changed"],
+        "msg": last["msg"],
+        "endpoints": last["endpoints"],
+        "runs": [run["wall_time"] for run in runs],
+    }
+
+
+def print_report(results):
+    header = (
+        f"{'scenario':<36} {'time(s)':>8} {'reqs':>5} {'logins':>6} "
+        f"{'req(B)':>9} {'resp(B)':>9} {'rss(MiB)':>8}  status"
+    )
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        if result["failed"]:
+            status = f"failed: {' '.join(result['msg'].split())[:60]}"
+        else:
+            status = "changed" if result["changed"] else "ok"
+        print(
+            f"{result['name']:<36} {result['wall_time']:>8.3f} "
+            f"{result['requests']:>5} {result['logins']:>6} "
+            f"{result['request_bytes']:>9} {result['response_bytes']:>9} "
+            f"{result['peak_rss_kib'] / 1024:>8.1f}  {status}",
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the afc_* modules against a mock AFC.",
+    )
+    parser.add_argument(
+        "scenarios",
+        nargs="*",
+        help="module or scenario names to run, all by default",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--scenarios-file", default=SCENARIOS)
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="keep the token and resolution caches enabled between runs",
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="run the modules in check mode, with --diff",
+    )
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="afc_benchmark_")
+    # Scenario paths are relative to work_dir, the current directory of
+    # the modules
+    os.symlink(
+        os.path.join(BENCHMARK_DIR, "fixtures"),
+        os.path.join(work_dir, "fixtures"),
+    )
+    afc = MockAfc()
+    server = start_server(afc)
+    afc_ip = f"127.0.0.1:{server.server_address[1]}"
+
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        filter(None, [collections_path(work_dir), env.get("PYTHONPATH")]),
+    )
+    if args.cache:
+        env["AFC_TOKEN_CACHE"] = os.path.join(work_dir, "token_cache.json")
+        env["AFC_RESOLUTION_CACHE"] = os.path.join(
+            work_dir,
+            "resolution_cache.json",
+        )
+    else:
+        env["AFC_TOKEN_CACHE_TTL"] = "0"
+        env["AFC_RESOLUTION_CACHE_TTL"] = "0"
+
+    results = []
+    try:
+        for scenario in load_scenarios(args.scenarios_file, args.scenarios):
+            results.append(
+                run_scenario(
+                    scenario,
+                    afc,
+                    afc_ip,
+                    env,
+                    work_dir,
+                    max(args.repeat, 1),
+                    args.cache,
+                    args.check,
+                ),
+            )
+    finally:
+        server.shutdown()
+
+    print_report(results)
+    if args.json:
+        with open(args.json, "w") as json_file:
+            json.dump(results, json_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+# (C) Copyright 2020-2025 Hewlett Packard Enterprise Development LP.
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+import json
+from contextlib import contextmanager
+from types import SimpleNamespace
+from unittest import mock
+from urllib.parse import parse_qsl, urlsplit
+
+import pytest
+from ansible.module_utils import basic
+from ansible_collections.arubanetworks.afc.plugins.module_utils import afc
+from ansible_collections.arubanetworks.afc.plugins.module_utils.afc import (
+    AFC_MAX_CONCURRENT_REQUESTS_ENV,
+    AFC_RESOLUTION_CACHE_TTL_ENV,
+    AfcConnectionResponse,
+)
+from ansible_collections.arubanetworks.afc.tests.benchmark.mock_afc import (
+    MockAfc,
+)
+
+try:
+    from ansible.module_utils.testing import patch_module_args
+except ImportError:  # ansible-core < 2.19
+
+    @contextmanager
+    def patch_module_args(args=None):
+        serialized = json.dumps({"ANSIBLE_MODULE_ARGS": args or {}})
+        with mock.patch.object(basic, "_ANSIBLE_ARGS", serialized.encode()):
+            yield
+
+
+class AnsibleExit(Exception):
+    """Raised by exit_json and fail_json with the result of the module."""
+
+
+class MockAfcClient:
+    """Client sending the requests to the in-memory AFC of the benchmark.
+
+    Exposes the subset of the httpx.Client interface used by pyafc and
+    records the requests sent.
+    """
+
+    def __init__(self, afc):
+        self.afc = afc
+        self.requests = []
+        self.is_closed = False
+
+    def request(self, method, url, data=None, headers=None, **kwargs):
+        url = urlsplit(str(url))
+        body = kwargs.get("json")
+        if data is not None:
+            body = json.loads(data)
+        self.requests.append((method, url.geturl(), body))
+        status, result = self.afc.handle(
+            method,
+            [segment for segment in url.path.split("/") if segment],
+            dict(parse_qsl(url.query)),
+            body,
+        )
+        return AfcConnectionResponse(
+            {"status_code": status, "text": json.dumps({"result": result})},
+        )
+
+    def writes(self):
+        """Return the (method, URL, body) of the requests but the GETs."""
+        return [request for request in self.requests if request[0] != "GET"]
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request("PUT", url, **kwargs)
+
+    def patch(self, url, **kwargs):
+        return self.request("PATCH", url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request("DELETE", url, **kwargs)
+
+    def close(self):
+        self.is_closed = True
+
+
+@pytest.fixture
+def mock_afc():
+    """Return the in-memory AFC, loaded with the benchmark fixtures."""
+    return MockAfc()
+
+
+@pytest.fixture
+def client(mock_afc):
+    return MockAfcClient(mock_afc)
+
+
+@pytest.fixture
+def run_afc_module(client, monkeypatch):
+    """Return a function running a module against the in-memory AFC.
+
+    run_afc_module(module, args) returns the result of the module, with
+    failed set when it fails.
+    """
+    monkeypatch.setenv(AFC_RESOLUTION_CACHE_TTL_ENV, "0")
+    monkeypatch.setenv(AFC_MAX_CONCURRENT_REQUESTS_ENV, "0")
+    monkeypatch.setattr(
+        afc,
+        "instantiate_afc_object",
+        lambda data=None, module=None: SimpleNamespace(
+            client=client,
+            afc_connected=True,
+            disconnect=lambda: None,
+        ),
+    )
+
+    def exit_json(module, **result):
+        raise AnsibleExit(result)
+
+    def fail_json(module, **result):
+        raise AnsibleExit(dict(result, failed=True))
+
+    monkeypatch.setattr(basic.AnsibleModule, "exit_json", exit_json)
+    monkeypatch.setattr(basic.AnsibleModule, "fail_json", fail_json)
+
+    def run(module, args):
+        args = dict(
+            args,
+            afc_ip="127.0.0.1",
+            afc_username="admin",
+            afc_password="admin",
+        )
+        with patch_module_args(args), pytest.raises(AnsibleExit) as exit:
+            module.main()
+        return exit.value.args[0]
+
+    return run
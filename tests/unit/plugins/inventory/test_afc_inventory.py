@@ -0,0 +1,49 @@
+# (C) Copyright 2020-2025 Hewlett Packard Enterprise Development LP.
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from types import SimpleNamespace
+
+import pytest
+from ansible_collections.arubanetworks.afc.plugins.inventory.afc import (
+    InventoryModule,
+)
+
+
+@pytest.fixture
+def inventory():
+    plugin = InventoryModule()
+    plugin.get_option = lambda name: None
+    return plugin
+
+
+@pytest.mark.parametrize(
+    ("auth", "revoked"),
+    [({"auth_token": "token"}, False), ({"username": "admin"}, True)],
+)
+def test_fetch_closes_the_client(inventory, client, auth, revoked):
+    disconnected = []
+    inventory._connect = lambda: SimpleNamespace(
+        afc_data=dict(auth, ip="10.10.10.10"),
+        client=client,
+        disconnect=lambda: disconnected.append(True),
+    )
+
+    result = inventory._fetch(None)
+
+    assert result["fabrics"]
+    assert client.is_closed
+    assert bool(disconnected) is revoked
+
+
+def test_fetch_closes_the_client_on_error(inventory, client, mock_afc):
+    inventory._connect = lambda: SimpleNamespace(
+        afc_data={"ip": "10.10.10.10", "auth_token": "token"},
+        client=client,
+        disconnect=lambda: None,
+    )
+    mock_afc.handle = lambda *args: (500, "Internal error")
+
+    with pytest.raises(Exception, match="returned 500"):
+        inventory._fetch(None)
+    assert client.is_closed
@@ -0,0 +1,125 @@
+# (C) Copyright 2020-2025 Hewlett Packard Enterprise Development LP.
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+import json
+
+import pytest
+from ansible_collections.arubanetworks.afc.plugins.module_utils.afc import (
+    AfcChangeRecorder,
+    AfcCheckModeStop,
+)
+
+VRF_UUID = "8c5e3ac2-ac19-5057-8868-bc70ab760195"
+
+
+def existing_vrf(client):
+    return client.get(f"vrfs/{VRF_UUID}").json()["result"]
+
+
+def test_check_mode_stops_at_the_first_write_changing_afc(client):
+    recorder = AfcChangeRecorder(client, check_mode=True)
+    vrf = {"name": "New-VRF", "fabric_uuid": "f"}
+
+    with pytest.raises(AfcCheckModeStop):
+        recorder.post("vrfs", data=json.dumps(vrf))
+
+    assert client.writes() == []
+    assert recorder.changes == [("POST", "vrfs", None, vrf)]
+
+
+def test_check_mode_answers_writes_changing_nothing(client):
+    recorder = AfcChangeRecorder(client, check_mode=True)
+    vrf = existing_vrf(client)
+
+    created = recorder.post(
+        "vrfs",
+        data=json.dumps(
+            {"name": vrf["name"], "fabric_uuid": vrf["fabric_uuid"]},
+        ),
+    )
+    updated = recorder.put(f"vrfs/{VRF_UUID}", data=json.dumps(vrf))
+
+    assert created.status_code == 400
+    assert "already exists" in created.json()["result"]
+    assert updated.status_code == 200
+    assert recorder.changes == []
+    assert client.writes() == []
+
+
+def test_check_mode_records_the_updated_object(client):
+    recorder = AfcChangeRecorder(client, check_mode=True)
+    before = existing_vrf(client)
+
+    with pytest.raises(AfcCheckModeStop):
+        recorder.put(f"vrfs/{VRF_UUID}", data=json.dumps({"vni": 9999}))
+
+    assert recorder.changes == [
+        ("PUT", f"vrfs/{VRF_UUID}", before, dict(before, vni=9999)),
+    ]
+
+
+def test_check_mode_delete_of_a_missing_object_changes_nothing(client):
+    recorder = AfcChangeRecorder(client, check_mode=True)
+
+    response = recorder.delete("vrfs/00000000-0000-0000-0000-000000000000")
+
+    assert response.status_code == 200
+    assert recorder.changes == []
+
+
+def test_bulk_patch_records_each_changed_object(client):
+    recorder = AfcChangeRecorder(client, check_mode=True)
+    ports = client.get("ports").json()["result"][:2]
+    patch = [{"path": "/description", "value": "uplink", "op": "replace"}]
+
+    with pytest.raises(AfcCheckModeStop):
+        recorder.patch(
+            "ports",
+            data=json.dumps(
+                [{"uuids": [port["uuid"] for port in ports], "patch": patch}],
+            ),
+        )
+
+    assert [change[1] for change in recorder.changes] == [
+        f"ports/{port['uuid']}" for port in ports
+    ]
+    assert all(
+        after["description"] == "uplink"
+        for _method, _path, _before, after in recorder.changes
+    )
+
+
+def test_writes_are_sent_and_recorded_outside_check_mode(client):
+    recorder = AfcChangeRecorder(client)
+
+    recorder.delete(f"vrfs/{VRF_UUID}")
+
+    assert client.writes() == [("DELETE", f"vrfs/{VRF_UUID}", None)]
+    assert [change[0] for change in recorder.changes] == ["DELETE"]
+    assert recorder.changes[0][3] is None
+
+
+def test_session_requests_are_not_recorded(client):
+    recorder = AfcChangeRecorder(client, check_mode=True)
+
+    recorder.post("auth/token")
+
+    assert recorder.changes == []
+    assert client.writes() == [("POST", "auth/token", None)]
+
+
+def test_diff_has_one_entry_per_change(client):
+    recorder = AfcChangeRecorder(client, check_mode=True)
+    before = existing_vrf(client)
+    with pytest.raises(AfcCheckModeStop):
+        recorder.delete(f"vrfs/{VRF_UUID}")
+
+    assert recorder.diff() == [
+        {
+            "before_header": f"DELETE vrfs/{VRF_UUID}",
+            "after_header": f"DELETE vrfs/{VRF_UUID}",
+            "before": before,
+            "after": "",
+        },
+    ]
@@ -0,0 +1,100 @@
+# (C) Copyright 2020-2025 Hewlett Packard Enterprise Development LP.
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+import json
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from ansible_collections.arubanetworks.afc.plugins.module_utils.afc import (
+    batches,
+    iter_collection,
+)
+
+ITEMS = [{"uuid": str(index), "name": f"VRF{index}"} for index in range(7)]
+
+
+class Response:
+    status_code = 200
+
+    def __init__(self, result):
+        self.text = json.dumps({"result": result})
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class Client:
+    """Answer GET requests with ITEMS, honouring offset or not."""
+
+    def __init__(self, ignore_offset=False, unpaginated=ITEMS):
+        self.ignore_offset = ignore_offset
+        self.unpaginated = unpaginated
+        self.urls = []
+
+    def get(self, url):
+        self.urls.append(url)
+        query = parse_qs(urlparse(url).query)
+        if "limit" not in query:
+            return Response(self.unpaginated)
+        offset = 0 if self.ignore_offset else int(query["offset"][0])
+        return Response(ITEMS[offset:offset + int(query["limit"][0])])
+
+
+def uuids(items):
+    return [item["uuid"] for item in items]
+
+
+def test_reads_every_page():
+    client = Client()
+
+    items = list(iter_collection(client, "vrfs", page_size=3))
+
+    assert uuids(items) == uuids(ITEMS)
+    assert len(client.urls) == 3
+
+
+def test_reads_in_full_when_offset_is_ignored():
+    client = Client(ignore_offset=True)
+
+    items = list(iter_collection(client, "vrfs", page_size=3))
+
+    assert uuids(items) == uuids(ITEMS)
+    assert client.urls[-1] == "vrfs"
+
+
+def test_keeps_filters_when_offset_is_ignored():
+    client = Client(ignore_offset=True)
+
+    list(
+        iter_collection(
+            client,
+            "vrfs",
+            filters={"fabrics": "f"},
+            page_size=3,
+        ),
+    )
+
+    assert client.urls[-1] == "vrfs?fabrics=f"
+
+
+def test_raises_when_the_collection_cannot_be_read_in_full():
+    client = Client(ignore_offset=True, unpaginated=ITEMS[::-1])
+
+    with pytest.raises(ValueError):
+        list(iter_collection(client, "vrfs", page_size=3))
+
+
+@pytest.mark.parametrize(
+    ("batch_size", "expected"),
+    [
+        (3, [[0, 1, 2], [3, 4, 5], [6]]),
+        (7, [list(range(7))]),
+        (10, [list(range(7))]),
+        (0, [list(range(7))]),
+        (None, [list(range(7))]),
+    ],
+)
+def test_batches(batch_size, expected):
+    assert batches(list(range(7)), batch_size) == expected
+    assert batches([], batch_size) == []
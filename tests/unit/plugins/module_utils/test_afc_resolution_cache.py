@@ -0,0 +1,50 @@
+# (C) Copyright 2020-2025 Hewlett Packard Enterprise Development LP.
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+import pytest
+from ansible_collections.arubanetworks.afc.plugins.module_utils.afc import (
+    AFC_RESOLUTION_CACHE_ENV,
+    AFC_RESOLUTION_CACHE_TTL_ENV,
+    AfcConnectionResponse,
+    AfcResolutionFileCache,
+)
+
+IP = "10.10.10.10"
+
+
+@pytest.fixture(autouse=True)
+def cache_file(tmp_path, monkeypatch):
+    path = tmp_path / "resolution_cache.json"
+    monkeypatch.setenv(AFC_RESOLUTION_CACHE_ENV, str(path))
+    monkeypatch.setenv(AFC_RESOLUTION_CACHE_TTL_ENV, "300")
+    return path
+
+
+def response(text):
+    return AfcConnectionResponse({"status_code": 200, "text": text})
+
+
+def test_entries_kept_per_user():
+    admin = AfcResolutionFileCache.from_env({"ip": IP, "username": "admin"})
+    token = AfcResolutionFileCache.from_env({"ip": IP, "auth_token": "t"})
+
+    admin.set("fabrics", response('{"result": []}'))
+
+    assert admin.get("fabrics").text == '{"result": []}'
+    assert token.get("fabrics") is None
+
+
+def test_write_invalidates_the_lookups_of_every_user():
+    lookup = AfcResolutionFileCache.from_env({"ip": IP, "username": "ro"})
+    other = AfcResolutionFileCache.from_env({"ip": "10.10.10.11"})
+    for cache in (lookup, other):
+        cache.set("fabrics", response('{"result": []}'))
+        cache.set("switches", response('{"result": []}'))
+
+    # Write of another user, e.g. through the httpapi connection
+    AfcResolutionFileCache.from_env({"ip": IP}).invalidate("fabrics/uuid")
+
+    assert lookup.get("fabrics") is None
+    assert lookup.get("switches") is not None
+    assert other.get("fabrics") is not None
@@ -0,0 +1,163 @@
+# (C) Copyright 2020-2025 Hewlett Packard Enterprise Development LP.
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import httpx
+import pytest
+from ansible_collections.arubanetworks.afc.plugins.module_utils import afc
+
+
+class Response:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record the delays instead of sleeping."""
+    delays = []
+    monkeypatch.setattr(afc.time, "sleep", delays.append)
+    return delays
+
+
+def responses(*status_codes):
+    """Return a send function answering status_codes in turn."""
+    answers = iter(Response(status_code) for status_code in status_codes)
+    return lambda: next(answers)
+
+
+def test_backoff_is_capped_by_max_delay(monkeypatch):
+    monkeypatch.setattr(afc.random, "uniform", lambda low, high: high)
+    policy = afc.AfcRetryPolicy(retries=10, backoff=1.0, max_delay=5.0)
+
+    delays = [policy.delay(attempt) for attempt in range(5)]
+
+    assert delays == [1.0, 2.0, 4.0, 5.0, 5.0]
+
+
+def test_backoff_uses_full_jitter(monkeypatch):
+    bounds = []
+    monkeypatch.setattr(
+        afc.random,
+        "uniform",
+        lambda low, high: bounds.append((low, high)) or 0.0,
+    )
+    policy = afc.AfcRetryPolicy(retries=3, backoff=0.5, max_delay=30.0)
+
+    policy.delay(2)
+
+    assert bounds == [(0, 2.0)]
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [("3", 3.0), ("0", 0.0), ("-4", 0.0), ("soon", None), ("", None)],
+)
+def test_retry_after_seconds(value, expected):
+    response = Response(429, {"Retry-After": value})
+
+    assert afc.AfcRetryPolicy.retry_after(response) == expected
+
+
+def test_retry_after_http_date():
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+    response = Response(503, {"Retry-After": format_datetime(retry_at)})
+
+    delay = afc.AfcRetryPolicy.retry_after(response)
+
+    assert 25.0 < delay <= 30.0
+
+
+def test_retry_after_is_capped_by_max_delay():
+    policy = afc.AfcRetryPolicy(retries=3, backoff=1.0, max_delay=10.0)
+    response = Response(429, {"Retry-After": "120"})
+
+    assert policy.delay(0, response) == 10.0
+
+
+def test_send_retries_throttled_requests(sleeps):
+    policy = afc.AfcRetryPolicy(retries=5, backoff=0.0, max_delay=1.0)
+    retries = []
+
+    response = policy.send(
+        "POST",
+        responses(429, 503, 200),
+        on_retry=lambda: retries.append(True),
+    )
+
+    assert response.status_code == 200
+    assert len(sleeps) == 2
+    assert len(retries) == 2
+
+
+def test_send_returns_last_response_when_retries_are_exhausted(sleeps):
+    policy = afc.AfcRetryPolicy(retries=2, backoff=0.0, max_delay=1.0)
+
+    response = policy.send("GET", responses(503, 503, 503, 200))
+
+    assert response.status_code == 503
+    assert len(sleeps) == 2
+
+
+@pytest.mark.parametrize(
+    ("method", "sent"),
+    [("GET", 2), ("PUT", 2), ("DELETE", 2), ("POST", 1), ("PATCH", 1)],
+)
+def test_send_retries_gateway_errors_of_idempotent_methods(
+    sleeps,
+    method,
+    sent,
+):
+    policy = afc.AfcRetryPolicy(retries=3, backoff=0.0, max_delay=1.0)
+    calls = []
+
+    def send():
+        calls.append(method)
+        return Response(502 if len(calls) == 1 else 200)
+
+    policy.send(method, send)
+
+    assert len(calls) == sent
+
+
+def test_send_retries_connection_errors_of_every_method(sleeps):
+    policy = afc.AfcRetryPolicy(retries=3, backoff=0.0, max_delay=1.0)
+    calls = []
+
+    def send():
+        calls.append(True)
+        if len(calls) == 1:
+            raise httpx.ConnectError("refused")
+        return Response(201)
+
+    assert policy.send("POST", send).status_code == 201
+    assert len(calls) == 2
+
+
+def test_send_raises_read_timeouts_of_non_idempotent_methods(sleeps):
+    policy = afc.AfcRetryPolicy(retries=3, backoff=0.0, max_delay=1.0)
+
+    def send():
+        raise httpx.ReadTimeout("timed out")
+
+    with pytest.raises(httpx.ReadTimeout):
+        policy.send("POST", send)
+    assert sleeps == []
+
+
+def test_from_env(monkeypatch):
+    monkeypatch.setenv(afc.AFC_RETRIES_ENV, "2")
+    monkeypatch.setenv(afc.AFC_RETRY_BACKOFF_ENV, "0.25")
+    monkeypatch.setenv(afc.AFC_RETRY_MAX_DELAY_ENV, "4")
+
+    policy = afc.AfcRetryPolicy.from_env()
+
+    assert (policy.retries, policy.backoff, policy.max_delay) == (
+        2,
+        0.25,
+        4.0,
+    )
@@ -0,0 +1,96 @@
+# (C) Copyright 2020-2025 Hewlett Packard Enterprise Development LP.
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+import httpx
+import pytest
+from ansible_collections.arubanetworks.afc.plugins.module_utils import afc
+
+SYSTEM = {"uuid": "afc", "name": "afc"}
+VERSIONS = {"qualified_cx_api_versions": ["10.13"]}
+
+
+@pytest.fixture
+def afc_requests(monkeypatch):
+    """Answer the requests of the AFC clients with answer(request)."""
+    requests = []
+    answers = {}
+
+    def handler(request):
+        requests.append(request)
+        return answers["answer"](request)
+
+    monkeypatch.setenv(afc.AFC_RETRIES_ENV, "0")
+    monkeypatch.setattr(
+        afc,
+        "build_afc_client",
+        lambda ip: httpx.Client(
+            base_url=f"https://{ip}/api/",
+            transport=httpx.MockTransport(handler),
+        ),
+    )
+
+    def answer_with(answer):
+        answers["answer"] = answer
+        return requests
+
+    return answer_with
+
+
+def system_answer(status_code):
+    def answer(request):
+        if status_code != 200:
+            return httpx.Response(status_code, json={"result": "Expired"})
+        result = SYSTEM if request.url.path.endswith("system") else VERSIONS
+        return httpx.Response(200, json={"result": result})
+
+    return answer
+
+
+def test_valid_token_reads_the_system(afc_requests):
+    requests = afc_requests(system_answer(200))
+
+    afc_instance = afc.connect_with_token("10.10.10.10", "token")
+
+    assert afc_instance.afc_connected
+    assert afc_instance.name == "afc"
+    assert [request.url.path for request in requests] == [
+        "/api/system",
+        "/api/versions",
+    ]
+    assert requests[0].headers["Authorization"] == "token"
+
+
+@pytest.mark.parametrize("status_code", [401, 403])
+def test_rejected_token_returns_none(afc_requests, status_code):
+    afc_requests(system_answer(status_code))
+
+    assert afc.connect_with_token("10.10.10.10", "token") is None
+
+
+def test_network_error_is_raised(afc_requests):
+    def answer(request):
+        raise httpx.ConnectError("unreachable", request=request)
+
+    afc_requests(answer)
+
+    with pytest.raises(httpx.ConnectError):
+        afc.connect_with_token("10.10.10.10", "token")
+
+
+def test_network_error_does_not_log_in_again(afc_requests, tmp_path):
+    cache = afc.AfcTokenCache(str(tmp_path / "tokens.json"), 300)
+    data = {"ip": "10.10.10.10", "username": "admin", "password": "pw"}
+    cache.set(data["ip"], data["username"], data["password"], "token")
+
+    def answer(request):
+        raise httpx.ConnectError("unreachable", request=request)
+
+    requests = afc_requests(answer)
+
+    with pytest.raises(httpx.ConnectError):
+        cache.get_afc_session(data)
+    assert [request.url.path for request in requests] == ["/api/system"]
+    assert cache.get(data["ip"], data["username"], data["password"]) == (
+        "token"
+    )
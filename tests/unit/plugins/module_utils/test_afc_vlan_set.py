@@ -0,0 +1,109 @@
+# (C) Copyright 2020-2025 Hewlett Packard Enterprise Development LP.
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+import pytest
+from ansible_collections.arubanetworks.afc.plugins.module_utils.afc import (
+    VlanSet,
+    normalize_vlans,
+)
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        ("1", "1"),
+        ("4094", "4094"),
+        ("1-4094", "1-4094"),
+        ("1,4094", "1,4094"),
+        (1, "1"),
+        ([4094, "1-2"], "1-2,4094"),
+        ("", ""),
+        (None, ""),
+    ],
+)
+def test_parse_bounds(value, expected):
+    assert str(VlanSet.parse(value)) == expected
+
+
+def test_parse_bounds_count():
+    assert len(VlanSet.parse("1-4094")) == 4094
+    assert 1 in VlanSet.parse("1")
+    assert 4094 in VlanSet.parse("4094")
+    assert 0 not in VlanSet.parse("1-4094")
+    assert 4095 not in VlanSet.parse("1-4094")
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        ("10-20,15-25", "10-25"),
+        ("10-20,21-30", "10-30"),
+        ("30,10-20,20", "10-20,30"),
+        ("10-20,12-14", "10-20"),
+        ("5,5,5", "5"),
+        (" 10 - 12 , 11 ", "10-12"),
+        ([10, 11, "12-13", 20], "10-13,20"),
+    ],
+)
+def test_parse_merges_overlapping_ranges(value, expected):
+    assert str(VlanSet.parse(value)) == expected
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        "0",
+        "4095",
+        "0-10",
+        "4000-4095",
+        "20-10",
+        "10-",
+        "-10",
+        "10-20-30",
+        "abc",
+        "10,x",
+        [0],
+        [4095],
+        [1.5],
+        True,
+        [True],
+        {"vlan": 10},
+    ],
+)
+def test_parse_rejects_invalid_values(value):
+    with pytest.raises(ValueError):
+        VlanSet.parse(value)
+
+
+def test_iter_and_ranges():
+    vlans = VlanSet.parse("1-3,10,4093-4094")
+
+    assert list(vlans) == [1, 2, 3, 10, 4093, 4094]
+    assert list(vlans.ranges()) == [(1, 3), (10, 10), (4093, 4094)]
+
+
+def test_set_operations():
+    trunk = VlanSet.parse("10-20,30")
+
+    assert str(trunk | VlanSet.parse([21, 22])) == "10-22,30"
+    assert str(trunk & VlanSet.parse("15-40")) == "15-20,30"
+    assert str(trunk - VlanSet.parse("15-40")) == "10-14"
+    assert str(trunk ^ VlanSet.parse("20-21")) == "10-19,21,30"
+    assert VlanSet.parse("12-14").issubset(trunk)
+    assert not VlanSet.parse("12-40").issubset(trunk)
+    assert VlanSet.parse("30,10-20") == trunk
+    assert not VlanSet()
+
+
+def test_normalize_vlans():
+    config = {"name": "trunk", "vlans": [20, "10-15"], "native_vlan": 1}
+
+    assert normalize_vlans(config) == {
+        "name": "trunk",
+        "vlans": "10-15,20",
+        "native_vlan": 1,
+    }
+    assert normalize_vlans(None) is None
+    with pytest.raises(ValueError):
+        normalize_vlans({"vlans": "4095"})
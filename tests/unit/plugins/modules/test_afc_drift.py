@@ -0,0 +1,56 @@
+# (C) Copyright 2020-2025 Hewlett Packard Enterprise Development LP.
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from ansible_collections.arubanetworks.afc.plugins.modules.afc_drift import (
+    compare,
+    entry,
+    normalize,
+)
+
+
+def test_normalize_ignores_nested_fields():
+    item = {
+        "name": "Aruba-VRF",
+        "health": {"status": "up"},
+        "bgp": {"uuid": "1", "health": {"status": "down"}, "asn": 65000},
+        "entries": [{"uuid": "2", "seq": 10}],
+    }
+
+    assert normalize(item, ("health", "uuid")) == {
+        "name": "Aruba-VRF",
+        "bgp": {"asn": 65000},
+        "entries": [{"seq": 10}],
+    }
+
+
+def test_normalize_sorts_lists_of_strings_only():
+    item = {"switch_uuids": ["b", "a"], "entries": [{"seq": 2}, {"seq": 1}]}
+
+    assert normalize(item) == {
+        "switch_uuids": ["a", "b"],
+        "entries": [{"seq": 2}, {"seq": 1}],
+    }
+
+
+def test_nested_ignored_fields_do_not_drift():
+    baseline = {"uuid": "1", "name": "VRF", "bgp": {"health": "up"}}
+    live = {"uuid": "1", "name": "VRF", "bgp": {"health": "down"}}
+
+    assert compare(
+        "vrfs",
+        {"1": entry(live, ("health",))},
+        {"1": entry(baseline, ("health",))},
+    ) == []
+
+
+def test_compare_reports_added_removed_and_modified():
+    live = {"1": {"sha256": "a", "name": "A"}, "2": {"sha256": "b"}}
+    baseline = {"1": {"sha256": "x", "name": "A"}, "3": {"sha256": "c"}}
+
+    changes = {
+        difference["uuid"]: difference["change"]
+        for difference in compare("vrfs", live, baseline)
+    }
+
+    assert changes == {"1": "modified", "2": "added", "3": "removed"}
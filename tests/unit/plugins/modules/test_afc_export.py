@@ -0,0 +1,83 @@
+# (C) Copyright 2020-2025 Hewlett Packard Enterprise Development LP.
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+import json
+
+from ansible_collections.arubanetworks.afc.plugins.modules import afc_export
+
+OBJECT_TYPES = ["fabrics", "vrfs", "ip_interfaces"]
+
+
+def export(run_afc_module, dest, **args):
+    return run_afc_module(
+        afc_export,
+        dict(
+            {
+                "dest": str(dest),
+                "format": "json",
+                "object_types": OBJECT_TYPES,
+            },
+            **args,
+        ),
+    )
+
+
+def test_manifest_holds_the_hash_of_each_file(
+    run_afc_module,
+    client,
+    tmp_path,
+):
+    result = export(run_afc_module, tmp_path)
+
+    assert result["changed"] is True, result
+    manifest = json.loads((tmp_path / "manifest.json").read_text())
+    assert manifest == result["manifest"]
+    assert sorted(manifest["types"]) == sorted(OBJECT_TYPES)
+    for object_type, entry in manifest["types"].items():
+        lines = (tmp_path / entry["file"]).read_text().splitlines()
+        assert len(lines) == entry["count"]
+        assert entry["sha256"] == afc_export.hash_type(client, object_type)[0]
+
+
+def test_unchanged_types_are_not_written_again(
+    run_afc_module,
+    mock_afc,
+    tmp_path,
+):
+    export(run_afc_module, tmp_path)
+    mock_afc.state["vrfs"][0]["description"] = "Changed"
+
+    result = export(run_afc_module, tmp_path)
+
+    assert result["exported"] == ["vrfs"]
+    assert result["unchanged"] == ["fabrics", "ip_interfaces"]
+
+    result = export(run_afc_module, tmp_path)
+
+    assert result["changed"] is False
+    assert result["exported"] == []
+
+
+def test_ip_interfaces_exported_with_their_vrf(
+    run_afc_module,
+    mock_afc,
+    tmp_path,
+):
+    vrf = next(
+        vrf for vrf in mock_afc.state["vrfs"] if vrf["name"] == "Aruba-VRF"
+    )
+    mock_afc.handle(
+        "POST",
+        ["vrfs", vrf["uuid"], "ip_interfaces"],
+        {},
+        [{"name": "VLAN10", "vlan": 10}],
+    )
+
+    export(run_afc_module, tmp_path, object_types=["ip_interfaces"])
+
+    lines = (tmp_path / "ip_interfaces.json").read_text().splitlines()
+    vrf_uuids = {
+        item["name"]: item["vrf_uuid"] for item in map(json.loads, lines)
+    }
+    assert vrf_uuids["VLAN10"] == vrf["uuid"]
@@ -0,0 +1,121 @@
+# (C) Copyright 2020-2025 Hewlett Packard Enterprise Development LP.
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+import json
+
+import pytest
+from ansible_collections.arubanetworks.afc.plugins.modules import (
+    afc_export,
+    afc_import,
+)
+
+OBJECT_TYPES = ["fabrics", "vrfs", "ip_interfaces"]
+
+
+@pytest.fixture
+def snapshot(run_afc_module, mock_afc, client, tmp_path):
+    """Export the fabrics, VRFs and an IP interface, then remove them."""
+    vrf = next(
+        vrf for vrf in mock_afc.state["vrfs"] if vrf["name"] == "Aruba-VRF"
+    )
+    mock_afc.handle(
+        "POST",
+        ["vrfs", vrf["uuid"], "ip_interfaces"],
+        {},
+        [{"name": "VLAN10", "vlan": 10}],
+    )
+    result = run_afc_module(
+        afc_export,
+        {
+            "dest": str(tmp_path),
+            "format": "json",
+            "object_types": OBJECT_TYPES,
+        },
+    )
+    assert result["changed"] is True, result
+    # Another AFC, without the objects of the snapshot
+    for path in list(mock_afc.state):
+        if path.startswith(("fabrics", "vrfs")):
+            mock_afc.state[path] = []
+    client.requests.clear()
+    return tmp_path
+
+
+def import_snapshot(run_afc_module, src):
+    return run_afc_module(
+        afc_import,
+        {"src": str(src), "object_types": OBJECT_TYPES},
+    )
+
+
+def test_remap_replaces_nested_uuids():
+    uuid_map = {"old-fabric": "new-fabric", "old-vrf": "new-vrf"}
+    item = {
+        "fabric_uuid": "old-fabric",
+        "vrfs": [{"uuid": "old-vrf"}, "other"],
+        "vni": 10,
+    }
+
+    assert afc_import.remap(item, uuid_map) == {
+        "fabric_uuid": "new-fabric",
+        "vrfs": [{"uuid": "new-vrf"}, "other"],
+        "vni": 10,
+    }
+
+
+def test_objects_created_by_level_with_their_new_uuids(
+    run_afc_module,
+    mock_afc,
+    client,
+    snapshot,
+):
+    result = import_snapshot(run_afc_module, snapshot)
+
+    assert result["changed"] is True, result
+    assert result["errors"] == []
+    # Each level is created once the objects it refers to exist
+    levels = [
+        "ip_interfaces" if url.endswith("/ip_interfaces") else url
+        for method, url, _body in client.writes()
+    ]
+    assert levels == sorted(levels, key=OBJECT_TYPES.index)
+    assert set(levels) == set(OBJECT_TYPES)
+    fabric_uuids = {
+        fabric["name"]: fabric["uuid"] for fabric in mock_afc.state["fabrics"]
+    }
+    vrf = next(
+        vrf for vrf in mock_afc.state["vrfs"] if vrf["name"] == "Aruba-VRF"
+    )
+    assert vrf["fabric_uuid"] == fabric_uuids["Aruba-Fabric"]
+    # The IP interface is created in the new VRF, without the vrf_uuid
+    # field added by the export
+    [body] = [
+        body
+        for method, url, body in client.writes()
+        if url == f"vrfs/{vrf['uuid']}/ip_interfaces"
+    ]
+    assert [item["name"] for item in body] == ["VLAN10"]
+    assert "vrf_uuid" not in body[0]
+
+    client.requests.clear()
+    result = import_snapshot(run_afc_module, snapshot)
+
+    assert result["changed"] is False, result
+    assert client.writes() == []
+
+
+def test_snapshot_not_matching_the_manifest_is_rejected(
+    run_afc_module,
+    client,
+    snapshot,
+):
+    manifest = json.loads((snapshot / "manifest.json").read_text())
+    vrfs = snapshot / manifest["types"]["vrfs"]["file"]
+    vrfs.write_text(vrfs.read_text().replace("Aruba-VRF", "Edited-VRF"))
+
+    result = import_snapshot(run_afc_module, snapshot)
+
+    assert result["failed"] is True
+    assert "vrfs.json does not match manifest.json" in result["msg"]
+    assert client.writes() == []
@@ -0,0 +1,188 @@
+# (C) Copyright 2020-2025 Hewlett Packard Enterprise Development LP.
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+import json
+from types import SimpleNamespace
+
+from ansible_collections.arubanetworks.afc.plugins.module_utils.afc import (
+    AfcConnectionResponse,
+)
+from ansible_collections.arubanetworks.afc.plugins.modules import (
+    afc_ip_interface,
+)
+
+IpInterfaceBatch = afc_ip_interface.IpInterfaceBatch
+
+FABRIC_UUID = "7bee36dc-3458-5dc7-bcdb-ee665f0c711f"
+VRF = SimpleNamespace(uuid="8c5e3ac2-ac19-5057-8868-bc70ab760195", name="VRF")
+
+
+def routed(switch, port, address):
+    return {
+        "name": f"Routed-{switch}-{port}",
+        "if_type": "routed",
+        "interface": port,
+        "switches": [switch],
+        "ipv4_primary_address": {"address": address, "prefix_length": 31},
+    }
+
+
+def add_internal_lag(mock_afc, switch, port):
+    switch_uuid = next(
+        item["uuid"]
+        for item in mock_afc.state["switches"]
+        if item["ip_address"] == switch
+    )
+    port_uuid = next(
+        item["uuid"]
+        for item in mock_afc.state["ports"]
+        if item["switch_uuid"] == switch_uuid and item["name"] == port
+    )
+    lag = {
+        "name": f"LAG#{port}",
+        "type": "internal",
+        "fabric_uuid": FABRIC_UUID,
+        "port_properties": [
+            {"switch_uuid": switch_uuid, "port_uuids": [port_uuid]},
+        ],
+    }
+    mock_afc.handle("POST", ["lags"], {}, lag)
+    return switch_uuid
+
+
+def test_routed_ports_read_once_for_all_switches(mock_afc, client):
+    leaf1 = add_internal_lag(mock_afc, "10.10.10.7", "1/1/1")
+    leaf2 = add_internal_lag(mock_afc, "10.10.10.8", "1/1/2")
+    batch = IpInterfaceBatch(client, VRF, "Aruba-Fabric", 10)
+
+    batch.create(
+        [
+            routed("10.10.10.7", "1/1/1", "10.0.0.0"),
+            routed("10.10.10.8", "1/1/2", "10.0.0.2"),
+        ],
+    )
+
+    assert batch.errors == []
+    port_reads = [
+        url
+        for method, url, _body in client.requests
+        if method == "GET" and url.startswith("ports")
+    ]
+    assert len(port_reads) == 1
+    [(method, _url, body)] = client.writes()
+    assert method == "POST"
+    assert {item["switch_uuid"] for item in body} == {leaf1, leaf2}
+    assert all(item["lag_uuid"] for item in body)
+
+
+def test_unknown_routed_switch_fails_its_interface_only(mock_afc, client):
+    add_internal_lag(mock_afc, "10.10.10.7", "1/1/1")
+    batch = IpInterfaceBatch(client, VRF, "Aruba-Fabric", 10)
+
+    batch.create(
+        [
+            routed("10.10.10.7", "1/1/1", "10.0.0.0"),
+            routed("10.10.10.99", "1/1/1", "10.0.0.2"),
+        ],
+    )
+
+    assert [outcome["action"] for outcome in batch.outcomes] == [
+        "failed",
+        "created",
+    ]
+    [error] = batch.errors
+    assert "10.10.10.99" in error
+
+
+def svi(address, **fields):
+    return dict(
+        {
+            "name": "VLAN10",
+            "if_type": "vlan",
+            "vlan": 10,
+            "switches": ["10.10.10.7"],
+            "ipv4_primary_address": {"address": address, "prefix_length": 24},
+        },
+        **fields,
+    )
+
+
+def test_existing_interface_updated_when_it_differs(mock_afc, client):
+    IpInterfaceBatch(client, VRF, "Aruba-Fabric", 10).create(
+        [svi("10.1.10.2")],
+    )
+    client.requests.clear()
+
+    batch = IpInterfaceBatch(client, VRF, "Aruba-Fabric", 10)
+    batch.create([svi("10.1.10.3", enable=False)])
+
+    assert [outcome["action"] for outcome in batch.outcomes] == ["updated"]
+    [(method, url, body)] = client.writes()
+    assert method == "PUT"
+    assert url.startswith(batch.path)
+    assert body["ipv4_primary_address"]["address"] == "10.1.10.3"
+    assert body["enable"] is False
+
+    # An address within the range is kept
+    client.requests.clear()
+    batch = IpInterfaceBatch(client, VRF, "Aruba-Fabric", 10)
+    batch.create([svi("10.1.10.1-10.1.10.5", enable=False)])
+
+    assert [outcome["action"] for outcome in batch.outcomes] == ["unchanged"]
+    assert client.writes() == []
+
+
+def test_failed_post_reports_the_created_interfaces(mock_afc, client):
+    post = client.post
+
+    def partial_post(url, **kwargs):
+        # AFC creates the first interface and fails on the second one
+        created = json.loads(kwargs["data"])[:1]
+        post(url, data=json.dumps(created))
+        return AfcConnectionResponse(
+            {"status_code": 500, "text": '{"result": "Internal error"}'},
+        )
+
+    client.post = partial_post
+    batch = IpInterfaceBatch(client, VRF, "Aruba-Fabric", 10)
+
+    batch.create(
+        [
+            svi("10.1.10.2"),
+            svi("10.1.11.2", name="VLAN11", vlan=11),
+        ],
+    )
+
+    assert [outcome["action"] for outcome in batch.outcomes] == [
+        "created",
+        "failed",
+    ]
+    [error] = batch.errors
+    assert error.startswith("VRF VLAN11: POST")
+
+
+def test_delete_error_fails_its_interface_only(mock_afc, client):
+    batch = IpInterfaceBatch(client, VRF, "Aruba-Fabric", 10)
+    switch_uuids = batch.switch_uuids
+
+    def failing_switch_uuids(switches):
+        if "10.10.10.99" in switches:
+            raise ValueError("unknown switch 10.10.10.99")
+        return switch_uuids(switches)
+
+    batch.switch_uuids = failing_switch_uuids
+
+    batch.delete(
+        [
+            svi("10.1.10.2", switches=["10.10.10.99"]),
+            svi("10.1.11.2", name="VLAN11", vlan=11),
+        ],
+    )
+
+    assert [outcome["action"] for outcome in batch.outcomes] == [
+        "failed",
+        "unchanged",
+    ]
+    [error] = batch.errors
+    assert "10.10.10.99" in error
@@ -0,0 +1,247 @@
+# (C) Copyright 2020-2025 Hewlett Packard Enterprise Development LP.
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from ansible_collections.arubanetworks.afc.plugins.module_utils.afc import (
+    apply_json_patch,
+)
+from ansible_collections.arubanetworks.afc.plugins.modules import (
+    afc_lag_interfaces,
+)
+
+reconcile_operations = afc_lag_interfaces.reconcile_operations
+
+PORT_NAMES = {
+    "p1": "leaf1 1/1/1",
+    "p2": "leaf1 1/1/2",
+    "p3": "leaf1 1/1/3",
+    "q1": "leaf2 1/1/1",
+    "q2": "leaf2 1/1/2",
+    "r1": "leaf3 1/1/1",
+}
+
+
+def lag(*properties, **fields):
+    return dict(
+        fields,
+        uuid="lag",
+        name="LAG1",
+        port_properties=[
+            {"switch_uuid": switch_uuid, "port_uuids": list(port_uuids)}
+            for switch_uuid, port_uuids in properties
+        ],
+    )
+
+
+def members_after(lag, operations):
+    """Return the member ports per switch once operations are applied."""
+    patched = apply_json_patch(lag, operations)
+    return {
+        entry["switch_uuid"]: entry["port_uuids"]
+        for entry in patched["port_properties"]
+    }
+
+
+def test_unchanged_lag_has_no_operations():
+    current = lag(("s1", ["p1", "p2"]))
+
+    operations, changes = reconcile_operations(
+        current,
+        {},
+        {"s1": ["p1", "p2"]},
+        PORT_NAMES,
+    )
+
+    assert operations == []
+    assert changes == {"added": [], "removed": [], "updated": []}
+
+
+def test_added_port_is_appended():
+    current = lag(("s1", ["p1"]))
+
+    operations, changes = reconcile_operations(
+        current,
+        {},
+        {"s1": ["p1", "p2"]},
+        PORT_NAMES,
+    )
+
+    assert operations == [
+        {
+            "op": "add",
+            "path": "/port_properties/0/port_uuids/-",
+            "value": "p2",
+        },
+    ]
+    assert changes["added"] == ["leaf1 1/1/2"]
+    assert changes["removed"] == []
+
+
+def test_removed_ports_are_removed_from_the_end():
+    current = lag(("s1", ["p1", "p2", "p3"]))
+    members = {"s1": ["p2"]}
+
+    operations, changes = reconcile_operations(
+        current,
+        {},
+        members,
+        PORT_NAMES,
+    )
+
+    assert operations == [
+        {"op": "remove", "path": "/port_properties/0/port_uuids/2"},
+        {"op": "remove", "path": "/port_properties/0/port_uuids/0"},
+    ]
+    assert changes["removed"] == ["leaf1 1/1/3", "leaf1 1/1/1"]
+    assert members_after(current, operations) == members
+
+
+def test_port_replaced_on_one_switch_only():
+    current = lag(("s1", ["p1", "p2"]), ("s2", ["q1"]))
+    members = {"s1": ["p1", "p2"], "s2": ["q2"]}
+
+    operations, changes = reconcile_operations(
+        current,
+        {},
+        members,
+        PORT_NAMES,
+    )
+
+    assert [operation["path"] for operation in operations] == [
+        "/port_properties/1/port_uuids/0",
+        "/port_properties/1/port_uuids/-",
+    ]
+    assert changes == {
+        "added": ["leaf2 1/1/2"],
+        "removed": ["leaf2 1/1/1"],
+        "updated": [],
+    }
+    assert members_after(current, operations) == members
+
+
+def test_switches_added_and_removed_with_their_ports():
+    current = lag(("s1", ["p1"]), ("s2", ["q1", "q2"]))
+    members = {"s1": ["p1"], "s3": ["r1"]}
+
+    operations, changes = reconcile_operations(
+        current,
+        {"lacp_config": {"mode": "active"}},
+        members,
+        PORT_NAMES,
+    )
+
+    added = [
+        operation
+        for operation in operations
+        if operation["path"] == "/port_properties/-"
+    ]
+    assert len(added) == 1
+    assert added[0]["value"]["switch_uuid"] == "s3"
+    assert added[0]["value"]["lacp"]["mode"] == "active"
+    # The removed entry is removed after the appended one, by its index
+    assert operations[-1] == {"op": "remove", "path": "/port_properties/1"}
+    assert changes["added"] == ["leaf3 1/1/1"]
+    assert changes["removed"] == ["leaf2 1/1/1", "leaf2 1/1/2"]
+    assert members_after(current, operations) == members
+
+
+def test_lacp_fields_updated_once_per_field():
+    current = lag(("s1", ["p1"]), ("s2", ["q1"]))
+    current["port_properties"][0]["lacp"] = {"mode": "active", "rate": "slow"}
+    current["port_properties"][1]["lacp"] = {"mode": "passive"}
+
+    operations, changes = reconcile_operations(
+        current,
+        {"lacp_config": {"mode": "active", "rate": "slow"}},
+        {"s1": ["p1"], "s2": ["q1"]},
+        PORT_NAMES,
+    )
+
+    assert operations == [
+        {
+            "op": "replace",
+            "path": "/port_properties/1/lacp/mode",
+            "value": "active",
+        },
+        {
+            "op": "replace",
+            "path": "/port_properties/1/lacp/rate",
+            "value": "slow",
+        },
+    ]
+    assert changes["updated"] == ["lacp/mode", "lacp/rate"]
+
+
+def test_global_vlans_compared_as_sets():
+    current = lag(("s1", ["p1"]), vlans="10-12,20", native_vlan=1)
+
+    operations, _changes = reconcile_operations(
+        current,
+        {"global_config": {"vlans": "20,10,11,12", "native_vlan": 1}},
+        {"s1": ["p1"]},
+        PORT_NAMES,
+    )
+    assert operations == []
+
+    operations, changes = reconcile_operations(
+        current,
+        {"global_config": {"vlans": "10-13", "native_vlan": 2}},
+        {"s1": ["p1"]},
+        PORT_NAMES,
+    )
+    assert operations == [
+        {"op": "replace", "path": "/native_vlan", "value": 2},
+        {"op": "replace", "path": "/vlans", "value": "10-13"},
+    ]
+    assert changes["updated"] == ["native_vlan", "vlans"]
+
+
+def test_speed_fields_updated_on_existing_switches():
+    current = lag(("s1", ["p1"]), ("s2", ["q1"]))
+    current["port_properties"][0]["speed"] = {"current": "25000"}
+    current["port_properties"][1]["speed"] = {"current": "10000"}
+
+    operations, changes = reconcile_operations(
+        current,
+        {"speed_config": {"current": "25000"}},
+        {"s1": ["p1"], "s2": ["q1"]},
+        PORT_NAMES,
+    )
+
+    assert operations == [
+        {
+            "op": "replace",
+            "path": "/port_properties/1/speed/current",
+            "value": "25000",
+        },
+    ]
+    assert changes["updated"] == ["speed/current"]
+    patched = apply_json_patch(current, operations)
+    assert [entry["speed"] for entry in patched["port_properties"]] == [
+        {"current": "25000"},
+        {"current": "25000"},
+    ]
+
+
+def test_top_level_fields_compared():
+    current = lag(("s1", ["p1"]), description="Uplink", lag_number=15)
+    members = {"s1": ["p1"]}
+
+    operations, _changes = reconcile_operations(
+        current,
+        {"lag_name": "LAG1", "lag_id": 15, "description": "Uplink"},
+        members,
+        PORT_NAMES,
+    )
+    assert operations == []
+
+    operations, changes = reconcile_operations(
+        current,
+        {"lag_name": "LAG1", "lag_id": 15, "description": "Server"},
+        members,
+        PORT_NAMES,
+    )
+    assert operations == [
+        {"op": "replace", "path": "/description", "value": "Server"},
+    ]
+    assert changes["updated"] == ["description"]
@@ -0,0 +1,57 @@
+# (C) Copyright 2020-2025 Hewlett Packard Enterprise Development LP.
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from ansible_collections.arubanetworks.afc.plugins.modules import (
+    afc_physical_interfaces,
+)
+
+configure_batch = afc_physical_interfaces.configure_batch
+
+
+def test_unknown_switch_and_port_fail_their_switch_only(client):
+    outcome = configure_batch(
+        client,
+        [
+            {
+                "switch": "10.10.10.7",
+                "ports_config": [{"name": "1/1/1", "native_vlan": 250}],
+            },
+            {
+                "switch": "10.10.10.99",
+                "ports_config": [{"name": "1/1/1", "native_vlan": 250}],
+            },
+            {
+                "switch": "10.10.10.8",
+                "ports_config": [{"name": "9/9/9", "native_vlan": 250}],
+            },
+        ],
+    )
+
+    assert outcome["10.10.10.7"]["status"] is True
+    assert outcome["10.10.10.7"]["changed"] is True
+    assert outcome["10.10.10.99"] == {
+        "status": False,
+        "changed": False,
+        "message": "Unknown switch",
+    }
+    assert outcome["10.10.10.8"]["status"] is False
+    assert "9/9/9" in outcome["10.10.10.8"]["message"]
+    # Only the ports of the known switch are sent
+    [(method, _url, body)] = client.writes()
+    assert method == "PATCH"
+    assert len(body) == 1
+    assert body[0]["patch"] == [
+        {"path": "/native_vlan", "value": 250, "op": "replace"},
+    ]
+
+
+def test_nothing_to_configure_succeeds(run_afc_module):
+    result = run_afc_module(
+        afc_physical_interfaces,
+        {"data": [{"switch": "10.10.10.7", "ports_config": []}]},
+    )
+
+    assert result["msg"] == "Nothing to configure"
+    assert result["changed"] is False
+    assert not result.get("failed"), result
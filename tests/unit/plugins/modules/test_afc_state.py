@@ -0,0 +1,230 @@
+# (C) Copyright 2020-2025 Hewlett Packard Enterprise Development LP.
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+import importlib
+from types import SimpleNamespace
+
+import pytest
+from ansible_collections.arubanetworks.afc.plugins.module_utils import afc
+
+MODULES = "ansible_collections.arubanetworks.afc.plugins.modules"
+
+# Module, collection, object created before the task (None when it is in
+# the fixtures), data of the task and field it changes
+CASES = [
+    pytest.param(
+        "afc_dns",
+        "dns_client_configurations",
+        {"name": "DNS", "domain_name": "example.com"},
+        {"name": "DNS", "domain_name": "example.org"},
+        "domain_name",
+        id="afc_dns",
+    ),
+    pytest.param(
+        "afc_ntp",
+        "ntp_client_configurations",
+        {"name": "NTP", "entry_list": [{"server": "10.1.1.1"}]},
+        {"name": "NTP", "servers": [{"server": "10.1.1.2"}]},
+        "entry_list",
+        id="afc_ntp",
+    ),
+    pytest.param(
+        "afc_snmp",
+        "snmp_configurations",
+        {"name": "SNMP", "location": "DC1"},
+        {"name": "SNMP", "location": "DC2"},
+        "location",
+        id="afc_snmp",
+    ),
+    pytest.param(
+        "afc_syslog",
+        "syslog_client_configurations",
+        {
+            "name": "Syslog",
+            "facility": "LOCAL7",
+            "entry_list": [{"host": "10.1.1.1", "port": 514}],
+        },
+        {
+            "name": "Syslog",
+            "facility": "LOCAL6",
+            "entry_list": [{"host": "10.1.1.1", "port": 514}],
+        },
+        "facility",
+        id="afc_syslog",
+    ),
+    pytest.param(
+        "afc_sflow",
+        "sflow_configurations",
+        {"name": "sFlow", "sampling_rate": 20000},
+        {"name": "sFlow", "sampling_rate": 10000},
+        "sampling_rate",
+        id="afc_sflow",
+    ),
+    pytest.param(
+        "afc_aaa",
+        "auth/sources",
+        {
+            "name": "RADIUS",
+            "config": {"server": "10.1.1.1", "port": 1812, "secret": "s"},
+        },
+        {
+            "name": "RADIUS",
+            "config": {"server": "10.1.1.1", "port": 1813, "secret": "s"},
+        },
+        "config",
+        id="afc_aaa",
+    ),
+    pytest.param(
+        "afc_resource_pool",
+        "resource_pool",
+        None,
+        {"name": "IP POOL", "type": "IPv4", "pool_ranges": "10.10.30.0/24"},
+        "pool_ranges",
+        id="afc_resource_pool",
+    ),
+    pytest.param(
+        "afc_stp",
+        "spanning_tree/stp_configuration",
+        {"name": "STP", "config_type": "mstp"},
+        {"name": "STP", "config_type": "rpvst"},
+        "config_type",
+        id="afc_stp",
+    ),
+    pytest.param(
+        "afc_dhcp_relay",
+        "dhcp_relay",
+        {"name": "Relay", "vlans": "10"},
+        {"name": "Relay", "vlans": "10-11"},
+        "vlans",
+        id="afc_dhcp_relay",
+    ),
+    pytest.param(
+        "afc_dss",
+        "qualifiers",
+        {"name": "Web", "description": ""},
+        {"name": "Web", "type": "qualifier", "description": "HTTP"},
+        "description",
+        id="afc_dss",
+    ),
+    pytest.param(
+        "afc_fabric",
+        "fabrics",
+        None,
+        {"name": "Aruba-Fabric", "timezone": "Europe/Paris"},
+        "timezone",
+        id="afc_fabric",
+    ),
+    pytest.param(
+        "afc_route_policy",
+        "prefix_lists",
+        {"name": "PL", "description": "", "entries": []},
+        {
+            "name": "PL",
+            "type": "prefix_list",
+            "description": "Default",
+            "entries": [],
+        },
+        "description",
+        id="afc_route_policy",
+    ),
+    pytest.param(
+        "afc_vlan",
+        "vlan_groups",
+        {"name": "VG", "vlans": "10"},
+        {"name": "VG", "type": "vlan_group", "vlans": "10-20"},
+        "vlans",
+        id="afc_vlan",
+    ),
+    pytest.param(
+        "afc_vrf",
+        "vrfs",
+        None,
+        {"name": "Aruba-VRF", "fabric": "Aruba-Fabric", "vni": 10500},
+        "vni",
+        id="afc_vrf",
+    ),
+]
+
+
+@pytest.mark.parametrize(("module", "path", "current", "data", "field"), CASES)
+def test_present_updates_existing_object(
+    mock_afc,
+    client,
+    run_afc_module,
+    module,
+    path,
+    current,
+    data,
+    field,
+):
+    if current is not None:
+        mock_afc.handle("POST", path.split("/"), {}, current)
+    module = importlib.import_module(f"{MODULES}.{module}")
+
+    result = run_afc_module(module, {"state": "present", "data": data})
+
+    assert result["changed"] is True, result
+    assert result["msg"] == f"Successfully updated {data['name']}"
+    [(method, url, body)] = client.writes()
+    assert method == "PUT"
+    updated = next(
+        item for item in mock_afc.state[path] if item["name"] == data["name"]
+    )
+    assert body["uuid"] == updated["uuid"]
+    assert url.endswith(updated["uuid"])
+    assert updated[field] == body[field]
+
+    # The object has the desired values, a second run changes nothing
+    client.requests.clear()
+    result = run_afc_module(module, {"state": "present", "data": data})
+
+    assert result["changed"] is False, result
+    assert client.writes() == []
+
+
+def test_present_creates_missing_object(mock_afc, client, run_afc_module):
+    module = importlib.import_module(f"{MODULES}.afc_dns")
+    data = {
+        "name": "DNS",
+        "domain_name": "example.com",
+        "fabrics": ["Aruba-Fabric"],
+    }
+
+    result = run_afc_module(module, {"state": "present", "data": data})
+
+    assert result["changed"] is True, result
+    [(method, _url, body)] = client.writes()
+    assert (method, body["name"]) == ("POST", "DNS")
+
+
+def test_present_reads_the_object_past_the_cache(
+    mock_afc,
+    client,
+    run_afc_module,
+    monkeypatch,
+):
+    caching_client = afc.AfcCachingClient(
+        client,
+        afc.AfcResolutionCache(300),
+    )
+    monkeypatch.setattr(
+        afc,
+        "instantiate_afc_object",
+        lambda data=None, module=None: SimpleNamespace(
+            client=caching_client,
+            afc_connected=True,
+            disconnect=lambda: None,
+        ),
+    )
+    caching_client.get("fabrics")
+    # Changed on AFC after the fabrics were cached
+    fabric = mock_afc.state["fabrics"][0]
+    fabric["timezone"] = "Europe/Paris"
+    module = importlib.import_module(f"{MODULES}.afc_fabric")
+    data = {"name": fabric["name"], "timezone": "Europe/Paris"}
+
+    result = run_afc_module(module, {"state": "present", "data": data})
+
+    assert result["changed"] is False, result
+    assert client.writes() == []